@@ -0,0 +1,229 @@
+# app/core/admission.py
+"""
+Admission control and load shedding per route class.
+
+Every HTTP request is put in a class (auth, feed, writes, reads, static)
+and has to get one of its class's concurrency slots before it reaches the
+route. A request that can't get a slot waits at most the class's
+deadline_ms and is then answered 503 with Retry-After; if the queue ahead
+of it already predicts a longer wait, it is rejected right away instead of
+spending its deadline in the queue. So a burst of slow feed queries or
+bcrypt logins can fill their own classes, but not the AnyIO threadpool and
+the DB pool that /users/me needs.
+
+The limits adapt to latency (AIMD) once per window of completions (at
+least WINDOW_MIN_SAMPLES and at least `limit` of them): if the window's
+WINDOW_PERCENTILE service time is over the class's target_ms the limit is
+multiplied by DECREASE_FACTOR, otherwise, if the limit held requests back
+during the window, it grows by 1. Both directions move at most one step
+per window, so a stream of fast completions can't outvote the slow ones.
+The limit stays within [min_limit, max_limit].
+
+The controller is per worker process and runs on the event loop, so it
+needs no locks. A request holds its slot, and is timed, until its response
+starts, so sending a large body to a slow client (uploads, export
+downloads) doesn't count. Long-lived streams (WebSocket, SSE, export
+streams) are not admitted through it: they would hold a slot for their
+whole lifetime.
+"""
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import ADMISSION_ENABLED, UPLOAD_URL_PREFIX
+
+DECREASE_FACTOR = 0.9
+WINDOW_MIN_SAMPLES = 10
+WINDOW_PERCENTILE = 0.9
+# Weight of the newest sample in the service time average used to predict queue waits
+EWMA_WEIGHT = 0.1
+
+
+@dataclass(frozen=True)
+class RouteClass:
+    name: str
+    initial_limit: int
+    min_limit: int
+    max_limit: int
+    target_ms: float    # service time above this shrinks the limit
+    deadline_ms: float  # longest a request may queue for a slot
+
+
+CLASSES = {
+    "auth": RouteClass("auth", initial_limit=4, min_limit=1, max_limit=16, target_ms=750, deadline_ms=2000),
+    "feed": RouteClass("feed", initial_limit=8, min_limit=2, max_limit=64, target_ms=300, deadline_ms=1000),
+    "writes": RouteClass("writes", initial_limit=16, min_limit=2, max_limit=64, target_ms=300, deadline_ms=2000),
+    "reads": RouteClass("reads", initial_limit=32, min_limit=4, max_limit=128, target_ms=100, deadline_ms=500),
+    "static": RouteClass("static", initial_limit=64, min_limit=8, max_limit=256, target_ms=100, deadline_ms=500),
+}
+
+FEED_PATHS = ("/home", "/posts/", "/posts/trending", "/users/search", "/users/suggestions", "/activity/")
+FEED_PREFIXES = ("/tags/",)
+STREAM_PREFIXES = ("/realtime/",)
+STREAM_SUFFIXES = ("/events", "/exports/stream")
+
+
+def classify(method: str, path: str) -> Optional[str]:
+    """The route class of a request, or None for long-lived streams that bypass admission."""
+    if path.startswith(STREAM_PREFIXES) or path.endswith(STREAM_SUFFIXES):
+        return None
+    if path == "/" or path.startswith(UPLOAD_URL_PREFIX + "/"):
+        return "static"
+    if path.startswith("/auth/"):
+        return "auth"
+    if method not in ("GET", "HEAD"):
+        return "writes"
+    if path in FEED_PATHS or path.startswith(FEED_PREFIXES):
+        return "feed"
+    return "reads"
+
+
+class Overloaded(Exception):
+    pass
+
+
+class AdaptiveLimiter:
+    def __init__(self, route_class: RouteClass):
+        self.route_class = route_class
+        self.limit = float(route_class.initial_limit)
+        self.inflight = 0
+        self.service_seconds = route_class.target_ms / 1000
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._window: List[float] = []
+        self._saturated = False
+        self.window_ms = 0.0
+        self.metrics = {"admitted": 0, "queued": 0, "rejected_early": 0, "timed_out": 0}
+
+    def _slots(self) -> int:
+        return int(self.limit)
+
+    async def acquire(self) -> None:
+        if self.inflight < self._slots() and not self._waiters:
+            self.inflight += 1
+            self.metrics["admitted"] += 1
+            return
+
+        deadline = self.route_class.deadline_ms / 1000
+        # Everyone queued ahead needs a slot first; each slot frees up about every service_seconds
+        expected_wait = (len(self._waiters) + 1) / self._slots() * self.service_seconds
+        if expected_wait > deadline:
+            self.metrics["rejected_early"] += 1
+            raise Overloaded
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.metrics["queued"] += 1
+        try:
+            await asyncio.wait_for(waiter, deadline)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # Handed a slot just as we gave up: pass it on
+                self.inflight -= 1
+                self._wake()
+            else:
+                waiter.cancel()
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+            if isinstance(e, asyncio.TimeoutError):
+                self.metrics["timed_out"] += 1
+                raise Overloaded
+            raise
+        self.metrics["admitted"] += 1
+
+    def release(self, service_seconds: float) -> None:
+        self._adapt(service_seconds)
+        self.inflight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self.inflight < self._slots():
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.inflight += 1
+                waiter.set_result(None)
+
+    def _adapt(self, service_seconds: float) -> None:
+        route_class = self.route_class
+        self.service_seconds += EWMA_WEIGHT * (service_seconds - self.service_seconds)
+        self._window.append(service_seconds)
+        # Only grow when the limit is what holds requests back
+        self._saturated = self._saturated or self.inflight >= self._slots()
+        if len(self._window) < max(WINDOW_MIN_SAMPLES, self._slots()):
+            return
+
+        window = sorted(self._window)
+        self.window_ms = window[min(len(window) - 1, int(len(window) * WINDOW_PERCENTILE))] * 1000
+        if self.window_ms > route_class.target_ms:
+            self.limit = max(route_class.min_limit, self.limit * DECREASE_FACTOR)
+        elif self._saturated:
+            self.limit = min(route_class.max_limit, self.limit + 1)
+        self._window.clear()
+        self._saturated = False
+
+    def stats(self) -> dict:
+        return {"limit": round(self.limit, 2), "inflight": self.inflight, "waiting": len(self._waiters),
+                "service_ms": round(self.service_seconds * 1000, 1), "window_ms": round(self.window_ms, 1),
+                **self.metrics}
+
+
+class AdmissionController:
+    def __init__(self, classes: Dict[str, RouteClass] = CLASSES, enabled: bool = ADMISSION_ENABLED):
+        self.classes = classes
+        self.enabled = enabled
+        self.reset()
+
+    def reset(self) -> None:
+        self.limiters = {name: AdaptiveLimiter(route_class) for name, route_class in self.classes.items()}
+
+    def stats(self) -> dict:
+        return {name: limiter.stats() for name, limiter in self.limiters.items()}
+
+
+controller = AdmissionController()
+
+
+class AdmissionMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not controller.enabled:
+            return await self.app(scope, receive, send)
+        name = classify(scope["method"], scope["path"])
+        if name is None:
+            return await self.app(scope, receive, send)
+
+        limiter = controller.limiters[name]
+        try:
+            await limiter.acquire()
+        except Overloaded:
+            response = JSONResponse({"detail": "Server is busy, try again shortly"}, status_code=503,
+                                    headers={"Retry-After": "1"})
+            return await response(scope, receive, send)
+
+        started = time.perf_counter()
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                limiter.release(time.perf_counter() - started)
+
+        async def send_and_release(message: Message) -> None:
+            # The slot covers producing the response, not a slow client downloading its body
+            if message["type"] == "http.response.start":
+                release()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_release)
+        finally:
+            release()
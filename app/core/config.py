@@ -8,3 +8,149 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
 JWT_ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+
+# Database engine / pool
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# Connections each worker opens before accepting traffic (0 = lazily on first request)
+DB_WARM_CONNECTIONS = int(os.getenv("DB_WARM_CONNECTIONS", "0"))
+# SQLAlchemy compiled-statement cache entries per engine
+DB_QUERY_CACHE_SIZE = int(os.getenv("DB_QUERY_CACHE_SIZE", "500"))
+# Use psycopg 3 with server-side prepared statements (needs `pip install "psycopg[binary]"`;
+# not compatible with PgBouncer in transaction pooling mode)
+DB_PREPARED_STATEMENTS = os.getenv("DB_PREPARED_STATEMENTS", "false").lower() == "true"
+# Executions of the same SQL before psycopg prepares it, and prepared statements kept per connection
+DB_PREPARE_THRESHOLD = int(os.getenv("DB_PREPARE_THRESHOLD", "2"))
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+
+# Media uploads
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
+UPLOAD_URL_PREFIX = "/uploads"
+UPLOAD_GC_GRACE_SECONDS = int(os.getenv("UPLOAD_GC_GRACE_SECONDS", str(24 * 60 * 60)))
+UPLOAD_GC_BATCH_SIZE = int(os.getenv("UPLOAD_GC_BATCH_SIZE", "1000"))
+
+# Media serving
+MEDIA_CACHE_MAX_AGE = int(os.getenv("MEDIA_CACHE_MAX_AGE", str(365 * 24 * 60 * 60)))
+MEDIA_SENDFILE_MIN_BYTES = int(os.getenv("MEDIA_SENDFILE_MIN_BYTES", str(256 * 1024)))
+# e.g. "/_protected_uploads" to let nginx serve the bytes via X-Accel-Redirect
+MEDIA_ACCEL_REDIRECT_PREFIX = os.getenv("MEDIA_ACCEL_REDIRECT_PREFIX", "")
+
+# Media storage backend: "local" (sharded UPLOAD_DIR) or "s3" (any S3-compatible store, e.g. MinIO)
+MEDIA_STORAGE_BACKEND = os.getenv("MEDIA_STORAGE_BACKEND", "local")
+MEDIA_SHARD_DEPTH = int(os.getenv("MEDIA_SHARD_DEPTH", "2"))
+MEDIA_PUBLIC_BASE_URL = os.getenv("MEDIA_PUBLIC_BASE_URL", "")
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL")
+S3_BUCKET = os.getenv("S3_BUCKET", "igclone-media")
+S3_REGION = os.getenv("S3_REGION", "us-east-1")
+S3_ACCESS_KEY_ID = os.getenv("S3_ACCESS_KEY_ID")
+S3_SECRET_ACCESS_KEY = os.getenv("S3_SECRET_ACCESS_KEY")
+
+# Rate limiting
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+# Empty = per-process memory; a file path shares buckets between workers on one host
+RATE_LIMIT_STORE_PATH = os.getenv("RATE_LIMIT_STORE_PATH", "")
+RATE_LIMIT_TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "false").lower() == "true"
+
+# Follow suggestions
+RECS_MAX_FOLLOWEES_SAMPLED = int(os.getenv("RECS_MAX_FOLLOWEES_SAMPLED", "200"))
+RECS_MAX_SECOND_HOP_PER_FOLLOWEE = int(os.getenv("RECS_MAX_SECOND_HOP_PER_FOLLOWEE", "500"))
+RECS_CACHE_TTL_SECONDS = int(os.getenv("RECS_CACHE_TTL_SECONDS", "3600"))
+RECS_REFRESH_INTERVAL_SECONDS = int(os.getenv("RECS_REFRESH_INTERVAL_SECONDS", "300"))
+RECS_MAX_ACTIVE_USERS = int(os.getenv("RECS_MAX_ACTIVE_USERS", "10000"))
+
+# POST /batch
+BATCH_MAX_OPERATIONS = int(os.getenv("BATCH_MAX_OPERATIONS", "100"))
+
+# Activity feed
+ACTIVITY_RETENTION_DAYS = int(os.getenv("ACTIVITY_RETENTION_DAYS", "90"))
+# Raw events examined per page when folding bursts into "X and N others"
+ACTIVITY_SCAN_LIMIT = int(os.getenv("ACTIVITY_SCAN_LIMIT", "500"))
+# Unread counts stop at this many events (clients show "99+")
+ACTIVITY_UNREAD_LIMIT = int(os.getenv("ACTIVITY_UNREAD_LIMIT", "100"))
+
+# Real-time post updates (WebSocket / SSE)
+REALTIME_COALESCE_SECONDS = float(os.getenv("REALTIME_COALESCE_SECONDS", "0.1"))
+REALTIME_MAX_PENDING = int(os.getenv("REALTIME_MAX_PENDING", "256"))
+REALTIME_SEND_TIMEOUT_SECONDS = float(os.getenv("REALTIME_SEND_TIMEOUT_SECONDS", "5"))
+REALTIME_HEARTBEAT_SECONDS = float(os.getenv("REALTIME_HEARTBEAT_SECONDS", "25"))
+
+# In-process cache of user cards (id, name, avatar) used to hydrate post authors
+USER_CACHE_TTL_SECONDS = int(os.getenv("USER_CACHE_TTL_SECONDS", "300"))
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "100000"))
+
+# Monthly posts/comments partitions (PostgreSQL, see app/jobs/manage_partitions.py)
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+# Detach partitions older than this many months into PARTITION_ARCHIVE_SCHEMA (0 = never)
+PARTITION_ARCHIVE_AFTER_MONTHS = int(os.getenv("PARTITION_ARCHIVE_AFTER_MONTHS", "0"))
+PARTITION_ARCHIVE_SCHEMA = os.getenv("PARTITION_ARCHIVE_SCHEMA", "archive")
+# Only consider posts this recent in GET /posts/ so old partitions are pruned (0 = no limit)
+FEED_LOOKBACK_DAYS = int(os.getenv("FEED_LOOKBACK_DAYS", "0"))
+
+# Post impressions: buffered per worker and flushed in batches (app/services/impressions.py)
+IMPRESSIONS_FLUSH_SECONDS = float(os.getenv("IMPRESSIONS_FLUSH_SECONDS", "10"))
+# Each tracked post holds a 2**IMPRESSIONS_HLL_PRECISION byte sketch (~1.2 KB per post at 10)
+IMPRESSIONS_MAX_TRACKED_POSTS = int(os.getenv("IMPRESSIONS_MAX_TRACKED_POSTS", "10000"))
+IMPRESSIONS_HLL_PRECISION = int(os.getenv("IMPRESSIONS_HLL_PRECISION", "10"))
+
+# Trending posts (app/services/trending.py)
+TRENDING_TOP_K = int(os.getenv("TRENDING_TOP_K", "500"))
+TRENDING_BUCKET_SECONDS = int(os.getenv("TRENDING_BUCKET_SECONDS", "3600"))
+TRENDING_WINDOW_HOURS = float(os.getenv("TRENDING_WINDOW_HOURS", "48"))
+TRENDING_HALF_LIFE_HOURS = float(os.getenv("TRENDING_HALF_LIFE_HOURS", "6"))
+# A comment counts this many likes
+TRENDING_COMMENT_WEIGHT = float(os.getenv("TRENDING_COMMENT_WEIGHT", "3"))
+# Reload from the DB to pick up other workers' events and unlikes
+TRENDING_REBUILD_SECONDS = int(os.getenv("TRENDING_REBUILD_SECONDS", "600"))
+
+# Newest comments embedded per post when a feed is requested with include_comments=true
+FEED_COMMENT_PREVIEWS = int(os.getenv("FEED_COMMENT_PREVIEWS", "3"))
+
+# Background jobs (app/services/queue.py), run by `python -m app.jobs.worker`
+JOB_WORKER_PROCESSES = int(os.getenv("JOB_WORKER_PROCESSES", "1"))
+JOB_WORKER_THREADS = int(os.getenv("JOB_WORKER_THREADS", "4"))
+# Idle workers poll this often
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "1"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+# Retry n waits about JOB_RETRY_BASE_SECONDS * 2**(n-1), capped at JOB_RETRY_MAX_SECONDS
+JOB_RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", "10"))
+JOB_RETRY_MAX_SECONDS = float(os.getenv("JOB_RETRY_MAX_SECONDS", "3600"))
+# A job still running after this long is assumed to have lost its worker and is run again
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "900"))
+# Finished jobs are kept this long for the stats, failed ones until deleted by hand
+JOB_RETENTION_HOURS = int(os.getenv("JOB_RETENTION_HOURS", "24"))
+
+# Personal data exports (app/services/export.py); EXPORT_DIR must be shared by the API and the job workers
+EXPORT_DIR = os.getenv("EXPORT_DIR", "exports")
+# Rows read per short transaction, and fetched per round trip from the server-side cursor
+EXPORT_PAGE_ROWS = int(os.getenv("EXPORT_PAGE_ROWS", "2000"))
+EXPORT_YIELD_PER = int(os.getenv("EXPORT_YIELD_PER", "500"))
+EXPORT_MEDIA_CHUNK_BYTES = int(os.getenv("EXPORT_MEDIA_CHUNK_BYTES", str(1024 * 1024)))
+# Finished exports are deleted after this long
+EXPORT_RETENTION_HOURS = int(os.getenv("EXPORT_RETENTION_HOURS", "72"))
+
+# Analytics rollups (app/services/rollups.py), built by `python -m app.jobs.rollup_metrics`
+ROLLUP_BATCH_SIZE = int(os.getenv("ROLLUP_BATCH_SIZE", "10000"))
+# Rows younger than this are left for the next run, so rows committed out of id order aren't skipped
+ROLLUP_SETTLE_SECONDS = int(os.getenv("ROLLUP_SETTLE_SECONDS", "60"))
+# Hourly buckets are dropped after this many days; daily buckets are kept
+ROLLUP_HOURLY_RETENTION_DAYS = int(os.getenv("ROLLUP_HOURLY_RETENTION_DAYS", "90"))
+
+# Comma-separated user ids allowed to call /admin endpoints
+ADMIN_USER_IDS = {int(user_id) for user_id in os.getenv("ADMIN_USER_IDS", "").split(",") if user_id.strip()}
+
+# Per-route-class concurrency limits with 503 load shedding (app/core/admission.py)
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+
+# Identical concurrent reads share one execution (app/core/singleflight.py)
+SINGLE_FLIGHT_ENABLED = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+# A waiting request runs the query itself after this long
+SINGLE_FLIGHT_MAX_WAIT_SECONDS = float(os.getenv("SINGLE_FLIGHT_MAX_WAIT_SECONDS", "5"))
+
+# Per-user block/mute filters (app/services/blocks.py); other workers see a change after the TTL
+BLOCK_FILTER_TTL_SECONDS = int(os.getenv("BLOCK_FILTER_TTL_SECONDS", "60"))
+BLOCK_FILTER_MAX_ENTRIES = int(os.getenv("BLOCK_FILTER_MAX_ENTRIES", "50000"))
+# Lists up to this size are kept as exact sets, longer ones as Bloom filters
+BLOCK_FILTER_EXACT_MAX = int(os.getenv("BLOCK_FILTER_EXACT_MAX", "256"))
+BLOCK_FILTER_ERROR_RATE = float(os.getenv("BLOCK_FILTER_ERROR_RATE", "0.01"))
@@ -9,8 +9,10 @@ from jose import JWTError
 from sqlalchemy.orm import Session
 
 from app.core.auth_utils import decode_access_token
+from app.core.config import ADMIN_USER_IDS
 from app.db.database import get_db
 from app.db.models import User
+from app.db.queries import user_by_id, is_following
 
 # This allows token pasting manually in Swagger (via "Authorize" popup)
 api_key_scheme = APIKeyHeader(name="Authorization", auto_error=False)
@@ -19,23 +21,46 @@ api_key_scheme = APIKeyHeader(name="Authorization", auto_error=False)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-def get_current_user(token: Optional[str] = Security(api_key_scheme), db: Session = Depends(get_db)) -> User:
+def user_from_token(token: Optional[str], db: Session) -> Optional[User]:
+    if not token:
+        return None
     if token.startswith("Bearer "):
         token = token[len("Bearer "):]
 
+    payload = decode_access_token(token)
+    if payload is None or "sub" not in payload:
+        return None
+
+    return user_by_id(db, int(payload["sub"]))
+
+
+def get_current_user(token: Optional[str] = Security(api_key_scheme), db: Session = Depends(get_db)) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"})
 
-    payload = decode_access_token(token)
-    if payload is None or "sub" not in payload:
-        raise credentials_exception
-
-    user_id = payload["sub"]
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    user = user_from_token(token, db)
 
     if user is None:
         raise credentials_exception
 
     return user
+
+
+def get_optional_user(token: Optional[str] = Security(api_key_scheme), db: Session = Depends(get_db)) -> Optional[User]:
+    """The caller when a valid token was sent, else None: for public routes that adapt to the viewer."""
+    return user_from_token(token, db)
+
+
+def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
+    if current_user.id not in ADMIN_USER_IDS:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admins only")
+    return current_user
+
+
+def can_view_posts_of(db: Session, viewer_id: int, author_id: int) -> bool:
+    # Posts are visible to their author and to the author's followers
+    if viewer_id == author_id:
+        return True
+    return is_following(db, viewer_id, author_id)
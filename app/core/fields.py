@@ -0,0 +1,52 @@
+# app/core/fields.py
+"""
+Column projection and ?fields= sparse fieldsets for read routes.
+
+Routes select only the columns their response model declares instead of
+loading whole ORM entities (User rows carry the password hash, Post rows
+the full content). A client may narrow further with ?fields=id,name: the
+SELECT list shrinks accordingly and the JSON carries only those keys.
+"""
+from typing import Callable, List, Optional, Sequence, Type
+
+from fastapi import HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+def sparse_fields(schema: Type[BaseModel]) -> Callable[..., Optional[List[str]]]:
+    """Dependency parsing ?fields= against the field names of `schema`."""
+    allowed = list(schema.model_fields)
+
+    def dependency(fields: Optional[str] = Query(
+            None, description=f"Comma-separated subset of: {', '.join(allowed)}")) -> Optional[List[str]]:
+        if fields is None:
+            return None
+        requested = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+        unknown = [name for name in requested if name not in allowed]
+        if not requested or unknown:
+            raise HTTPException(status_code=400,
+                                detail=f"Unknown fields: {', '.join(unknown) or '(none given)'}; "
+                                       f"allowed: {', '.join(allowed)}")
+        return requested
+
+    return dependency
+
+
+def columns_for(model, schema: Type[BaseModel], fields: Optional[Sequence[str]] = None) -> list:
+    """ORM columns of `model` backing `schema` (or just `fields`), in schema order."""
+    names = fields if fields is not None else list(schema.model_fields)
+    table_columns = model.__table__.columns
+    return [getattr(model, name) for name in names if name in table_columns]
+
+
+def project(rows, fields: Optional[Sequence[str]]):
+    """
+    Rows as-is when no fieldset was asked for (the response model validates
+    them by attribute), otherwise a JSONResponse with only the requested keys
+    so response_model doesn't re-add the omitted ones.
+    """
+    if fields is None:
+        return rows
+    return JSONResponse(jsonable_encoder([{name: row._mapping[name] for name in fields} for row in rows]))
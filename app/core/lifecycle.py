@@ -0,0 +1,68 @@
+# app/core/lifecycle.py
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Callable, Dict, List
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import DB_WARM_CONNECTIONS
+
+logger = logging.getLogger("igclone.startup")
+
+# Reset by app/server.py in every forked worker so "ready_since_start"
+# measures fork -> accepting traffic.
+PROCESS_STARTED = time.perf_counter()
+
+_startup_hooks: List[Callable[[], None]] = []
+_shutdown_hooks: List[Callable[[], None]] = []
+timings: Dict[str, float] = {}
+
+
+def on_startup(fn: Callable[[], None]) -> Callable[[], None]:
+    """Register a blocking warm-up step that must finish before the worker accepts traffic."""
+    _startup_hooks.append(fn)
+    return fn
+
+
+def on_shutdown(fn: Callable[[], None]) -> Callable[[], None]:
+    _shutdown_hooks.append(fn)
+    return fn
+
+
+def warm_database() -> None:
+    from app.db.database import warm_pool
+    if DB_WARM_CONNECTIONS:
+        warm_pool(DB_WARM_CONNECTIONS)
+
+
+def run_startup_hooks() -> None:
+    for hook in [warm_database] + _startup_hooks:
+        started = time.perf_counter()
+        try:
+            hook()
+        except Exception:
+            # A cold cache is better than a worker that never comes up
+            logger.exception("startup hook %s failed", hook.__name__)
+        timings[f"startup.{hook.__name__}"] = time.perf_counter() - started
+
+
+def run_shutdown_hooks() -> None:
+    for hook in reversed(_shutdown_hooks):
+        try:
+            hook()
+        except Exception:
+            logger.exception("shutdown hook %s failed", hook.__name__)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    started = time.perf_counter()
+    await run_in_threadpool(run_startup_hooks)
+    timings["startup.total"] = time.perf_counter() - started
+    timings["ready_since_start"] = time.perf_counter() - PROCESS_STARTED
+    print(f"🚀 IGClone worker {os.getpid()} ready:",
+          ", ".join(f"{k}={v * 1000:.1f}ms" for k, v in timings.items()))
+    yield
+    await run_in_threadpool(run_shutdown_hooks)
@@ -0,0 +1,140 @@
+# app/core/pubsub.py
+"""
+In-process publish/subscribe for real-time post updates.
+
+Publishers are ordinary (sync) route handlers running in the threadpool;
+subscribers are WebSocket/SSE connections on the event loop. publish() is
+thread-safe and hands events to the loop with call_soon_threadsafe.
+
+Every subscriber owns a bounded mailbox keyed by a coalescing key: a burst
+of like updates for one post collapses into the latest count, while each
+new comment keeps its own slot. A subscriber whose mailbox overflows, or
+whose socket does not drain within REALTIME_SEND_TIMEOUT_SECONDS, is
+evicted so one slow client can never hold memory or stall the others.
+
+Scope is a single worker process: with several workers each one only
+reaches the connections it accepted itself.
+"""
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Set
+
+from app.core.config import REALTIME_COALESCE_SECONDS, REALTIME_MAX_PENDING
+
+
+class SlowConsumer(Exception):
+    pass
+
+
+class Subscription:
+    def __init__(self, broker: "Broker", topics: List[str], max_pending: int = REALTIME_MAX_PENDING):
+        self.broker = broker
+        self.topics = topics
+        self.max_pending = max_pending
+        self.pending: "OrderedDict[Hashable, dict]" = OrderedDict()
+        self.wakeup = asyncio.Event()
+        self.evicted = False
+        self.coalesced = 0
+
+    def offer(self, key: Hashable, event: dict) -> None:
+        # Runs on the event loop
+        if self.evicted:
+            return
+        if key in self.pending:
+            self.coalesced += 1
+        elif len(self.pending) >= self.max_pending:
+            self.evict()
+            return
+        self.pending[key] = event
+        self.wakeup.set()
+
+    def evict(self) -> None:
+        self.evicted = True
+        self.broker.metrics["evicted"] += 1
+        self.wakeup.set()
+
+    async def next_batch(self, timeout: Optional[float] = None,
+                         coalesce: float = REALTIME_COALESCE_SECONDS) -> List[dict]:
+        """Wait for events, then linger `coalesce` seconds so bursts merge into one send."""
+        if not self.pending:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        if self.evicted:
+            raise SlowConsumer()
+        if coalesce:
+            await asyncio.sleep(coalesce)
+        self.wakeup.clear()
+        batch = list(self.pending.values())
+        self.pending.clear()
+        return batch
+
+    def close(self) -> None:
+        self.broker.unsubscribe(self)
+
+
+class Broker:
+    def __init__(self):
+        self._topics: Dict[str, Set[Subscription]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self.metrics = {"published": 0, "delivered": 0, "evicted": 0}
+
+    def subscribe(self, topics: List[str]) -> Subscription:
+        self._loop = asyncio.get_running_loop()
+        sub = Subscription(self, topics)
+        with self._lock:
+            for topic in topics:
+                self._topics.setdefault(topic, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            for topic in sub.topics:
+                subs = self._topics.get(topic)
+                if subs is not None:
+                    subs.discard(sub)
+                    if not subs:
+                        del self._topics[topic]
+
+    def has_subscribers(self, topic: str) -> bool:
+        # Lets publishers skip building payloads (e.g. a COUNT query) nobody will read
+        return topic in self._topics
+
+    def connections(self) -> int:
+        with self._lock:
+            return len({sub for subs in self._topics.values() for sub in subs})
+
+    def publish(self, topic: str, key: Hashable, event: Dict[str, Any]) -> None:
+        """Safe to call from any thread."""
+        if topic not in self._topics or self._loop is None:
+            return
+        self.metrics["published"] += 1
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._fan_out(topic, key, event)
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._fan_out, topic, key, event)
+        except RuntimeError:
+            # Loop already closed (shutdown); nobody is listening anymore
+            pass
+
+    def _fan_out(self, topic: str, key: Hashable, event: dict) -> None:
+        with self._lock:
+            subs = list(self._topics.get(topic, ()))
+        for sub in subs:
+            sub.offer(key, event)
+        self.metrics["delivered"] += len(subs)
+
+
+broker = Broker()
+
+
+def post_topic(post_id: int) -> str:
+    return f"post:{post_id}"
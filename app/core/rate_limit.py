@@ -0,0 +1,192 @@
+# app/core/rate_limit.py
+import math
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+
+from app.core.auth_utils import decode_access_token
+from app.core.config import RATE_LIMIT_ENABLED, RATE_LIMIT_STORE_PATH, RATE_LIMIT_TRUST_FORWARDED
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    name: str
+    rate: float       # tokens refilled per second
+    capacity: int     # burst size
+    key: str = "ip"   # "ip" or "user"
+
+
+# Per-route policies. bcrypt routes are keyed by IP because there is no user
+# yet; write routes are keyed by the token's user id, falling back to IP.
+POLICIES = {
+    "login": RateLimitPolicy("login", rate=10 / 60, capacity=10, key="ip"),
+    "signup": RateLimitPolicy("signup", rate=5 / 3600, capacity=5, key="ip"),
+    "like": RateLimitPolicy("like", rate=2, capacity=30, key="user"),
+    "comment": RateLimitPolicy("comment", rate=0.5, capacity=10, key="user"),
+    "follow": RateLimitPolicy("follow", rate=0.5, capacity=20, key="user"),
+    "batch": RateLimitPolicy("batch", rate=0.2, capacity=10, key="user"),
+    "export": RateLimitPolicy("export", rate=1 / 3600, capacity=3, key="user"),
+}
+
+
+class MemoryBucketStore:
+    """Token buckets for a single process. Every check is O(1)."""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: float, capacity: int, cost: float = 1) -> Tuple[bool, float, float]:
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - last) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            # Forget the least recently seen clients; a forgotten bucket is full again
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        retry_after = 0.0 if allowed else (cost - tokens) / rate
+        return allowed, retry_after, tokens
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+class SQLiteBucketStore:
+    """
+    Token buckets shared by all workers on one host through a local SQLite
+    file in WAL mode. One short write transaction per check.
+
+    Checks run on the event loop, so a check that can't get the write lock
+    within BUSY_TIMEOUT_SECONDS is refused (429) instead of stalling the
+    worker: that only happens under the kind of burst the limits are for.
+    """
+    BUSY_TIMEOUT_SECONDS = 0.05
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("CREATE TABLE IF NOT EXISTS buckets "
+                     "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            # The longer timeout above is for workers setting up at the same time
+            conn.execute(f"PRAGMA busy_timeout={int(self.BUSY_TIMEOUT_SECONDS * 1000)}")
+            self._local.conn = conn
+        return conn
+
+    def take(self, key: str, rate: float, capacity: int, cost: float = 1) -> Tuple[bool, float, float]:
+        now = time.time()
+        conn = self._conn()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+        except sqlite3.OperationalError:
+            # Locked past the busy timeout
+            return False, 1.0, 0.0
+        try:
+            row = conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+            tokens, last = row if row else (capacity, now)
+            tokens = min(capacity, tokens + max(0.0, now - last) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            conn.execute("INSERT INTO buckets (key, tokens, updated) VALUES (?, ?, ?) "
+                         "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                         (key, tokens, now))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        retry_after = 0.0 if allowed else (cost - tokens) / rate
+        return allowed, retry_after, tokens
+
+    def reset(self) -> None:
+        self._conn().execute("DELETE FROM buckets")
+
+
+class RateLimiter:
+    def __init__(self, store=None, enabled: bool = RATE_LIMIT_ENABLED):
+        self.store = store or (SQLiteBucketStore(RATE_LIMIT_STORE_PATH) if RATE_LIMIT_STORE_PATH
+                               else MemoryBucketStore())
+        self.enabled = enabled
+
+    def check(self, policy: RateLimitPolicy, client_key: str, cost: int = 1) -> None:
+        if not self.enabled:
+            return
+        allowed, retry_after, remaining = self.store.take(
+            f"{policy.name}:{client_key}", policy.rate, policy.capacity, cost)
+        if not allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests, slow down.",
+                headers={
+                    "Retry-After": str(max(1, math.ceil(retry_after))),
+                    "X-RateLimit-Limit": str(policy.capacity),
+                    "X-RateLimit-Remaining": "0",
+                })
+
+
+limiter = RateLimiter()
+
+
+def client_ip(request: Request) -> str:
+    if RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",", 1)[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def token_user_id(request: Request) -> Optional[str]:
+    # Only verifies the JWT signature; no DB lookup happens here
+    token = request.headers.get("authorization")
+    if not token:
+        return None
+    if token.startswith("Bearer "):
+        token = token[len("Bearer "):]
+    payload = decode_access_token(token)
+    return str(payload["sub"]) if payload and "sub" in payload else None
+
+
+def charge_user(policy_name: str, user_id: int, cost: int) -> None:
+    """
+    Take `cost` tokens from a user-keyed policy inside a route, e.g. once per
+    operation a POST /batch carries; 400 if the cost can never fit the bucket.
+    """
+    policy = POLICIES[policy_name]
+    if cost > policy.capacity:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"At most {policy.capacity} {policy_name} operations per request")
+    limiter.check(policy, f"u{user_id}", cost)
+
+
+def rate_limit(policy_name: str):
+    policy = POLICIES[policy_name]
+
+    # async so the check runs on the event loop before the threadpool,
+    # the session or bcrypt are ever touched
+    async def dependency(request: Request):
+        key = None
+        if policy.key == "user":
+            user_id = token_user_id(request)
+            key = f"u{user_id}" if user_id else None
+        limiter.check(policy, key or f"ip{client_ip(request)}")
+
+    return dependency
@@ -0,0 +1,122 @@
+# app/core/singleflight.py
+"""
+Request coalescing ("single flight") for identical concurrent reads.
+
+When many requests ask for the same thing at once (followers opening a
+celebrity's new post), the first one runs the query and everyone arriving
+while it is in flight waits for that execution and gets its result,
+instead of running the same queries again. Nothing is kept afterwards: a
+call that starts after the execution finished runs its own, so this never
+serves anything older than a read that was already in progress. (A caller
+whose own write committed while that read was running may still see the
+state from before it.)
+
+Only the viewer-independent part of a route is coalesced, keyed on the
+query and its normalized parameters; authorization and viewer-specific
+fields are still computed per caller from the shared result, which is
+therefore treated as read-only: rows, tuples or freshly built models, never
+ORM instances bound to the leader's session.
+
+Works from sync routes (threadpool threads block on the shared future) and
+async ones (the leader runs the query in the threadpool, followers await
+without blocking the loop). A follower that has waited
+SINGLE_FLIGHT_MAX_WAIT_SECONDS gives up and runs the query itself, so a
+stuck leader, or a threadpool filled with followers of an async leader
+that never got a thread, can't wedge anyone. Per worker process.
+"""
+import asyncio
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, Hashable, TypeVar
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import SINGLE_FLIGHT_ENABLED, SINGLE_FLIGHT_MAX_WAIT_SECONDS
+
+T = TypeVar("T")
+
+# name -> SingleFlight, for the stats endpoint
+flights: Dict[str, "SingleFlight"] = {}
+
+
+class SingleFlight:
+    def __init__(self, name: str, max_wait: float = SINGLE_FLIGHT_MAX_WAIT_SECONDS):
+        self.name = name
+        self.max_wait = max_wait
+        self.enabled = SINGLE_FLIGHT_ENABLED
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        # calls = executions + shared + fallbacks
+        self.metrics = {"calls": 0, "executions": 0, "shared": 0, "fallbacks": 0, "errors": 0}
+        flights[name] = self
+
+    def _join(self, key: Hashable):
+        """(future, True if this caller has to run the query)."""
+        with self._lock:
+            self.metrics["calls"] += 1
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+            future = self._calls[key] = Future()
+            self.metrics["executions"] += 1
+            return future, True
+
+    def _settle(self, key: Hashable, future: Future, fn: Callable[[], T]) -> T:
+        try:
+            result = fn()
+        except BaseException as e:
+            with self._lock:
+                self._calls.pop(key, None)
+                self.metrics["errors"] += 1
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._calls.pop(key, None)
+        future.set_result(result)
+        return result
+
+    def _count(self, metric: str) -> None:
+        with self._lock:
+            self.metrics[metric] += 1
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """Run fn(), or wait for the run already in flight for `key` and return its result (or raise its error)."""
+        if not self.enabled:
+            return fn()
+        future, leader = self._join(key)
+        if leader:
+            return self._settle(key, future, fn)
+        try:
+            result = future.result(timeout=self.max_wait)
+        except FutureTimeoutError:
+            self._count("fallbacks")
+            return fn()
+        self._count("shared")
+        return result
+
+    async def do_async(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """do() for async routes: fn (blocking) runs in the threadpool, followers await it on the loop."""
+        if not self.enabled:
+            return await run_in_threadpool(fn)
+        future, leader = self._join(key)
+        if leader:
+            return await run_in_threadpool(self._settle, key, future, fn)
+        try:
+            # shield: a follower timing out must not cancel the leader's future
+            result = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), self.max_wait)
+        except asyncio.TimeoutError:
+            self._count("fallbacks")
+            return await run_in_threadpool(fn)
+        self._count("shared")
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            metrics = dict(self.metrics, in_flight=len(self._calls))
+        # Share of calls that were answered by someone else's execution
+        metrics["coalescing_ratio"] = round(metrics["shared"] / metrics["calls"], 4) if metrics["calls"] else 0.0
+        return metrics
+
+
+def stats() -> dict:
+    return {name: flight.stats() for name, flight in flights.items()}
@@ -0,0 +1,104 @@
+# app/core/sketches.py
+"""
+Probabilistic counters that trade a bounded error for a fixed memory footprint.
+"""
+import hashlib
+import math
+from typing import Iterable, Optional
+
+MASK64 = (1 << 64) - 1
+
+
+def hash64(value) -> int:
+    return int.from_bytes(hashlib.blake2b(str(value).encode(), digest_size=8).digest(), "big")
+
+
+def mix64(key: int) -> int:
+    """SplitMix64 finalizer: a well-spread 64-bit hash of an integer, much cheaper than hash64."""
+    key = (key + 0x9E3779B97F4A7C15) & MASK64
+    key = ((key ^ (key >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    key = ((key ^ (key >> 27)) * 0x94D049BB133111EB) & MASK64
+    return key ^ (key >> 31)
+
+
+class HyperLogLog:
+    """
+    Approximate distinct counter (Flajolet et al.) with 2**precision one-byte
+    registers: precision 10 is 1 KiB per sketch with ~3.2% standard error
+    (1.04 / sqrt(1024)). Sketches of equal precision merge losslessly by
+    taking the register-wise max, so per-worker sketches can be combined in
+    the database.
+    """
+    __slots__ = ("precision", "registers")
+
+    def __init__(self, precision: int = 10, registers: Optional[bytes] = None):
+        self.precision = precision
+        size = 1 << precision
+        if registers is not None and len(registers) != size:
+            raise ValueError(f"expected {size} registers, got {len(registers)}")
+        self.registers = bytearray(registers) if registers is not None else bytearray(size)
+
+    def add(self, value) -> None:
+        h = hash64(value)
+        index = h >> (64 - self.precision)
+        remaining_bits = 64 - self.precision
+        rest = h & ((1 << remaining_bits) - 1)
+        # Position of the leftmost 1-bit in the remaining bits
+        rank = remaining_bits - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.precision != self.precision:
+            raise ValueError("cannot merge sketches of different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Small-range correction: linear counting over empty registers
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.registers)
+
+
+class BloomFilter:
+    """
+    Set membership for integer keys with false positives but no false
+    negatives. For `capacity` keys at `error_rate` it takes
+    m = -n ln p / (ln 2)^2 bits (1.2 bytes per key at 1%) and k = m/n ln 2
+    probes, derived by double hashing from one mix64 of the key (Kirsch &
+    Mitzenmacher). Adding more than `capacity` keys keeps it correct but
+    raises the false-positive rate. Keys can't be removed: rebuild instead.
+    """
+    __slots__ = ("size", "hashes", "bits", "count")
+
+    def __init__(self, capacity: int, error_rate: float = 0.01, keys: Iterable[int] = ()):
+        capacity = max(1, capacity)
+        self.size = max(64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+        for key in keys:
+            self.add(key)
+
+    def _positions(self, key: int):
+        h = mix64(key)
+        first, step = h & 0xFFFFFFFF, (h >> 32) | 1
+        size = self.size
+        return [(first + i * step) % size for i in range(self.hashes)]
+
+    def add(self, key: int) -> None:
+        bits = self.bits
+        for position in self._positions(key):
+            bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: int) -> bool:
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
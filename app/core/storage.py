@@ -0,0 +1,226 @@
+# app/core/storage.py
+import hashlib
+import os
+import shutil
+from abc import ABC, abstractmethod
+from mimetypes import guess_type
+from typing import BinaryIO, Iterator, Optional
+from uuid import uuid4
+
+import anyio
+from fastapi import UploadFile
+
+from app.core.config import (
+    UPLOAD_DIR, UPLOAD_URL_PREFIX, MEDIA_STORAGE_BACKEND, MEDIA_SHARD_DEPTH, MEDIA_PUBLIC_BASE_URL,
+    S3_ENDPOINT_URL, S3_BUCKET, S3_REGION, S3_ACCESS_KEY_ID, S3_SECRET_ACCESS_KEY,
+)
+from app.core.media import IMMUTABLE_CACHE_CONTROL
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def new_media_name(original_filename: Optional[str]) -> str:
+    ext = os.path.splitext(original_filename or "")[1].lower()
+    return f"{uuid4().hex}{ext}"
+
+
+def shard_key(name: str, depth: int = MEDIA_SHARD_DEPTH) -> str:
+    # "3f9a...e1.jpg" -> "a1/7c/3f9a...e1.jpg": two hex chars per level give
+    # 256 entries per directory level, so 2 levels keep leaf directories small
+    # up to hundreds of millions of files.
+    digest = hashlib.md5(name.encode(), usedforsecurity=False).hexdigest()
+    parts = [digest[i * 2:i * 2 + 2] for i in range(depth)]
+    return "/".join(parts + [name])
+
+
+def _discard(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class MediaStorage(ABC):
+    """Where uploaded media lives. Keys are relative, '/'-separated paths."""
+
+    @abstractmethod
+    async def save_upload(self, upload: UploadFile) -> str:
+        """Stream an upload into storage and return its public URL."""
+
+    @abstractmethod
+    def save_fileobj(self, fileobj: BinaryIO, key: str) -> str:
+        ...
+
+    @abstractmethod
+    def copy_local_file(self, path: str, key: str) -> str:
+        """Copy an existing file from the flat uploads directory into storage."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def iter_chunks(self, key: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        """Read a stored file piecewise; FileNotFoundError if it is gone."""
+
+    @abstractmethod
+    def url_for(self, key: str) -> str:
+        ...
+
+    @abstractmethod
+    def key_for_url(self, url: str) -> Optional[str]:
+        ...
+
+
+class LocalStorage(MediaStorage):
+    def __init__(self, root: str = UPLOAD_DIR, url_prefix: str = UPLOAD_URL_PREFIX,
+                 depth: int = MEDIA_SHARD_DEPTH):
+        self.root = root
+        self.url_prefix = url_prefix.rstrip("/")
+        self.depth = depth
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.root, *key.split("/"))
+
+    def _prepare(self, key: str) -> str:
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    async def save_upload(self, upload: UploadFile) -> str:
+        key = shard_key(new_media_name(upload.filename), self.depth)
+        path = await anyio.to_thread.run_sync(self._prepare, key)
+        tmp_path = f"{path}.part"
+        try:
+            async with await anyio.open_file(tmp_path, "wb") as out:
+                while chunk := await upload.read(CHUNK_SIZE):
+                    await out.write(chunk)
+            # Never expose a half-written file under its final name
+            await anyio.to_thread.run_sync(os.replace, tmp_path, path)
+        except BaseException:
+            await anyio.to_thread.run_sync(_discard, tmp_path)
+            raise
+        return self.url_for(key)
+
+    def save_fileobj(self, fileobj: BinaryIO, key: str) -> str:
+        path = self._prepare(key)
+        with open(path, "wb") as out:
+            shutil.copyfileobj(fileobj, out, CHUNK_SIZE)
+        return self.url_for(key)
+
+    def copy_local_file(self, path: str, key: str) -> str:
+        target = self._prepare(key)
+        if not os.path.exists(target):
+            try:
+                # Same filesystem: a hard link costs no I/O
+                os.link(path, target)
+            except OSError:
+                shutil.copyfile(path, target)
+        return self.url_for(key)
+
+    def delete(self, key: str) -> None:
+        _discard(self.path_for(key))
+
+    def iter_chunks(self, key: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        with open(self.path_for(key), "rb") as f:
+            while chunk := f.read(chunk_size):
+                yield chunk
+
+    def url_for(self, key: str) -> str:
+        return f"{self.url_prefix}/{key}"
+
+    def key_for_url(self, url: str) -> Optional[str]:
+        prefix = f"{self.url_prefix}/"
+        return url[len(prefix):] if url.startswith(prefix) else None
+
+
+class S3Storage(MediaStorage):
+    def __init__(self, bucket: str = S3_BUCKET, endpoint_url: Optional[str] = S3_ENDPOINT_URL,
+                 public_base_url: str = MEDIA_PUBLIC_BASE_URL, depth: int = MEDIA_SHARD_DEPTH,
+                 client=None):
+        if client is None:
+            try:
+                import boto3
+                from boto3.s3.transfer import TransferConfig
+            except ImportError:
+                raise RuntimeError("MEDIA_STORAGE_BACKEND=s3 requires boto3 (pip install boto3)")
+            client = boto3.client(
+                "s3",
+                endpoint_url=endpoint_url,
+                region_name=S3_REGION,
+                aws_access_key_id=S3_ACCESS_KEY_ID,
+                aws_secret_access_key=S3_SECRET_ACCESS_KEY,
+            )
+            self.transfer_config = TransferConfig(multipart_threshold=8 * CHUNK_SIZE,
+                                                  multipart_chunksize=8 * CHUNK_SIZE)
+        else:
+            self.transfer_config = None
+        self.client = client
+        self.bucket = bucket
+        self.depth = depth
+        base = public_base_url or f"{(endpoint_url or 'https://s3.amazonaws.com').rstrip('/')}/{bucket}"
+        self.base_url = base.rstrip("/")
+
+    def _extra_args(self, key: str) -> dict:
+        return {
+            "ContentType": guess_type(key)[0] or "application/octet-stream",
+            "CacheControl": IMMUTABLE_CACHE_CONTROL,
+        }
+
+    def _upload(self, fileobj: BinaryIO, key: str) -> None:
+        kwargs = {"ExtraArgs": self._extra_args(key)}
+        if self.transfer_config is not None:
+            kwargs["Config"] = self.transfer_config
+        # upload_fileobj switches to a multipart upload above the threshold and
+        # reads the source in chunks, so the body is never fully buffered.
+        self.client.upload_fileobj(fileobj, self.bucket, key, **kwargs)
+
+    async def save_upload(self, upload: UploadFile) -> str:
+        key = shard_key(new_media_name(upload.filename), self.depth)
+        await upload.seek(0)
+        await anyio.to_thread.run_sync(self._upload, upload.file, key)
+        return self.url_for(key)
+
+    def save_fileobj(self, fileobj: BinaryIO, key: str) -> str:
+        self._upload(fileobj, key)
+        return self.url_for(key)
+
+    def copy_local_file(self, path: str, key: str) -> str:
+        with open(path, "rb") as f:
+            self._upload(f, key)
+        return self.url_for(key)
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def iter_chunks(self, key: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        try:
+            body = self.client.get_object(Bucket=self.bucket, Key=key)["Body"]
+        except self.client.exceptions.NoSuchKey:
+            raise FileNotFoundError(key)
+        try:
+            yield from body.iter_chunks(chunk_size)
+        finally:
+            body.close()
+
+    def url_for(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+    def key_for_url(self, url: str) -> Optional[str]:
+        prefix = f"{self.base_url}/"
+        return url[len(prefix):] if url.startswith(prefix) else None
+
+
+_storage: Optional[MediaStorage] = None
+
+
+def get_storage() -> MediaStorage:
+    global _storage
+    if _storage is None:
+        if MEDIA_STORAGE_BACKEND == "s3":
+            _storage = S3Storage()
+        elif MEDIA_STORAGE_BACKEND == "local":
+            _storage = LocalStorage()
+        else:
+            raise RuntimeError(f"Unknown MEDIA_STORAGE_BACKEND {MEDIA_STORAGE_BACKEND!r}")
+    return _storage
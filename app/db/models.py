@@ -1,5 +1,5 @@
 # app/db/models.py
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime, func, UniqueConstraint
+from sqlalchemy import Column, Integer, BigInteger, String, ForeignKey, Text, DateTime, LargeBinary, func, UniqueConstraint, Index, text
 from sqlalchemy.orm import relationship
 from app.db.database import Base
 from datetime import datetime
@@ -11,11 +11,17 @@ class User(Base):
     name = Column(String, index=True)
     email = Column(String, unique=True, index=True)
     password = Column(String, nullable=False)
+    avatar_url = Column(String, nullable=True)
+    # Null for accounts created before migration 3f8a6c1d2e75
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=True)
 
     # One-to-many relationship with posts
     posts = relationship("Post", back_populates="user", cascade="all, delete")
 
 class Post(Base):
+    # On PostgreSQL posts, comments and likes are partitioned (migration 199d71e7f290):
+    # the primary keys include the partition key and the post_id foreign keys are
+    # not enforced there, so deleting a post has to remove its rows explicitly.
     __tablename__ = "posts"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -37,6 +43,25 @@ class Follow(Base):
 
     __table_args__ = (UniqueConstraint("follower_id", "following_id", name="unique_follow"),)
 
+class Block(Base):
+    """user_id blocked target_id: neither sees the other's posts or comments, or finds the other in search."""
+    __tablename__ = "blocks"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    target_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Who blocked a user: loaded with their own blocks (app/services/blocks.py)
+    __table_args__ = (Index("ix_blocks_target_id", "target_id"),)
+
+class Mute(Base):
+    """user_id muted target_id: target's posts and comments are hidden from user_id only."""
+    __tablename__ = "mutes"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    target_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
 class Comment(Base):
     __tablename__ = "comments"
 
@@ -52,6 +77,127 @@ class Like(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), nullable=False)
+    # Indexed for the trending engine's reload of recent likes
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
 
     __table_args__ = (UniqueConstraint("user_id", "post_id", name="unique_like"),)
 
+class Activity(Base):
+    """Append-only notification log, one row per event, read per recipient newest-first."""
+    __tablename__ = "activities"
+
+    id = Column(Integer, primary_key=True)
+    recipient_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    actor_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    verb = Column(String(16), nullable=False)  # like, comment, follow
+    post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Keyset pagination: WHERE recipient_id = ? AND id < ? ORDER BY id DESC
+    __table_args__ = (Index("ix_activities_recipient_id_id", "recipient_id", "id"),)
+
+class PostStats(Base):
+    """View counters flushed in batches by app/services/impressions.py, one row per viewed post."""
+    __tablename__ = "post_stats"
+
+    post_id = Column(Integer, primary_key=True)
+    views = Column(BigInteger, nullable=False, default=0)
+    unique_viewers = Column(Integer, nullable=False, default=0)
+    # HyperLogLog registers (app/core/sketches.py), merged on every flush
+    viewers_hll = Column(LargeBinary, nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class PostTag(Base):
+    """Inverted index from #hashtag to posts; created_at/user_id are copied from the post for the tag feed."""
+    __tablename__ = "post_tags"
+
+    tag = Column(String(100), primary_key=True)
+    post_id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+
+    # Keyset pagination: WHERE tag = ? AND (created_at, post_id) < (?, ?) ORDER BY created_at DESC, post_id DESC
+    __table_args__ = (Index("ix_post_tags_tag_created_at_post_id", "tag", "created_at", "post_id"),)
+
+class PostMention(Base):
+    __tablename__ = "post_mentions"
+
+    mention = Column(String(100), primary_key=True)
+    post_id = Column(Integer, primary_key=True)
+    # Set when the handle matches exactly one user's name
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (Index("ix_post_mentions_mention_created_at_post_id", "mention", "created_at", "post_id"),)
+
+class TagCount(Base):
+    """Posts per tag, kept up to date as posts are created, edited and deleted."""
+    __tablename__ = "tag_counts"
+
+    tag = Column(String(100), primary_key=True)
+    post_count = Column(Integer, nullable=False, default=0)
+
+class Job(Base):
+    """Deferred work, claimed with FOR UPDATE SKIP LOCKED by app/jobs/worker.py (see app/services/queue.py)."""
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(64), nullable=False)
+    payload = Column(Text, nullable=False)  # JSON of the handler's payload model
+    priority = Column(Integer, nullable=False, default=0)  # lower runs first
+    status = Column(String(16), nullable=False, default="queued")  # queued, running, done, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False)
+    run_at = Column(DateTime(timezone=True), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    locked_by = Column(String(64), nullable=True)
+    last_error = Column(Text, nullable=True)
+    # Due -> picked up, and run time, of the last attempt
+    wait_ms = Column(Integer, nullable=True)
+    run_ms = Column(Integer, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # Claim order; only queued jobs are indexed, so finished ones don't slow the claim down
+        Index("ix_jobs_queued", "priority", "run_at", "id",
+              postgresql_where=text("status = 'queued'"), sqlite_where=text("status = 'queued'")),
+        Index("ix_jobs_status_finished_at", "status", "finished_at"),
+    )
+
+class DataExport(Base):
+    """A user's personal data export, written to EXPORT_DIR by the export_user_data job."""
+    __tablename__ = "data_exports"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    format = Column(String(16), nullable=False)  # ndjson, zip
+    status = Column(String(16), nullable=False, default="pending")  # pending, ready
+    job_id = Column(Integer, nullable=True)
+    size = Column(BigInteger, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+class MetricRollup(Base):
+    """
+    Posts, likes, comments and signups per hour and per day, maintained by
+    app/jobs/rollup_metrics.py. user_id 0 holds the all-users total.
+    """
+    __tablename__ = "metric_rollups"
+
+    metric = Column(String(32), primary_key=True)
+    granularity = Column(String(8), primary_key=True)  # hour, day
+    user_id = Column(Integer, primary_key=True)  # no FK: history outlives deleted accounts
+    bucket = Column(DateTime(timezone=True), primary_key=True)  # UTC start of the hour/day
+    count = Column(BigInteger, nullable=False, default=0)
+
+    # Top users: WHERE metric = ? AND granularity = 'day' AND bucket >= ? GROUP BY user_id
+    __table_args__ = (Index("ix_metric_rollups_metric_granularity_bucket", "metric", "granularity", "bucket"),)
+
+class RollupWatermark(Base):
+    """Highest source row id already counted into metric_rollups, per source table."""
+    __tablename__ = "rollup_watermarks"
+
+    source = Column(String(32), primary_key=True)
+    last_id = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,104 @@
+# app/db/partitions.py
+"""
+Monthly partition maintenance for the PostgreSQL posts and comments tables
+(see migration 199d71e7f290). likes is hash-partitioned by post_id and needs
+no upkeep.
+
+Partitions are named <table>_pYYYY_MM and cover [first of month, first of
+next month). Future months are created ahead of time so the DEFAULT
+partition stays empty (a non-empty default blocks creating a partition for
+the same range). Cold months are detached and moved to an archive schema:
+they disappear from every query on the parent table but stay in the
+database until someone dumps and drops them.
+"""
+import re
+from datetime import date, datetime
+from typing import List
+
+from sqlalchemy import delete, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.db.models import Activity, Comment, Like, PostStats
+
+MONTHLY_TABLES = ("posts", "comments")
+
+_PARTITION_NAME = re.compile(r"_p(\d{4})_(\d{2})$")
+
+
+def add_months(month: date, n: int) -> date:
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_start(ts: datetime) -> datetime:
+    """
+    Lower bound for a "not older than `ts`" filter on a monthly table: prunes
+    the same partitions as `ts` itself and cannot miss rows stored with a
+    coarser timestamp (SQLite's CURRENT_TIMESTAMP has no fractional seconds).
+    """
+    return ts.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+
+def is_partitioned(conn: Connection, table: str) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    return bool(conn.execute(text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:t)"),
+                             {"t": table}).scalar())
+
+
+def month_partitions(conn: Connection, table: str) -> List[date]:
+    """Months that currently have an attached partition, oldest first."""
+    names = conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(:t)"
+    ), {"t": table}).scalars()
+    months = []
+    for name in names:
+        match = _PARTITION_NAME.search(name)
+        if match:
+            months.append(date(int(match.group(1)), int(match.group(2)), 1))
+    return sorted(months)
+
+
+def create_future_partitions(conn: Connection, table: str, months_ahead: int) -> List[str]:
+    existing = set(month_partitions(conn, table))
+    month = date.today().replace(day=1)
+    created = []
+    for _ in range(months_ahead + 1):
+        if month not in existing:
+            name = partition_name(table, month)
+            conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+            ))
+            created.append(name)
+        month = add_months(month, 1)
+    return created
+
+
+def archive_cold_partitions(conn: Connection, table: str, keep_months: int, schema: str,
+                            dry_run: bool = False) -> List[str]:
+    """Detach months older than `keep_months` (counting the current one) into `schema`."""
+    cutoff = add_months(date.today().replace(day=1), -(keep_months - 1))
+    cold = [partition_name(table, month) for month in month_partitions(conn, table) if month < cutoff]
+    if dry_run or not cold:
+        return cold
+    conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {schema}"))
+    for name in cold:
+        conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+        conn.execute(text(f"ALTER TABLE {name} SET SCHEMA {schema}"))
+    return cold
+
+
+def delete_post_dependents(db: Session, post_ids) -> None:
+    """
+    Stand-in for ON DELETE CASCADE on post_id, which partitioned tables can't
+    reference. Runs in the caller's transaction, before the posts are deleted.
+    """
+    for model in (Like, Comment, Activity, PostStats):
+        db.execute(delete(model).where(model.post_id.in_(post_ids)))
@@ -0,0 +1,185 @@
+# app/jobs/gc_uploads.py
+"""
+Mark-and-sweep garbage collector for orphaned files in the uploads directory.
+
+Mark:  stream every non-null posts.image_url into a compact in-memory set.
+Sweep: walk the uploads directory with os.scandir and remove (or quarantine)
+       every file that is not referenced and is older than the grace period.
+
+Run once:        python -m app.jobs.gc_uploads
+Run as a daemon: python -m app.jobs.gc_uploads --interval 3600
+"""
+import argparse
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Set, Union
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import UPLOAD_DIR, UPLOAD_GC_GRACE_SECONDS, UPLOAD_GC_BATCH_SIZE
+from app.db.database import SessionLocal
+from app.db.models import Post
+
+
+@dataclass
+class GCReport:
+    referenced: int = 0
+    scanned: int = 0
+    kept: int = 0
+    skipped_recent: int = 0
+    removed_files: int = 0
+    removed_bytes: int = 0
+    errors: int = 0
+    duration_seconds: float = 0.0
+
+
+def compact_key(name: str) -> Union[bytes, str]:
+    # Uploaded files are named "<uuid4 hex><ext>". Storing the 16 raw bytes of
+    # the uuid instead of the full path string keeps the mark set small even
+    # with millions of posts; anything else falls back to the plain file name.
+    stem = os.path.splitext(os.path.basename(name))[0]
+    if len(stem) == 32:
+        try:
+            return bytes.fromhex(stem)
+        except ValueError:
+            pass
+    return os.path.basename(name)
+
+
+def mark_referenced(db: Session, batch_size: int = UPLOAD_GC_BATCH_SIZE) -> Set[Union[bytes, str]]:
+    stmt = (select(Post.image_url)
+            .where(Post.image_url.isnot(None))
+            .execution_options(yield_per=batch_size))
+
+    referenced = set()
+    for image_url in db.execute(stmt).scalars():
+        referenced.add(compact_key(image_url))
+    return referenced
+
+
+def iter_upload_batches(upload_dir: str, batch_size: int = UPLOAD_GC_BATCH_SIZE,
+                        skip_dirs: Optional[Set[str]] = None) -> Iterator[List[os.DirEntry]]:
+    # Iterative walk so nested directories never grow the Python stack, and
+    # entries are handed out in fixed-size batches so memory stays bounded no
+    # matter how many files live in a single directory.
+    skip_dirs = {os.path.abspath(d) for d in (skip_dirs or set())}
+    pending = [upload_dir]
+    batch = []
+    while pending:
+        current = pending.pop()
+        with os.scandir(current) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if os.path.abspath(entry.path) not in skip_dirs:
+                        pending.append(entry.path)
+                    continue
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                batch.append(entry)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+    if batch:
+        yield batch
+
+
+def sweep(upload_dir: str,
+          referenced: Set[Union[bytes, str]],
+          grace_seconds: int = UPLOAD_GC_GRACE_SECONDS,
+          batch_size: int = UPLOAD_GC_BATCH_SIZE,
+          quarantine_dir: Optional[str] = None,
+          dry_run: bool = False,
+          report: Optional[GCReport] = None) -> GCReport:
+    report = report or GCReport()
+    cutoff = time.time() - grace_seconds
+
+    if quarantine_dir and not dry_run:
+        os.makedirs(quarantine_dir, exist_ok=True)
+    skip_dirs = {quarantine_dir} if quarantine_dir else None
+
+    for batch in iter_upload_batches(upload_dir, batch_size, skip_dirs):
+        for entry in batch:
+            report.scanned += 1
+            if compact_key(entry.name) in referenced:
+                report.kept += 1
+                continue
+
+            try:
+                stat = entry.stat(follow_symlinks=False)
+            except FileNotFoundError:
+                continue
+
+            # Files newer than the grace period may belong to a post whose
+            # transaction has not committed yet.
+            if stat.st_mtime > cutoff:
+                report.skipped_recent += 1
+                continue
+
+            try:
+                if not dry_run:
+                    if quarantine_dir:
+                        shutil.move(entry.path, os.path.join(quarantine_dir, entry.name))
+                    else:
+                        os.remove(entry.path)
+                report.removed_files += 1
+                report.removed_bytes += stat.st_size
+            except OSError as e:
+                print("❌ Could not remove", entry.path, e)
+                report.errors += 1
+
+    return report
+
+
+def collect_garbage(upload_dir: str = UPLOAD_DIR,
+                    grace_seconds: int = UPLOAD_GC_GRACE_SECONDS,
+                    batch_size: int = UPLOAD_GC_BATCH_SIZE,
+                    quarantine_dir: Optional[str] = None,
+                    dry_run: bool = False) -> GCReport:
+    started = time.perf_counter()
+    report = GCReport()
+
+    if not os.path.isdir(upload_dir):
+        return report
+
+    db = SessionLocal()
+    try:
+        referenced = mark_referenced(db, batch_size)
+    finally:
+        db.close()
+    report.referenced = len(referenced)
+
+    sweep(upload_dir, referenced, grace_seconds, batch_size, quarantine_dir, dry_run, report)
+    report.duration_seconds = time.perf_counter() - started
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Remove upload files no post references anymore.")
+    parser.add_argument("--upload-dir", default=UPLOAD_DIR)
+    parser.add_argument("--grace-seconds", type=int, default=UPLOAD_GC_GRACE_SECONDS,
+                        help="Only collect files older than this")
+    parser.add_argument("--batch-size", type=int, default=UPLOAD_GC_BATCH_SIZE)
+    parser.add_argument("--quarantine-dir", default=None,
+                        help="Move orphaned files here instead of deleting them")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--interval", type=int, default=0,
+                        help="Repeat every N seconds instead of running once")
+    args = parser.parse_args(argv)
+
+    while True:
+        report = collect_garbage(args.upload_dir, args.grace_seconds, args.batch_size,
+                                 args.quarantine_dir, args.dry_run)
+        action = "would reclaim" if args.dry_run else "reclaimed"
+        print(f"🧹 Upload GC {action} {report.removed_files} files / {report.removed_bytes} bytes "
+              f"(scanned={report.scanned}, kept={report.kept}, recent={report.skipped_recent}, "
+              f"errors={report.errors}, {report.duration_seconds:.2f}s)")
+        if not args.interval:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
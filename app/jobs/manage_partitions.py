@@ -0,0 +1,51 @@
+# app/jobs/manage_partitions.py
+"""
+Partition manager for the monthly posts/comments partitions (PostgreSQL only).
+
+    python -m app.jobs.manage_partitions
+    python -m app.jobs.manage_partitions --archive-after-months 12 --dry-run
+    python -m app.jobs.manage_partitions --interval 86400
+"""
+import argparse
+import time
+
+from app.core.config import PARTITION_MONTHS_AHEAD, PARTITION_ARCHIVE_AFTER_MONTHS, PARTITION_ARCHIVE_SCHEMA
+from app.db.database import get_engine
+from app.db.partitions import MONTHLY_TABLES, is_partitioned, create_future_partitions, archive_cold_partitions
+
+
+def run_once(months_ahead: int, archive_after: int, schema: str, dry_run: bool):
+    with get_engine().begin() as conn:
+        for table in MONTHLY_TABLES:
+            if not is_partitioned(conn, table):
+                print(f"⏭️  {table} is not partitioned on this database, skipping")
+                continue
+            if not dry_run:
+                for name in create_future_partitions(conn, table, months_ahead):
+                    print(f"📅 Created {name}")
+            if archive_after:
+                verb = "Would archive" if dry_run else "Archived"
+                for name in archive_cold_partitions(conn, table, archive_after, schema, dry_run):
+                    print(f"🧊 {verb} {name} -> {schema}.{name}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Create upcoming monthly partitions and archive cold ones.")
+    parser.add_argument("--months-ahead", type=int, default=PARTITION_MONTHS_AHEAD)
+    parser.add_argument("--archive-after-months", type=int, default=PARTITION_ARCHIVE_AFTER_MONTHS,
+                        help="Detach partitions older than N months into the archive schema (0 = never)")
+    parser.add_argument("--archive-schema", default=PARTITION_ARCHIVE_SCHEMA)
+    parser.add_argument("--dry-run", action="store_true", help="Only list partitions that would be archived")
+    parser.add_argument("--interval", type=int, default=0,
+                        help="Repeat every N seconds instead of running once")
+    args = parser.parse_args(argv)
+
+    while True:
+        run_once(args.months_ahead, args.archive_after_months, args.archive_schema, args.dry_run)
+        if not args.interval:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# app/jobs/migrate_media.py
+"""
+Move files from the old flat uploads/ layout into the configured media storage
+(sharded local directories or S3) and rewrite posts.image_url to match.
+
+Posts are walked in id order, one batch per transaction. Files are copied
+first and the flat originals are only removed after the batch has committed,
+so the job can be stopped and restarted at any point: already migrated rows
+no longer match the flat "/uploads/<name>" pattern and are skipped.
+
+    python -m app.jobs.migrate_media --dry-run
+    python -m app.jobs.migrate_media --batch-size 500
+"""
+import argparse
+import os
+import time
+
+from sqlalchemy import select, update, bindparam
+
+from app.core.config import UPLOAD_DIR, UPLOAD_URL_PREFIX
+from app.core.storage import get_storage, shard_key
+from app.db.database import SessionLocal
+from app.db.models import Post
+
+
+def flat_upload_name(image_url: str):
+    prefix = f"{UPLOAD_URL_PREFIX}/"
+    if not image_url.startswith(prefix):
+        return None
+    name = image_url[len(prefix):]
+    return name if "/" not in name else None
+
+
+def migrate(batch_size: int = 500, dry_run: bool = False) -> dict:
+    storage = get_storage()
+    stats = {"posts_scanned": 0, "moved": 0, "missing": 0, "rewritten": 0}
+    started = time.perf_counter()
+    last_id = 0
+
+    db = SessionLocal()
+    try:
+        while True:
+            rows = db.execute(
+                select(Post.id, Post.image_url)
+                .where(Post.id > last_id, Post.image_url.like(f"{UPLOAD_URL_PREFIX}/%"))
+                .order_by(Post.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            updates = []
+            sources = set()
+            for post_id, image_url in rows:
+                stats["posts_scanned"] += 1
+                name = flat_upload_name(image_url)
+                if name is None:
+                    continue
+
+                source = os.path.join(UPLOAD_DIR, name)
+                key = shard_key(name)
+                if not os.path.exists(source):
+                    stats["missing"] += 1
+                    continue
+
+                if not dry_run:
+                    new_url = storage.copy_local_file(source, key)
+                else:
+                    new_url = storage.url_for(key)
+                stats["moved"] += 1
+                sources.add(source)
+                updates.append({"b_id": post_id, "b_image_url": new_url})
+
+            if updates and not dry_run:
+                # One executemany per batch instead of a flush per post
+                db.execute(
+                    update(Post.__table__)
+                    .where(Post.__table__.c.id == bindparam("b_id"))
+                    .values(image_url=bindparam("b_image_url")),
+                    updates,
+                )
+                db.commit()
+                for source in sources:
+                    os.remove(source)
+            stats["rewritten"] += len(updates)
+            print(f"📦 migrated up to post id {last_id} ({stats['moved']} files so far)")
+    finally:
+        db.close()
+
+    stats["duration_seconds"] = round(time.perf_counter() - started, 2)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Move flat uploads/ files into the media storage backend.")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args(argv)
+
+    stats = migrate(args.batch_size, args.dry_run)
+    print("✅ Media migration finished:", stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+# app/jobs/reindex_tags.py
+"""
+(Re)build post_tags, post_mentions and tag_counts from post content, e.g.
+after migration 0ab8f82b10d4 on a database with existing posts. Safe to
+re-run: each post's rows are diffed against its current content.
+
+    python -m app.jobs.reindex_tags
+    python -m app.jobs.reindex_tags --batch-size 2000 --after-id 150000
+"""
+import argparse
+
+from sqlalchemy import select
+
+from app.db.database import SessionLocal
+from app.db.models import Post
+from app.services.tags import index_post
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Index hashtags and mentions of existing posts.")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--after-id", type=int, default=0, help="Resume after this post id")
+    args = parser.parse_args(argv)
+
+    last_id = args.after_id
+    indexed = 0
+    while True:
+        db = SessionLocal()
+        try:
+            posts = db.execute(select(Post).where(Post.id > last_id)
+                               .order_by(Post.id).limit(args.batch_size)).scalars().all()
+            if not posts:
+                break
+            for post in posts:
+                index_post(db, post)
+            db.commit()
+            last_id = posts[-1].id
+            indexed += len(posts)
+        finally:
+            db.close()
+        print(f"🏷️  Indexed {indexed} posts (last id {last_id})")
+    print(f"✅ Done, {indexed} posts indexed")
+
+
+if __name__ == "__main__":
+    main()
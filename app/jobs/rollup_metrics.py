@@ -0,0 +1,54 @@
+# app/jobs/rollup_metrics.py
+"""
+Fold new posts, likes, comments and signups into the hourly/daily
+metric_rollups buckets (see app/services/rollups.py), and export the
+buckets for offline analysis.
+
+    python -m app.jobs.rollup_metrics
+    python -m app.jobs.rollup_metrics --interval 300
+    python -m app.jobs.rollup_metrics --export rollups.parquet
+    python -m app.jobs.rollup_metrics --export rollups.arrow --format arrow
+"""
+import argparse
+import time
+
+from app.core.config import ROLLUP_BATCH_SIZE, ROLLUP_HOURLY_RETENTION_DAYS
+from app.db.database import SessionLocal
+from app.services.rollups import roll_up, prune_hourly, write_columnar
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintain the analytics rollup tables.")
+    parser.add_argument("--batch-size", type=int, default=ROLLUP_BATCH_SIZE)
+    parser.add_argument("--hourly-retention-days", type=int, default=ROLLUP_HOURLY_RETENTION_DAYS)
+    parser.add_argument("--interval", type=int, default=0,
+                        help="Repeat every N seconds instead of running once")
+    parser.add_argument("--export", metavar="PATH", help="Write the rollups to PATH instead of updating them")
+    parser.add_argument("--format", choices=("parquet", "arrow"), default="parquet")
+    args = parser.parse_args(argv)
+
+    if args.export:
+        db = SessionLocal()
+        try:
+            rows = write_columnar(db, args.export, args.format)
+        finally:
+            db.close()
+        print(f"📦 Wrote {rows} rollup rows to {args.export}")
+        return
+
+    while True:
+        db = SessionLocal()
+        try:
+            counted = roll_up(db, batch_size=args.batch_size)
+            pruned = prune_hourly(db, args.hourly_retention_days)
+        finally:
+            db.close()
+        print("📊 Rolled up", ", ".join(f"{count} {metric}" for metric, count in counted.items()),
+              f"(pruned {pruned} hourly buckets)")
+        if not args.interval:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+# app/jobs/trim_activities.py
+"""
+Retention for the activity log.
+
+    python -m app.jobs.trim_activities
+    python -m app.jobs.trim_activities --retention-days 30 --interval 3600
+"""
+import argparse
+import time
+
+from app.core.config import ACTIVITY_RETENTION_DAYS
+from app.db.database import SessionLocal
+from app.services.activity import trim_activities
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Delete activity events older than the retention window.")
+    parser.add_argument("--retention-days", type=int, default=ACTIVITY_RETENTION_DAYS)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--interval", type=int, default=0,
+                        help="Repeat every N seconds instead of running once")
+    args = parser.parse_args(argv)
+
+    while True:
+        db = SessionLocal()
+        try:
+            removed = trim_activities(db, args.retention_days, args.batch_size)
+        finally:
+            db.close()
+        print(f"🧹 Trimmed {removed} activity events older than {args.retention_days} days")
+        if not args.interval:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
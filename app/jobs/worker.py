@@ -0,0 +1,135 @@
+# app/jobs/worker.py
+"""
+Background job workers (see app/services/queue.py): a pool of processes,
+each running a pool of threads that claim and run due jobs one at a time.
+
+    python -m app.jobs.worker
+    python -m app.jobs.worker --processes 4 --threads 8
+    python -m app.jobs.worker --kinds delete_media --threads 2
+    python -m app.jobs.worker --burst      # run what is due, then exit
+    python -m app.jobs.worker --stats      # queue depth and latency
+
+Threads suit I/O-bound handlers (storage, SQL); add processes for CPU-bound
+ones. Every thread holds a DB connection while it claims or runs a job, so
+keep --threads within DB_POOL_SIZE + DB_MAX_OVERFLOW. SIGTERM or SIGINT
+lets the jobs in hand finish, then exits.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from typing import List, Optional
+
+from app.core.config import JOB_WORKER_PROCESSES, JOB_WORKER_THREADS, JOB_POLL_SECONDS
+from app.db.database import SessionLocal
+from app.services import tasks  # noqa: F401  registers the handlers
+from app.services.queue import (claim_jobs, run_job, requeue_expired, purge_finished, queue_stats,
+                                metrics, worker_name)
+
+MAINTENANCE_SECONDS = 60
+
+
+def _work(index: int, kinds: Optional[List[str]], poll_seconds: float, burst: bool,
+          stop: threading.Event) -> None:
+    worker = worker_name(index)
+    while not stop.is_set():
+        claimed = []
+        try:
+            db = SessionLocal()
+            try:
+                claimed = claim_jobs(db, worker, kinds=kinds)
+            finally:
+                db.close()
+            for job in claimed:
+                run_job(job, worker)
+        except Exception as e:
+            print("❌ Job worker failed:", e)
+        if not claimed:
+            if burst:
+                return
+            stop.wait(poll_seconds)
+
+
+def _maintain() -> None:
+    db = SessionLocal()
+    try:
+        requeued = requeue_expired(db)
+        purged = purge_finished(db)
+    finally:
+        db.close()
+    if requeued or purged:
+        print(f"♻️  Requeued {requeued} jobs with expired leases, purged {purged} finished jobs")
+
+
+def run_pool(threads: int, kinds: Optional[List[str]], poll_seconds: float, burst: bool,
+             stop: threading.Event) -> None:
+    workers = [threading.Thread(target=_work, args=(i, kinds, poll_seconds, burst, stop),
+                                name=f"job-worker-{i}")
+               for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    next_maintenance = 0.0
+    while any(thread.is_alive() for thread in workers):
+        if time.monotonic() >= next_maintenance and not stop.is_set():
+            try:
+                _maintain()
+            except Exception as e:
+                print("❌ Job maintenance failed:", e)
+            next_maintenance = time.monotonic() + MAINTENANCE_SECONDS
+        time.sleep(0.5)
+
+
+def _process_main(threads: int, kinds: Optional[List[str]], poll_seconds: float, burst: bool) -> None:
+    stop = threading.Event()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *_: stop.set())
+    print(f"👷 Job worker {os.getpid()} started with {threads} threads")
+    run_pool(threads, kinds, poll_seconds, burst, stop)
+    print(f"✅ Job worker {os.getpid()} stopped:", json.dumps(metrics))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run background job workers.")
+    parser.add_argument("--processes", type=int, default=JOB_WORKER_PROCESSES)
+    parser.add_argument("--threads", type=int, default=JOB_WORKER_THREADS, help="Worker threads per process")
+    parser.add_argument("--kinds", type=lambda s: [k for k in s.split(",") if k], default=None,
+                        help="Comma-separated job kinds to run (default: all)")
+    parser.add_argument("--poll-seconds", type=float, default=JOB_POLL_SECONDS)
+    parser.add_argument("--burst", action="store_true", help="Exit once no job is due")
+    parser.add_argument("--stats", action="store_true", help="Print queue stats and exit")
+    args = parser.parse_args(argv)
+
+    if args.stats:
+        db = SessionLocal()
+        try:
+            print(json.dumps(queue_stats(db), indent=2))
+        finally:
+            db.close()
+        return
+
+    pool_args = (args.threads, args.kinds, args.poll_seconds, args.burst)
+    if args.processes <= 1:
+        _process_main(*pool_args)
+        return
+
+    processes = [multiprocessing.Process(target=_process_main, args=pool_args, name=f"job-worker-process-{i}")
+                 for i in range(args.processes)]
+    for process in processes:
+        process.start()
+
+    def forward(signum, frame):
+        for process in processes:
+            if process.is_alive():
+                process.terminate()  # SIGTERM: finish the current jobs, then exit
+
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, forward)
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
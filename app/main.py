@@ -1,24 +1,61 @@
 
 # app/main.py
-print("🚀 Starting IGClone FastAPI...")
-from fastapi import FastAPI
+import time
+_import_started = time.perf_counter()
+
+from app.core import lifecycle
+from fastapi import Depends, FastAPI
 from app.routes.auth_routes import router as auth_router
 from app.routes.user_routes import router as user_router
 from app.routes.post_routes import router as post_router
 from app.routes.comment_routes import router as comment_router
-from fastapi.staticfiles import StaticFiles
+from app.routes.media_routes import router as media_router
+from app.routes.batch_routes import router as batch_router
+from app.routes.activity_routes import router as activity_router
+from app.routes.realtime_routes import router as realtime_router
+from app.routes.tag_routes import router as tag_router
+from app.routes.job_routes import router as job_router
+from app.routes.export_routes import router as export_router
+from app.routes.admin_routes import router as admin_router
+from app.routes.home_routes import router as home_router
+from app.core.config import UPLOAD_URL_PREFIX
+from app.core.admission import AdmissionMiddleware, controller as admission
+from app.core.dependencies import get_admin_user
+from app.core import singleflight
 
-app = FastAPI()
+app = FastAPI(lifespan=lifecycle.lifespan)
+app.add_middleware(AdmissionMiddleware)
 
 # Include the routers
 app.include_router(auth_router, prefix="/auth", tags=["Auth"])
 app.include_router(user_router, prefix="/users", tags=["Users"])
 app.include_router(post_router, prefix="/posts", tags=["Posts"])
 app.include_router(comment_router)
+app.include_router(batch_router, tags=["Batch"])
+app.include_router(activity_router)
+app.include_router(realtime_router)
+app.include_router(tag_router)
+app.include_router(job_router)
+app.include_router(export_router)
+app.include_router(admin_router)
+app.include_router(home_router)
 
 # Health check route
 @app.get("/")
 def read_root():
     return {"message": "Welcome to IGClone API"}
 
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+# Concurrency limits, queues and rejections per route class (this worker only)
+@app.get("/admission/stats", include_in_schema=False, dependencies=[Depends(get_admin_user)])
+def get_admission_stats():
+    return admission.stats()
+
+# Calls, executions and coalescing ratio of each single-flight read (this worker only)
+@app.get("/singleflight/stats", include_in_schema=False, dependencies=[Depends(get_admin_user)])
+def get_singleflight_stats():
+    return singleflight.stats()
+
+# Uploaded media (immutable caching, Range, zero-copy / X-Accel-Redirect)
+app.include_router(media_router, prefix=UPLOAD_URL_PREFIX, tags=["Media"])
+
+lifecycle.timings["import.app"] = time.perf_counter() - _import_started
@@ -0,0 +1,22 @@
+# app/routes/activity_routes.py
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from app.db.database import get_db
+from app.db.models import User
+from app.schemas.activity_schemas import ActivityPage
+from app.core.dependencies import get_current_user
+from app.services.activity import read_activity_page
+from typing import Optional
+
+router = APIRouter(prefix="/activity", tags=["Activity"])
+
+
+@router.get("/", response_model=ActivityPage)
+def get_activity(
+        cursor: Optional[int] = Query(None, ge=1),
+        limit: int = Query(20, ge=1, le=50),
+        db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+):
+    items, next_cursor = read_activity_page(db, current_user.id, limit, cursor)
+    return ActivityPage(items=items, next_cursor=next_cursor)
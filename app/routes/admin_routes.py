@@ -0,0 +1,71 @@
+# app/routes/admin_routes.py
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+from starlette.background import BackgroundTask
+
+from app.core.dependencies import get_admin_user
+from app.db.database import get_db
+from app.schemas.admin_schemas import MetricBucket, MetricSeries, TopUser
+from app.services.rollups import (METRICS, ACTIVITY_METRICS, ColumnarExportUnavailable, bucket_start,
+                                  metric_series, top_users, write_columnar)
+from app.services.user_cache import user_cache
+
+# Everything here reads metric_rollups only, never the source tables
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(get_admin_user)])
+
+
+@router.get("/metrics/top-users", response_model=List[TopUser])
+def get_top_users(
+        metric: str = Query("activity", regex="^(activity|posts|likes|comments)$"),
+        days: int = Query(7, ge=1, le=366),
+        limit: int = Query(20, ge=1, le=100),
+        db: Session = Depends(get_db)
+):
+    metrics = ACTIVITY_METRICS if metric == "activity" else (metric,)
+    # Today counts as the first of the `days` days
+    since = datetime.now(timezone.utc) - timedelta(days=days - 1)
+    ranked = top_users(db, metrics, since, limit)
+    cards = user_cache.get_many(db, [user_id for user_id, _ in ranked])
+    return [TopUser(user_id=user_id, name=cards[user_id]["name"] if user_id in cards else None, count=count)
+            for user_id, count in ranked]
+
+
+@router.get("/metrics/export")
+def export_metrics(format: str = Query("parquet", regex="^(parquet|arrow)$"), db: Session = Depends(get_db)):
+    """All rollup buckets as Parquet or an Arrow IPC file, for offline analysis."""
+    fd, path = tempfile.mkstemp(suffix=f".{format}")
+    try:
+        with os.fdopen(fd, "wb") as sink:
+            write_columnar(db, sink, format)
+    except ColumnarExportUnavailable as e:
+        os.remove(path)
+        raise HTTPException(status_code=501, detail=str(e))
+    except Exception:
+        os.remove(path)
+        raise
+    media_type = "application/vnd.apache.parquet" if format == "parquet" else "application/vnd.apache.arrow.file"
+    return FileResponse(path, media_type=media_type, filename=f"metric_rollups.{format}",
+                        background=BackgroundTask(os.remove, path))
+
+
+@router.get("/metrics/{metric}", response_model=MetricSeries)
+def get_metric(
+        metric: str,
+        granularity: str = Query("day", regex="^(hour|day)$"),
+        days: int = Query(30, ge=1, le=366),
+        db: Session = Depends(get_db)
+):
+    if metric not in METRICS:
+        raise HTTPException(status_code=404, detail="Unknown metric")
+    step = timedelta(days=1) if granularity == "day" else timedelta(hours=1)
+    # Up to and including the current (still filling) bucket
+    until = bucket_start(datetime.now(timezone.utc), granularity) + step
+    series = metric_series(db, metric, granularity, until - timedelta(days=days), until)
+    return MetricSeries(metric=metric, granularity=granularity, total=sum(count for _, count in series),
+                        buckets=[MetricBucket(bucket=bucket, count=count) for bucket, count in series])
@@ -7,12 +7,14 @@ from app.schemas.user_schemas import UserCreate, UserResponse
 from app.schemas.auth_schemas import LoginRequest, TokenResponse
 from app.core.auth_utils import hash_password, verify_password, create_access_token
 from app.core.dependencies import get_current_user
+from app.core.rate_limit import rate_limit
 
 
 router = APIRouter()
 
 
-@router.post("/signup", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
+@router.post("/signup", response_model=UserResponse, status_code=status.HTTP_201_CREATED,
+             dependencies=[Depends(rate_limit("signup"))])
 def register_user(user: UserCreate, db: Session = Depends(get_db)):
 
     # Check if user already exists
@@ -27,7 +29,8 @@ def register_user(user: UserCreate, db: Session = Depends(get_db)):
     new_user = User(
         name=user.name,
         email=user.email,
-        password=hashed_password
+        password=hashed_password,
+        avatar_url=user.avatar_url
     )
 
     # Save to DB
@@ -38,9 +41,8 @@ def register_user(user: UserCreate, db: Session = Depends(get_db)):
     return new_user
 
 
-@router.post("/login", response_model=TokenResponse)
+@router.post("/login", response_model=TokenResponse, dependencies=[Depends(rate_limit("login"))])
 def login(request: LoginRequest, db: Session = Depends(get_db)):
-    print("LOGIN ROUTE HIT")
     try:
         user = db.query(User).filter(User.email == request.email).first()
         if not user or not verify_password(request.password, user.password):
@@ -0,0 +1,187 @@
+# app/routes/batch_routes.py
+from collections import Counter
+
+from fastapi import APIRouter, Depends
+from sqlalchemy import select, insert, delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.db.database import get_db, dialect_insert
+from app.db.models import User, Post, Follow, Like, Comment
+from app.schemas.batch_schemas import BatchRequest, BatchResponse, BatchResult
+from app.core.dependencies import get_current_user
+from app.core.rate_limit import rate_limit, charge_user
+from app.services.recommendations import suggestion_cache
+from app.services.activity import record_activities
+from app.services.blocks import block_cache
+from app.services.realtime import publish_like_count, publish_comment
+from app.services.trending import trending
+
+router = APIRouter()
+
+# The rate limit bucket each operation draws from, the same as its standalone route's
+OP_POLICIES = {"like": "like", "unlike": "like", "follow": "follow", "unfollow": "follow", "comment": "comment"}
+
+
+def _insert_new(db: Session, model, rows: list, key) -> set:
+    """
+    INSERT `rows`, skipping those a concurrent request wrote since the preload
+    (they'd violate the unique constraint); returns `key` of the rows written.
+    """
+    dialect_insert_ = dialect_insert(db)
+    if dialect_insert_ is not None:
+        return set(db.scalars(dialect_insert_(model).on_conflict_do_nothing().returning(key), rows))
+    written = set()
+    for row in rows:
+        try:
+            with db.begin_nested():
+                db.execute(insert(model), row)
+        except IntegrityError:
+            continue
+        written.add(row[key.key])
+    return written
+
+
+@router.post("/batch", response_model=BatchResponse, dependencies=[Depends(rate_limit("batch"))])
+def run_batch(
+        batch: BatchRequest,
+        db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+):
+    """
+    Apply a client's queued offline actions in one request and one transaction.
+
+    Operations are validated in order against state preloaded with a few
+    set-based queries (so "like, unlike, like" on the same post behaves as it
+    would over separate requests), then the net changes are written with one
+    statement per table.
+    """
+    ops = batch.operations
+    me = current_user.id
+
+    # The batch bucket limits requests; each operation also counts against its own route's bucket
+    costs = Counter(OP_POLICIES[op.op] for op in ops)
+    for policy_name, cost in costs.items():
+        charge_user(policy_name, me, cost)
+
+    # Step 1: preload everything the operations touch, one IN (...) per table
+    post_ids = {op.post_id for op in ops if op.post_id is not None}
+    user_ids = {op.user_id for op in ops if op.user_id is not None}
+
+    existing_posts = set()
+    liked = set()
+    if post_ids:
+        existing_posts = set(db.execute(select(Post.id).where(Post.id.in_(post_ids))).scalars())
+        liked = set(db.execute(select(Like.post_id)
+                               .where(Like.user_id == me, Like.post_id.in_(post_ids))).scalars())
+
+    existing_users = set()
+    following = set()
+    blocked = set()
+    if user_ids:
+        existing_users = set(db.execute(select(User.id).where(User.id.in_(user_ids))).scalars())
+        blocked = block_cache.hidden_among(db, me, user_ids, include_muted=False)
+        following = set(db.execute(select(Follow.following_id)
+                                   .where(Follow.follower_id == me, Follow.following_id.in_(user_ids))).scalars())
+    liked_before, following_before = set(liked), set(following)
+
+    # Step 2: validate in order against the in-memory state
+    results = []
+    new_comments = []  # (result, row)
+    for index, op in enumerate(ops):
+        status_code, detail = 200, "OK"
+
+        if op.op in ("like", "unlike", "comment") and op.post_id is None:
+            status_code, detail = 422, "post_id is required"
+        elif op.op in ("follow", "unfollow") and op.user_id is None:
+            status_code, detail = 422, "user_id is required"
+        elif op.op == "like":
+            if op.post_id not in existing_posts:
+                status_code, detail = 404, "Post not found"
+            elif op.post_id in liked:
+                status_code, detail = 400, "You have already liked this post."
+            else:
+                liked.add(op.post_id)
+                status_code, detail = 201, "Post liked successfully."
+        elif op.op == "unlike":
+            if op.post_id not in liked:
+                status_code, detail = 404, "You have not liked this post."
+            else:
+                liked.discard(op.post_id)
+                detail = "Post unliked successfully."
+        elif op.op == "follow":
+            if op.user_id == me:
+                status_code, detail = 400, "You cannot follow yourself."
+            elif op.user_id not in existing_users:
+                status_code, detail = 404, "User not found"
+            elif op.user_id in blocked:
+                status_code, detail = 403, "You cannot follow this user."
+            elif op.user_id in following:
+                status_code, detail = 400, "You are already following this user."
+            else:
+                following.add(op.user_id)
+                status_code, detail = 201, "Followed user successfully."
+        elif op.op == "unfollow":
+            if op.user_id not in following:
+                status_code, detail = 404, "Follow relationship not found."
+            else:
+                following.discard(op.user_id)
+                detail = "Unfollowed user successfully."
+        elif op.op == "comment":
+            if op.post_id not in existing_posts:
+                status_code, detail = 404, "Post not found"
+            elif not op.content:
+                status_code, detail = 422, "content is required"
+            else:
+                status_code, detail = 201, "Comment created."
+
+        result = BatchResult(index=index, op=op.op, status_code=status_code, detail=detail)
+        if op.op == "comment" and status_code == 201:
+            new_comments.append((result, {"post_id": op.post_id, "user_id": me, "content": op.content}))
+        results.append(result)
+
+    if batch.atomic and any(r.status_code >= 400 for r in results):
+        return BatchResponse(committed=False, results=results)
+
+    # Step 3: write the net effect, one statement per table and change type
+    likes_added = liked - liked_before
+    likes_removed = liked_before - liked
+    follows_added = following - following_before
+    follows_removed = following_before - following
+
+    if likes_added:
+        likes_added = _insert_new(db, Like, [{"user_id": me, "post_id": pid} for pid in likes_added], Like.post_id)
+    if likes_removed:
+        db.execute(delete(Like).where(Like.user_id == me, Like.post_id.in_(likes_removed)))
+    if follows_added:
+        follows_added = _insert_new(db, Follow, [{"follower_id": me, "following_id": uid} for uid in follows_added],
+                                    Follow.following_id)
+    if follows_removed:
+        db.execute(delete(Follow).where(Follow.follower_id == me, Follow.following_id.in_(follows_removed)))
+    created_comments = []
+    if new_comments:
+        created_comments = db.scalars(insert(Comment).returning(Comment, sort_by_parameter_order=True),
+                                      [row for _, row in new_comments]).all()
+        for (result, _), comment in zip(new_comments, created_comments):
+            result.id = comment.id
+
+    # Notifications for the recipients, also one INSERT per verb
+    if likes_added:
+        record_activities(db, me, "like", post_ids=likes_added)
+    if follows_added:
+        record_activities(db, me, "follow", recipient_ids=follows_added)
+    if new_comments:
+        record_activities(db, me, "comment", post_ids=[row["post_id"] for _, row in new_comments])
+
+    db.commit()
+
+    if follows_added or follows_removed:
+        suggestion_cache.invalidate(me)
+    for post_id in likes_added:
+        trending.record(post_id, "like")
+    for comment in created_comments:
+        trending.record(comment.post_id, "comment")
+    for post_id in likes_added | likes_removed:
+        publish_like_count(db, post_id)
+    for comment in created_comments:
+        publish_comment(comment)
+    return BatchResponse(committed=True, results=results)
@@ -1,17 +1,29 @@
 # app/routes/comment_routes.py
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.db.database import get_db
 from app.db.models import Comment, Post
+from app.db.partitions import month_start
+from app.db.queries import comments_for_post
 from app.schemas.comment_schemas import CommentCreate, CommentRead
-from app.core.dependencies import get_current_user
+from app.core.dependencies import get_current_user, get_optional_user
+from app.core.fields import sparse_fields, columns_for, project
+from app.core.rate_limit import rate_limit
+from app.core.singleflight import SingleFlight
+from app.services.activity import record_activity
+from app.services.blocks import drop_hidden
+from app.services.realtime import publish_comment
+from app.services.trending import trending
 from app.db.models import User
-from typing import List
+from operator import attrgetter
+from typing import List, Optional, Sequence
 
 router = APIRouter(prefix="/comments", tags=["Comments"])
+comment_reads = SingleFlight("comments")
 
 
-@router.post("/", response_model=CommentRead, status_code=201)
+@router.post("/", response_model=CommentRead, status_code=201, dependencies=[Depends(rate_limit("comment"))])
 def create_comment(comment: CommentCreate, db: Session = Depends(get_db),
                    current_user: User = Depends(get_current_user)):
     post = db.query(Post).filter(Post.id == comment.post_id).first()
@@ -24,13 +36,38 @@ def create_comment(comment: CommentCreate, db: Session = Depends(get_db),
         content=comment.content
     )
     db.add(new_comment)
+    record_activity(db, post.user_id, current_user.id, "comment", post.id)
     db.commit()
     db.refresh(new_comment)
+    trending.record(new_comment.post_id, "comment")
+    publish_comment(new_comment)
     return new_comment
 
 
-@router.get("/post/{post_id}", response_model=List[CommentRead])
-def get_comments_for_post(post_id: int, db: Session = Depends(get_db)):
-    return db.query(Comment).filter(Comment.post_id == post_id).order_by(Comment.created_at.desc()).all()
+def _load_comments(db: Session, post_id: int, fields: Optional[Sequence[str]]) -> list:
+    posted_at = db.query(Post.created_at).filter(Post.id == post_id).scalar()
+    if posted_at is None:
+        return []
+    posted_at = month_start(posted_at)
+    if fields is None:
+        return comments_for_post(db, post_id, posted_at)
+    # No comment predates its post: the lower bound prunes every older monthly partition
+    return db.execute(select(*columns_for(Comment, CommentRead, fields))
+                      .where(Comment.post_id == post_id, Comment.created_at >= posted_at)
+                      .order_by(Comment.created_at.desc())).all()
 
 
+@router.get("/post/{post_id}", response_model=List[CommentRead])
+def get_comments_for_post(
+        post_id: int,
+        fields: Optional[List[str]] = Depends(sparse_fields(CommentRead)),
+        db: Session = Depends(get_db),
+        viewer: Optional[User] = Depends(get_optional_user)
+):
+    # project() looks columns up by name, so any order of the same fields can share a result;
+    # user_id is always selected for the block/mute filter
+    selected = tuple(sorted({*fields, "user_id"})) if fields is not None else None
+    comments = comment_reads.do((post_id, selected), lambda: _load_comments(db, post_id, selected))
+    if viewer is not None:
+        comments = drop_hidden(db, viewer.id, comments, attrgetter("user_id"))
+    return project(comments, fields)
@@ -0,0 +1,87 @@
+# app/routes/export_routes.py
+import os
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.dependencies import get_current_user
+from app.core.media import MediaFileResponse, media_etag
+from app.core.rate_limit import rate_limit
+from app.db.database import get_db
+from app.db.models import DataExport, Job, User
+from app.schemas.export_schemas import DataExportResponse
+from app.services.export import export_path, ndjson_chunks
+from app.services.tasks import export_user_data, ExportUserData
+
+router = APIRouter(prefix="/users/me/exports", tags=["Exports"])
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "zip": "application/zip"}
+
+
+def _own_export(db: Session, export_id: int, user: User) -> DataExport:
+    export = db.get(DataExport, export_id)
+    if export is None or export.user_id != user.id:
+        raise HTTPException(status_code=404, detail="Export not found")
+    return export
+
+
+def _response(db: Session, export: DataExport) -> DataExportResponse:
+    response = DataExportResponse.model_validate(export)
+    if export.status == "pending" and export.job_id is not None:
+        job_status = db.execute(select(Job.status).where(Job.id == export.job_id)).scalar()
+        if job_status == "failed":
+            response.status = "failed"
+    return response
+
+
+@router.get("/stream")
+def stream_export(current_user: User = Depends(get_current_user)):
+    """Your data as NDJSON, streamed as it is read (no images; request an export for those)."""
+    return StreamingResponse(ndjson_chunks(current_user.id), media_type=MEDIA_TYPES["ndjson"],
+                             headers={"content-disposition": 'attachment; filename="igclone-export.ndjson"'})
+
+
+@router.post("/", response_model=DataExportResponse, status_code=202,
+             dependencies=[Depends(rate_limit("export"))])
+def request_export(
+        format: str = Query("zip", regex="^(ndjson|zip)$"),
+        db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+):
+    export = DataExport(user_id=current_user.id, format=format, status="pending")
+    db.add(export)
+    db.flush()
+    job = export_user_data.enqueue(db, ExportUserData(export_id=export.id))
+    db.flush()
+    export.job_id = job.id
+    db.commit()
+    db.refresh(export)
+    return _response(db, export)
+
+
+@router.get("/{export_id}", response_model=DataExportResponse)
+def get_export(export_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    return _response(db, _own_export(db, export_id, current_user))
+
+
+@router.get("/{export_id}/download")
+def download_export(export_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    export = _own_export(db, export_id, current_user)
+    if export.status != "ready":
+        raise HTTPException(status_code=409, detail="Export is not ready yet")
+    path = export_path(export.id, export.format)
+    try:
+        stat_result = os.stat(path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Export has expired")
+
+    # Range and If-Range come with MediaFileResponse, so an interrupted download can resume
+    headers = {
+        "cache-control": "private, no-store",
+        "etag": media_etag(os.path.basename(path), stat_result),
+        "accept-ranges": "bytes",
+        "content-disposition": f'attachment; filename="igclone-export-{export.id}.{export.format}"',
+    }
+    return MediaFileResponse(path, stat_result=stat_result, headers=headers, media_type=MEDIA_TYPES[export.format])
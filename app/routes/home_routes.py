@@ -0,0 +1,87 @@
+# app/routes/home_routes.py
+import asyncio
+import time
+from typing import Callable, Dict
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from app.db.database import get_db, SessionLocal
+from app.db.models import User
+from app.schemas.home_schemas import HomeResponse, UnreadCounts
+from app.schemas.user_schemas import UserResponse
+from app.core.config import ACTIVITY_UNREAD_LIMIT
+from app.core.dependencies import get_current_user
+from app.routes.post_routes import get_posts
+from app.routes.user_routes import get_user_profile, get_user_suggestions
+from app.services.activity import unread_counts
+
+router = APIRouter(tags=["Home"])
+
+
+def _run_section(load: Callable[[Session], object]):
+    # Its own session and so its own pooled connection: sections don't queue behind each other
+    db = SessionLocal()
+    try:
+        return load(db)
+    finally:
+        db.close()
+
+
+async def _timed_section(name: str, load: Callable[[Session], object],
+                         timings: Dict[str, float], errors: Dict[str, str]):
+    started = time.perf_counter()
+    try:
+        return await run_in_threadpool(_run_section, load)
+    except HTTPException as e:
+        errors[name] = str(e.detail)
+    except Exception as e:
+        print(f"❌ Home section {name} failed:", e)
+        errors[name] = "unavailable"
+    finally:
+        timings[name] = round((time.perf_counter() - started) * 1000, 1)
+    return None
+
+
+def _unread(db: Session, user_id: int, seen_id: int) -> UnreadCounts:
+    counts = unread_counts(db, user_id, seen_id)
+    total = sum(counts.values())
+    return UnreadCounts(total=total, likes=counts.get("like", 0), comments=counts.get("comment", 0),
+                        follows=counts.get("follow", 0), capped=total >= ACTIVITY_UNREAD_LIMIT)
+
+
+@router.get("/home", response_model=HomeResponse)
+async def get_home(
+        feed_limit: int = Query(10, ge=1, le=50),
+        include_comments: bool = True,
+        suggestions_limit: int = Query(10, ge=1, le=50),
+        seen_activity_id: int = Query(0, ge=0, description="Newest activity id the client has already shown"),
+        db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+):
+    """
+    Everything the app shows when it opens, in one request: the token is
+    checked once, then the feed (with comment previews), the user's profile
+    stats, follow suggestions and unread activity counts load concurrently,
+    each on its own pooled connection, so the response takes about as long
+    as the slowest section rather than the sum. A section that fails comes
+    back as null with the reason in `errors`; the others are still returned.
+    """
+    started = time.perf_counter()
+    me = UserResponse.model_validate(current_user)
+    # Done with the auth lookup: give its connection back before the sections take theirs
+    await run_in_threadpool(db.close)
+
+    sections = {
+        "feed": lambda s: get_posts(db=s, current_user=current_user, skip=0, limit=feed_limit, user_id=None,
+                                    sort_by="created_at", sort_order="desc", include_comments=include_comments),
+        "profile": lambda s: get_user_profile(user_id=me.id, db=s),
+        "suggestions": lambda s: get_user_suggestions(limit=suggestions_limit, db=s, current_user=current_user),
+        "unread": lambda s: _unread(s, me.id, seen_activity_id),
+    }
+    timings: Dict[str, float] = {}
+    errors: Dict[str, str] = {}
+    results = await asyncio.gather(*(_timed_section(name, load, timings, errors)
+                                     for name, load in sections.items()))
+    timings["total"] = round((time.perf_counter() - started) * 1000, 1)
+    return HomeResponse(me=me, timings=timings, errors=errors, **dict(zip(sections, results)))
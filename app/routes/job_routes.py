@@ -0,0 +1,14 @@
+# app/routes/job_routes.py
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.core.dependencies import get_admin_user
+from app.db.database import get_db
+from app.services.queue import queue_stats
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"], dependencies=[Depends(get_admin_user)])
+
+
+@router.get("/stats")
+def job_stats(db: Session = Depends(get_db)):
+    return queue_stats(db)
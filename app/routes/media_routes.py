@@ -0,0 +1,42 @@
+# app/routes/media_routes.py
+import os
+import stat
+from mimetypes import guess_type
+
+from fastapi import APIRouter, HTTPException, Request, Response
+
+from app.core.config import UPLOAD_DIR, MEDIA_ACCEL_REDIRECT_PREFIX
+from app.core.media import MediaFileResponse, safe_media_path, media_etag, media_headers, is_not_modified
+
+router = APIRouter()
+
+
+# async on purpose: a stat() is cheaper than a hop through the threadpool,
+# and the body itself is streamed by the response (or by the proxy).
+@router.api_route("/{file_path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+async def serve_media(file_path: str, request: Request):
+    full_path = safe_media_path(UPLOAD_DIR, file_path)
+    if full_path is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    try:
+        stat_result = os.stat(full_path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not stat.S_ISREG(stat_result.st_mode):
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    etag = media_etag(file_path, stat_result)
+    headers = media_headers(etag, stat_result)
+
+    if is_not_modified(request.headers, etag, stat_result):
+        return Response(status_code=304, headers=headers)
+
+    media_type = guess_type(full_path)[0] or "application/octet-stream"
+
+    # Let the front proxy (nginx) send the bytes; it handles Range itself.
+    if MEDIA_ACCEL_REDIRECT_PREFIX:
+        headers["x-accel-redirect"] = f"{MEDIA_ACCEL_REDIRECT_PREFIX.rstrip('/')}/{file_path}"
+        return Response(headers=headers, media_type=media_type)
+
+    return MediaFileResponse(full_path, stat_result=stat_result, headers=headers, media_type=media_type)
@@ -1,22 +1,35 @@
 # app/routes/post_routes.py
 from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form, Query
-from sqlalchemy import func, select, desc, asc
-from sqlalchemy.orm import Session, aliased
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
 from app.db.database import get_db
 from app.db.models import User, Post, Follow, Like
-from app.schemas.post_schemas import PostCreate, PostResponse
-from app.core.dependencies import get_current_user
+from app.db.partitions import delete_post_dependents
+from app.db.queries import feed_page, find_like
+from app.schemas.post_schemas import PostCreate, PostResponse, PostAuthor, TrendingPost
+from app.core.config import FEED_LOOKBACK_DAYS
+from app.core.dependencies import get_current_user, can_view_posts_of
+from app.core.storage import get_storage
+from app.core.rate_limit import rate_limit
+from app.core.singleflight import SingleFlight
+from app.services.activity import record_activity, post_owner_id
+from app.services.blocks import block_cache, drop_hidden_posts
+from app.services.realtime import publish_like_count
+from app.services.hydration import hydrate_posts, attach_comment_previews
+from app.services.impressions import impressions
+from app.services.tags import index_post, unindex_posts
+from app.services.trending import trending
+from app.services.tasks import enqueue_media_deletion
+from app.services.user_cache import user_cache
 from typing import List, Optional
-import os
-from uuid import uuid4
-
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok = True)
+from datetime import datetime, timedelta, timezone
 
 router = APIRouter()
+post_reads = SingleFlight("post")
 
 @router.post("/", response_model=PostResponse, status_code=201)
-def create_post(
+async def create_post(
         content: str = Form(...),
         image: Optional[UploadFile] = File(None),
         db: Session = Depends(get_db),
@@ -24,21 +37,23 @@ def create_post(
 ):
     image_url = None
     if image:
-        ext = os.path.splitext(image.filename)[1]
-        filename = f"{uuid4().hex}{ext}"
-        filepath = os.path.join(UPLOAD_DIR, filename)
-        with open(filepath, "wb") as f:
-            f.write(image.file.read())
-        image_url = f"/{UPLOAD_DIR}/{filename}"
+        # Stream the upload to storage in chunks instead of reading it into memory
+        image_url = await get_storage().save_upload(image)
 
     post = Post(
         content=content,
         image_url=image_url,
         user_id=current_user.id
     )
-    db.add(post)
-    db.commit()
-    db.refresh(post)
+
+    def save_post():
+        db.add(post)
+        db.flush()
+        index_post(db, post)
+        db.commit()
+        db.refresh(post)
+
+    await run_in_threadpool(save_post)
     return PostResponse(
         id=post.id,
         content=post.content,
@@ -46,49 +61,87 @@ def create_post(
         user_id=post.user_id,
         created_at=post.created_at,
         updated_at=post.updated_at,
-        likes_count=0
+        likes_count=0,
+        author=PostAuthor(id=current_user.id, name=current_user.name, avatar_url=current_user.avatar_url),
+        viewer_has_liked=False
     )
 
-@router.get("/{post_id}", response_model=PostResponse)
-def read_post(
-    post_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+@router.get("/trending", response_model=List[TrendingPost])
+def get_trending_posts(
+        limit: int = Query(20, ge=1, le=50),
+        db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_user)
 ):
-    # Step 1: Get the post and likes count
+    """
+    Highest time-decayed engagement right now, from the in-memory trending
+    engine. Only posts the viewer may see (their own and those of accounts
+    they follow, minus blocked and muted ones) are returned, so fewer than
+    `limit` is possible.
+    """
+    ranked = trending.top()
+    if not ranked:
+        return []
+
+    posts = {row.id: row for row in db.execute(
+        select(Post.id, Post.user_id, Post.content, Post.image_url, Post.created_at)
+        .where(Post.id.in_([post_id for post_id, _ in ranked])))}
+    author_ids = {row.user_id for row in posts.values()}
+    visible = set(db.execute(select(Follow.following_id)
+                             .where(Follow.follower_id == current_user.id,
+                                    Follow.following_id.in_(author_ids))).scalars())
+    visible.add(current_user.id)
+    visible -= block_cache.hidden_among(db, current_user.id, visible)
+    authors = user_cache.get_many(db, author_ids & visible)
+
+    result = []
+    for post_id, score in ranked:
+        post = posts.get(post_id)
+        if post is None or post.user_id not in visible:
+            continue
+        card = authors.get(post.user_id)
+        result.append(TrendingPost(id=post.id, user_id=post.user_id, content=post.content,
+                                   image_url=post.image_url, created_at=post.created_at,
+                                   author=PostAuthor(**card) if card else None, score=score))
+        if len(result) == limit:
+            break
+    return result
+
+def _load_post(db: Session, post_id: int) -> Optional[dict]:
+    """The viewer-independent part of a post: its columns and likes_count."""
     result = (
         db.query(Post, func.count(Like.id).label("likes_count"))
         .outerjoin(Like, Post.id == Like.post_id)
         .filter(Post.id == post_id)
-        .group_by(Post.id)
+        # (id, created_at) is the primary key of the partitioned posts table
+        .group_by(Post.id, Post.created_at)
         .first()
     )
-
     if not result:
-        raise HTTPException(status_code=404, detail="Post not found")
-
+        return None
     post, likes_count = result
+    return dict(id=post.id, content=post.content, image_url=post.image_url, user_id=post.user_id,
+                created_at=post.created_at, updated_at=post.updated_at, likes_count=likes_count)
+
+@router.get("/{post_id}", response_model=PostResponse)
+def read_post(
+    post_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    # Step 1: Get the post and likes count, shared with concurrent readers of the same post
+    post = post_reads.do(post_id, lambda: _load_post(db, post_id))
+
+    if not post:
+        raise HTTPException(status_code=404, detail="Post not found")
 
     # Step 2: Check if current user is allowed to view the post
-    if post.user_id != current_user.id:
-        follow_exists = db.query(Follow).filter_by(
-            follower_id=current_user.id,
-            following_id=post.user_id
-        ).first()
+    if not can_view_posts_of(db, current_user.id, post["user_id"]):
+        raise HTTPException(status_code=403, detail="You are not authorized to view this post")
 
-        if not follow_exists:
-            raise HTTPException(status_code=403, detail="You are not authorized to view this post")
+    impressions.record(current_user.id, [post_id])
 
-    # Step 3: Return the post with likes_count
-    return PostResponse(
-        id=post.id,
-        content=post.content,
-        image_url=post.image_url,
-        user_id=post.user_id,
-        created_at=post.created_at,
-        updated_at=post.updated_at,
-        likes_count=likes_count
-    )
+    # Step 3: Return the post with likes_count, author, viewer state and view counts
+    return hydrate_posts(db, current_user.id, [PostResponse(**post)])[0]
 
 @router.get("/", response_model=List[PostResponse])
 def get_posts(
@@ -99,36 +152,16 @@ def get_posts(
         user_id: Optional[int] = None,
         #search: Optional[str] = None,
         sort_by: Optional[str] = Query("created_at", regex="^(created_at|likes)$"),
-        sort_order: Optional[str] = Query("desc", regex="^(asc|desc)$")
+        sort_order: Optional[str] = Query("desc", regex="^(asc|desc)$"),
+        include_comments: bool = False
 ):
-    # Get IDs of users that current user follows
-    followed_user_ids = select(Follow.following_id).filter(Follow.follower_id == current_user.id)
-
-    like_alias = aliased(Like)
-
-    query = (db.query(Post, func.count(like_alias.id).label("likes_count"))
-             .outerjoin(like_alias, Post.id == like_alias.post_id)
-             .filter(Post.user_id.in_(followed_user_ids)).group_by(Post.id)
-             )
-
-    #query = (db.query(Post).filter(Post.user_id.in_(followed_user_ids)))
-
-    if user_id:
-        query = query.filter(Post.user_id == user_id)
-    else:
-        query = query.filter(Post.user_id.in_(followed_user_ids))
-
-    # if search:
-    #     query = query.filter(Post.content.ilike(f"%{search}%"))
-
-    if sort_by == "likes":
-        order = desc("likes_count") if sort_order == "desc" else asc("like_count")
-    else:
-        order = desc(Post.created_at) if sort_order == "desc" else asc(Post.created_at)
+    since = None
+    if FEED_LOOKBACK_DAYS:
+        since = datetime.now(timezone.utc) - timedelta(days=FEED_LOOKBACK_DAYS)
 
-    posts = query.order_by(order).offset(skip).limit(limit).all()
+    posts = feed_page(db, current_user.id, user_id, since, sort_by, sort_order, skip, limit)
 
-    return [
+    page = [
         PostResponse(
             id=post.id,
             content=post.content,
@@ -140,6 +173,11 @@ def get_posts(
         )
         for post, likes_count in posts
     ]
+    if include_comments:
+        attach_comment_previews(db, page)
+    page = drop_hidden_posts(db, current_user.id, page)
+    impressions.record(current_user.id, [post.id for post in page])
+    return hydrate_posts(db, current_user.id, page)
 
 # PUT Route to update post content
 @router.put("/{post_id}")
@@ -157,7 +195,7 @@ def update_post(
         raise HTTPException(status_code=403, detail="You are not authorized to update this post")
 
     db_post.content = post.content
-    db_post.image_url = post.image_url
+    index_post(db, db_post)
     db.commit()
     db.refresh(db_post)
     return db_post
@@ -176,38 +214,48 @@ def delete_post(
     if db_post.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="You are not authorized to delete this post")
 
+    unindex_posts(db, [post_id])
+    delete_post_dependents(db, [post_id])
+    if db_post.image_url:
+        enqueue_media_deletion(db, [db_post.image_url])
     db.delete(db_post)
     db.commit()
     return {"message": "Post deleted successfully"}
 
 
-@router.post("/{post_id}/like", status_code=201)
+@router.post("/{post_id}/like", status_code=201, dependencies=[Depends(rate_limit("like"))])
 def like_post(
         post_id: int,
         db: Session = Depends(get_db),
         current_user: User = Depends(get_current_user)
 ):
-    existing_like = db.query(Like).filter_by(user_id=current_user.id, post_id=post_id).first()
+    existing_like = find_like(db, current_user.id, post_id)
     if existing_like:
         raise HTTPException(status_code=400, detail="You have already liked this post.")
 
     like = Like(user_id=current_user.id, post_id=post_id)
     db.add(like)
+    owner_id = post_owner_id(db, post_id)
+    if owner_id is not None:
+        record_activity(db, owner_id, current_user.id, "like", post_id)
     db.commit()
+    trending.record(post_id, "like")
+    publish_like_count(db, post_id)
     return {"detail": "Post liked successfully."}
 
 
-@router.delete("/{post_id}/unlike", status_code=200)
+@router.delete("/{post_id}/unlike", status_code=200, dependencies=[Depends(rate_limit("like"))])
 def unlike_post(
         post_id: int,
         db: Session = Depends(get_db),
         current_user: User = Depends(get_current_user)
 ):
-    like = db.query(Like).filter_by(user_id=current_user.id, post_id=post_id).first()
+    like = find_like(db, current_user.id, post_id)
     if not like:
         raise HTTPException(status_code=404, detail="You have not liked this post.")
 
     db.delete(like)
     db.commit()
+    publish_like_count(db, post_id)
     return {"detail": "Post unliked successfully."}
 
@@ -0,0 +1,115 @@
+# app/routes/realtime_routes.py
+import asyncio
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.core.config import REALTIME_HEARTBEAT_SECONDS, REALTIME_SEND_TIMEOUT_SECONDS
+from app.core.dependencies import get_admin_user, get_current_user, user_from_token, can_view_posts_of
+from app.core.pubsub import broker, post_topic, SlowConsumer
+from app.core.singleflight import SingleFlight
+from app.db.database import get_db, SessionLocal
+from app.db.models import Post, User
+
+router = APIRouter(prefix="/realtime", tags=["Realtime"])
+# Everyone opening a popular post subscribes at once: look its author up once
+post_authors = SingleFlight("post_author")
+
+
+def _author_of(db: Session, post_id: int) -> Optional[int]:
+    return db.query(Post.user_id).filter(Post.id == post_id).scalar()
+
+
+def authorize_post_viewer(token: Optional[str], post_id: int) -> Optional[str]:
+    """Return an error message, or None if the token's user may watch the post."""
+    db = SessionLocal()
+    try:
+        user = user_from_token(token, db)
+        if user is None:
+            return "Could not validate credentials"
+        author_id = post_authors.do(post_id, lambda: _author_of(db, post_id))
+        if author_id is None:
+            return "Post not found"
+        if not can_view_posts_of(db, user.id, author_id):
+            return "You are not authorized to view this post"
+        return None
+    finally:
+        db.close()
+
+
+@router.websocket("/ws/posts/{post_id}")
+async def post_updates_ws(websocket: WebSocket, post_id: int, token: Optional[str] = None):
+    """
+    Push like counts and new comments for one post.
+
+    Browsers can't set headers on WebSocket requests, so the token may also
+    be passed as ?token=. Messages are JSON arrays of events; an empty array
+    is a heartbeat.
+    """
+    error = await run_in_threadpool(authorize_post_viewer,
+                                    token or websocket.headers.get("authorization"), post_id)
+    if error is not None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=error)
+        return
+
+    await websocket.accept()
+    sub = broker.subscribe([post_topic(post_id)])
+    try:
+        while True:
+            batch = await sub.next_batch(timeout=REALTIME_HEARTBEAT_SECONDS)
+            # A client that can't take a message within the timeout is evicted
+            await asyncio.wait_for(websocket.send_text(json.dumps(batch)), REALTIME_SEND_TIMEOUT_SECONDS)
+    except (SlowConsumer, asyncio.TimeoutError):
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason="Too slow, reconnect")
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        sub.close()
+
+
+@router.get("/posts/{post_id}/events")
+async def post_updates_sse(
+        post_id: int,
+        request: Request,
+        current_user: User = Depends(get_current_user),
+        db: Session = Depends(get_db)
+):
+    """Server-Sent Events variant of the WebSocket channel, one `data:` line per event."""
+    author_id = await post_authors.do_async(post_id, lambda: _author_of(db, post_id))
+
+    def check():
+        if author_id is None:
+            raise HTTPException(status_code=404, detail="Post not found")
+        if not can_view_posts_of(db, current_user.id, author_id):
+            raise HTTPException(status_code=403, detail="You are not authorized to view this post")
+        # Don't keep a pooled connection checked out for the life of the stream
+        db.close()
+
+    await run_in_threadpool(check)
+    sub = broker.subscribe([post_topic(post_id)])
+
+    async def stream():
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                batch = await sub.next_batch(timeout=REALTIME_HEARTBEAT_SECONDS)
+                if not batch:
+                    yield ": ping\n\n"
+                for event in batch:
+                    yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        except SlowConsumer:
+            yield "event: evicted\ndata: {}\n\n"
+        finally:
+            sub.close()
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@router.get("/stats", dependencies=[Depends(get_admin_user)])
+def realtime_stats():
+    return {"connections": broker.connections(), **broker.metrics}
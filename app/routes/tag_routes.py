@@ -0,0 +1,60 @@
+# app/routes/tag_routes.py
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+from app.db.database import get_db
+from app.db.models import User, Post, Like
+from app.schemas.post_schemas import PostResponse
+from app.schemas.tag_schemas import TagFeed
+from app.core.dependencies import get_current_user
+from app.services.tags import read_tag_page, tag_post_count, normalize_tag
+from app.services.blocks import drop_hidden_posts
+from app.services.hydration import hydrate_posts, attach_comment_previews
+from app.services.impressions import impressions
+from typing import Optional
+
+router = APIRouter(prefix="/tags", tags=["Tags"])
+
+
+@router.get("/{tag}/posts", response_model=TagFeed)
+def get_tag_posts(
+        tag: str,
+        cursor: Optional[str] = None,
+        limit: int = Query(10, ge=1, le=50),
+        include_comments: bool = False,
+        db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+):
+    post_ids, next_cursor = read_tag_page(db, current_user.id, tag, limit, cursor)
+
+    rows = {}
+    if post_ids:
+        rows = {post.id: (post, likes_count) for post, likes_count in db.execute(
+            select(Post, func.count(Like.id).label("likes_count"))
+            .outerjoin(Like, Post.id == Like.post_id)
+            .where(Post.id.in_(post_ids))
+            .group_by(Post.id, Post.created_at))}
+
+    page = [
+        PostResponse(
+            id=post.id,
+            content=post.content,
+            image_url=post.image_url,
+            user_id=post.user_id,
+            created_at=post.created_at,
+            updated_at=post.updated_at,
+            likes_count=likes_count
+        )
+        # Keep the index order; a post deleted since the page was read is skipped
+        for post, likes_count in (rows[post_id] for post_id in post_ids if post_id in rows)
+    ]
+    if include_comments:
+        attach_comment_previews(db, page)
+    page = drop_hidden_posts(db, current_user.id, page)
+    impressions.record(current_user.id, [post.id for post in page])
+    return TagFeed(
+        tag=normalize_tag(tag),
+        post_count=tag_post_count(db, tag),
+        posts=hydrate_posts(db, current_user.id, page),
+        next_cursor=next_cursor
+    )
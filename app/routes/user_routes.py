@@ -1,14 +1,29 @@
 # app/routes/user_routes.py
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy import func
+from sqlalchemy import func, select, delete, or_, and_
 from sqlalchemy.orm import Session
 from app.db.database import get_db
-from app.db.models import User, Follow, Post
-from app.schemas.user_schemas import UserCreate, UserResponse, UserProfile, UserWithPosts
+from app.db.models import User, Follow, Post, Block, Mute
+from app.db.partitions import delete_post_dependents
+from app.db.queries import find_follow
+from app.schemas.user_schemas import UserCreate, UserResponse, UserProfile, UserWithPosts, SuggestedUser
+from app.schemas.post_schemas import PostResponse
 from app.core.dependencies import get_current_user
-from typing import List
+from app.core.fields import sparse_fields, columns_for, project
+from app.core.rate_limit import rate_limit
+from app.core.singleflight import SingleFlight
+from app.services.recommendations import MAX_SUGGESTIONS, get_suggestions, suggestion_cache
+from app.services.activity import record_activity
+from app.services.blocks import block_cache
+from app.services.user_cache import user_cache
+from app.services.tags import unindex_posts
+from app.services.tasks import enqueue_media_deletion, enqueue_export_purges
+from typing import List, Optional
 
 router = APIRouter()
+profile_reads = SingleFlight("profile")
+# Name matches fetched per round by /users/search, so blocked accounts can be skipped without a NOT IN
+SEARCH_CANDIDATES = 10
 
 # @router.post("/", response_model=UserRead)
 # def create_user(user: UserCreate, db: Session = Depends(get_db)):
@@ -19,18 +34,41 @@ router = APIRouter()
 #     return db_user
 
 @router.get("/", response_model=list[UserResponse])
-def get_users(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
-    return db.query(User).offset(skip).limit(limit).all()
+def get_users(
+        skip: int = 0,
+        limit: int = 10,
+        fields: Optional[List[str]] = Depends(sparse_fields(UserResponse)),
+        db: Session = Depends(get_db)
+):
+    rows = db.execute(select(*columns_for(User, UserResponse, fields)).offset(skip).limit(limit)).all()
+    return project(rows, fields)
 @router.get("/me", response_model=UserResponse)
 def get_me(current_user: User = Depends(get_current_user)):
-    print("📡 /users/me was hit")
     return current_user
 
-@router.get("/{user_id}/profile", response_model=UserProfile)
-def get_user_profile(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == user_id).first()
+@router.get("/suggestions", response_model=List[SuggestedUser])
+def get_user_suggestions(
+        limit: int = Query(20, ge=1, le=MAX_SUGGESTIONS),
+        db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+):
+    suggestions = get_suggestions(db, current_user.id, limit)
+    blocked = block_cache.hidden_among(db, current_user.id, [uid for uid, _ in suggestions], include_muted=False)
+    suggestions = [(uid, mutual_count) for uid, mutual_count in suggestions if uid not in blocked]
+    if not suggestions:
+        return []
+
+    names = dict(db.query(User.id, User.name).filter(User.id.in_([uid for uid, _ in suggestions])).all())
+    return [
+        SuggestedUser(id=uid, name=names[uid], mutual_count=mutual_count)
+        for uid, mutual_count in suggestions
+        if uid in names
+    ]
+
+def _load_profile(db: Session, user_id: int) -> Optional[UserProfile]:
+    user = db.execute(select(User.id, User.name).where(User.id == user_id)).first()
     if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+        return None
 
     post_count = db.query(func.count(Post.id)).filter(Post.user_id == user_id).scalar()
     followers_count = db.query(func.count(Follow.id)).filter(Follow.following_id == user_id).scalar()
@@ -44,13 +82,32 @@ def get_user_profile(user_id: int, db: Session = Depends(get_db)):
         following_count=following_count
     )
 
+@router.get("/{user_id}/profile", response_model=UserProfile)
+def get_user_profile(user_id: int, db: Session = Depends(get_db)):
+    profile = profile_reads.do(user_id, lambda: _load_profile(db, user_id))
+    if profile is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return profile
+
 @router.get("/search", response_model=UserWithPosts)
 def search_user_by_name(
     search: str = Query(..., min_length=1),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    user = db.query(User).filter(User.name.ilike(f"%{search}%")).first()
+    # The first match, by id, that isn't blocked either way; keep paging while whole pages are blocked
+    user = None
+    after_id = 0
+    while user is None:
+        matches = db.execute(select(User.id, User.name)
+                             .where(User.name.ilike(f"%{search}%"), User.id > after_id)
+                             .order_by(User.id)
+                             .limit(SEARCH_CANDIDATES)).all()
+        if not matches:
+            break
+        blocked = block_cache.hidden_among(db, current_user.id, [match.id for match in matches], include_muted=False)
+        user = next((match for match in matches if match.id not in blocked), None)
+        after_id = matches[-1].id
 
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -66,7 +123,9 @@ def search_user_by_name(
     post_count = db.query(func.count(Post.id)).filter(Post.user_id == user.id).scalar()
     followers_count = db.query(func.count(Follow.id)).filter(Follow.following_id == user.id).scalar()
     following_count = db.query(func.count(Follow.id)).filter(Follow.follower_id == user.id).scalar()
-    user_posts = db.query(Post).filter(Post.user_id == user.id).order_by(Post.created_at.desc()).all()
+    user_posts = db.execute(select(*columns_for(Post, PostResponse))
+                            .where(Post.user_id == user.id)
+                            .order_by(Post.created_at.desc())).all()
 
     return {
         "id": user.id,
@@ -93,8 +152,12 @@ def update_user(
 
     db_user.name = updated_user.name
     db_user.email = updated_user.email
+    # Optional: a PUT without it keeps the current avatar
+    if "avatar_url" in updated_user.model_fields_set:
+        db_user.avatar_url = updated_user.avatar_url
     db.commit()
     db.refresh(db_user)
+    user_cache.invalidate(user_id)
     return db_user
 
 @router.delete("/{user_id}")
@@ -110,12 +173,19 @@ def delete_user(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
+    user_post_ids = select(Post.id).where(Post.user_id == user_id)
+    unindex_posts(db, user_post_ids)
+    delete_post_dependents(db, user_post_ids)
+    enqueue_media_deletion(db, db.execute(select(Post.image_url)
+                                          .where(Post.user_id == user_id, Post.image_url.isnot(None))).scalars().all())
+    enqueue_export_purges(db, user_id)
     db.delete(user)
     db.commit()
+    user_cache.invalidate(user_id)
     return {"message": "User deleted successfully"}
 
 
-@router.post("/{user_id}/follow", status_code=201)
+@router.post("/{user_id}/follow", status_code=201, dependencies=[Depends(rate_limit("follow"))])
 def follow_user(
         user_id: int,
         db: Session = Depends(get_db),
@@ -124,60 +194,160 @@ def follow_user(
     if user_id == current_user.id:
         raise HTTPException(status_code=400, detail="You cannot follow yourself.")
 
-    follow_exists = (db.query(Follow)
-                     .filter_by(follower_id=current_user.id, following_id=user_id)
-                     .first()
-                     )
+    if block_cache.is_blocked(db, current_user.id, user_id):
+        raise HTTPException(status_code=403, detail="You cannot follow this user.")
+
+    follow_exists = find_follow(db, current_user.id, user_id)
 
     if follow_exists:
         raise HTTPException(status_code=400, detail="You are already following this user.")
 
     follow = Follow(follower_id=current_user.id, following_id=user_id)
     db.add(follow)
+    record_activity(db, user_id, current_user.id, "follow")
     db.commit()
+    suggestion_cache.invalidate(current_user.id)
     return {"detail": "Followed user successfully."}
 
 
-@router.delete("/{user_id}/unfollow", status_code=200)
+@router.delete("/{user_id}/unfollow", status_code=200, dependencies=[Depends(rate_limit("follow"))])
 def unfollow_user(
         user_id: int,
         db: Session = Depends(get_db),
         current_user: User = Depends(get_current_user)):
 
-    follow = (db.query(Follow)
-              .filter_by(follower_id=current_user.id, following_id=user_id)
-              .first()
-              )
+    follow = find_follow(db, current_user.id, user_id)
 
     if not follow:
         raise HTTPException(status_code=404, detail="Follow relationship not found.")
 
     db.delete(follow)
     db.commit()
+    suggestion_cache.invalidate(current_user.id)
     return {"detail": "Unfollowed user successfully."}
 
 
+@router.post("/{user_id}/block", status_code=201, dependencies=[Depends(rate_limit("follow"))])
+def block_user(
+        user_id: int,
+        db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+):
+    if user_id == current_user.id:
+        raise HTTPException(status_code=400, detail="You cannot block yourself.")
+    if db.get(User, user_id) is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    if db.get(Block, (current_user.id, user_id)) is not None:
+        raise HTTPException(status_code=400, detail="You have already blocked this user.")
+
+    db.add(Block(user_id=current_user.id, target_id=user_id))
+    # A block ends the follow relationship in both directions
+    db.execute(delete(Follow).where(or_(
+        and_(Follow.follower_id == current_user.id, Follow.following_id == user_id),
+        and_(Follow.follower_id == user_id, Follow.following_id == current_user.id))))
+    db.commit()
+    block_cache.on_block(current_user.id, user_id)
+    suggestion_cache.invalidate(current_user.id)
+    suggestion_cache.invalidate(user_id)
+    return {"detail": "Blocked user successfully."}
+
+
+@router.delete("/{user_id}/unblock", status_code=200, dependencies=[Depends(rate_limit("follow"))])
+def unblock_user(
+        user_id: int,
+        db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+):
+    block = db.get(Block, (current_user.id, user_id))
+    if block is None:
+        raise HTTPException(status_code=404, detail="You have not blocked this user.")
+
+    db.delete(block)
+    db.commit()
+    block_cache.invalidate(current_user.id, user_id)
+    return {"detail": "Unblocked user successfully."}
+
+
+@router.post("/{user_id}/mute", status_code=201, dependencies=[Depends(rate_limit("follow"))])
+def mute_user(
+        user_id: int,
+        db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+):
+    if user_id == current_user.id:
+        raise HTTPException(status_code=400, detail="You cannot mute yourself.")
+    if db.get(User, user_id) is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    if db.get(Mute, (current_user.id, user_id)) is not None:
+        raise HTTPException(status_code=400, detail="You have already muted this user.")
+
+    db.add(Mute(user_id=current_user.id, target_id=user_id))
+    db.commit()
+    block_cache.on_mute(current_user.id, user_id)
+    return {"detail": "Muted user successfully."}
+
+
+@router.delete("/{user_id}/unmute", status_code=200, dependencies=[Depends(rate_limit("follow"))])
+def unmute_user(
+        user_id: int,
+        db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+):
+    mute = db.get(Mute, (current_user.id, user_id))
+    if mute is None:
+        raise HTTPException(status_code=404, detail="You have not muted this user.")
+
+    db.delete(mute)
+    db.commit()
+    block_cache.invalidate(current_user.id)
+    return {"detail": "Unmuted user successfully."}
+
+
+@router.get("/me/blocked", response_model=List[UserResponse])
+def get_blocked_users(
+        fields: Optional[List[str]] = Depends(sparse_fields(UserResponse)),
+        db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+):
+    blocked = db.execute(select(*columns_for(User, UserResponse, fields))
+                         .join(Block, Block.target_id == User.id)
+                         .where(Block.user_id == current_user.id)
+                         .order_by(Block.created_at.desc())).all()
+    return project(blocked, fields)
+
+
+@router.get("/me/muted", response_model=List[UserResponse])
+def get_muted_users(
+        fields: Optional[List[str]] = Depends(sparse_fields(UserResponse)),
+        db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+):
+    muted = db.execute(select(*columns_for(User, UserResponse, fields))
+                       .join(Mute, Mute.target_id == User.id)
+                       .where(Mute.user_id == current_user.id)
+                       .order_by(Mute.created_at.desc())).all()
+    return project(muted, fields)
+
+
 @router.get("/{user_id}/following", response_model = List[UserResponse])
 def get_following(
         user_id: int,
+        fields: Optional[List[str]] = Depends(sparse_fields(UserResponse)),
         db: Session = Depends(get_db)
 ):
-    following = (db.query(User)
-                 .join(Follow, Follow.following_id == User.id)
-                 .filter(Follow.follower_id == user_id)
-                 .all()
-                 )
-    return following
+    following = db.execute(select(*columns_for(User, UserResponse, fields))
+                         .join(Follow, Follow.following_id == User.id)
+                         .where(Follow.follower_id == user_id)).all()
+    return project(following, fields)
 
 
 @router.get("/{user_id}/followers", response_model = List[UserResponse])
 def get_followers(
         user_id: int,
+        fields: Optional[List[str]] = Depends(sparse_fields(UserResponse)),
         db: Session = Depends(get_db)
 ):
-    followers = (db.query(User)
-                 .join(Follow, Follow.follower_id == User.id)
-                 .filter(Follow.following_id == user_id)
-                 .all()
-                 )
-    return followers
+    followers = db.execute(select(*columns_for(User, UserResponse, fields))
+                         .join(Follow, Follow.follower_id == User.id)
+                         .where(Follow.following_id == user_id)).all()
+    return project(followers, fields)
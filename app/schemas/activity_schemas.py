@@ -0,0 +1,21 @@
+# app/schemas/activity_schemas.py
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+
+class ActivityActor(BaseModel):
+    id: int
+    name: str
+
+class ActivityItem(BaseModel):
+    id: int
+    verb: str
+    post_id: Optional[int] = None
+    actors: List[ActivityActor]
+    others_count: int
+    summary: str
+    created_at: datetime
+
+class ActivityPage(BaseModel):
+    items: List[ActivityItem]
+    next_cursor: Optional[int] = None
@@ -0,0 +1,19 @@
+# app/schemas/admin_schemas.py
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+
+class MetricBucket(BaseModel):
+    bucket: datetime
+    count: int
+
+class MetricSeries(BaseModel):
+    metric: str
+    granularity: str
+    total: int
+    buckets: List[MetricBucket]
+
+class TopUser(BaseModel):
+    user_id: int
+    name: Optional[str] = None  # None once the account is deleted
+    count: int
@@ -0,0 +1,26 @@
+# app/schemas/batch_schemas.py
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+from app.core.config import BATCH_MAX_OPERATIONS
+
+class BatchOperation(BaseModel):
+    op: Literal["like", "unlike", "follow", "unfollow", "comment"]
+    post_id: Optional[int] = None   # like, unlike, comment
+    user_id: Optional[int] = None   # follow, unfollow
+    content: Optional[str] = None   # comment
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation] = Field(..., min_length=1, max_length=BATCH_MAX_OPERATIONS)
+    # All-or-nothing: if any operation fails, nothing is written
+    atomic: bool = False
+
+class BatchResult(BaseModel):
+    index: int
+    op: str
+    status_code: int
+    detail: str
+    id: Optional[int] = None
+
+class BatchResponse(BaseModel):
+    committed: bool
+    results: List[BatchResult]
@@ -0,0 +1,15 @@
+# app/schemas/export_schemas.py
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+class DataExportResponse(BaseModel):
+    id: int
+    format: str
+    status: str  # pending, ready, failed
+    size: Optional[int] = None
+    created_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
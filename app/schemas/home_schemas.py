@@ -0,0 +1,24 @@
+# app/schemas/home_schemas.py
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+from app.schemas.post_schemas import PostResponse
+from app.schemas.user_schemas import UserResponse, UserProfile, SuggestedUser
+
+class UnreadCounts(BaseModel):
+    total: int
+    likes: int
+    comments: int
+    follows: int
+    # True when there are at least ACTIVITY_UNREAD_LIMIT unread events ("99+")
+    capped: bool
+
+class HomeResponse(BaseModel):
+    me: UserResponse
+    # A section is None when it failed; see `errors`
+    feed: Optional[List[PostResponse]] = None
+    profile: Optional[UserProfile] = None
+    suggestions: Optional[List[SuggestedUser]] = None
+    unread: Optional[UnreadCounts] = None
+    # Milliseconds per section and in "total"; sections run concurrently, so total ~ the slowest one
+    timings: Dict[str, float]
+    errors: Dict[str, str] = {}
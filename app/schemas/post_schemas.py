@@ -1,6 +1,6 @@
 # app/schemas/post_schemas.py
 from pydantic import BaseModel, HttpUrl
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 class PostBase(BaseModel):
@@ -10,6 +10,18 @@ class PostBase(BaseModel):
 class PostCreate(PostBase):
     pass
 
+class PostAuthor(BaseModel):
+    id: int
+    name: str
+    avatar_url: Optional[str] = None
+
+class CommentPreview(BaseModel):
+    id: int
+    user_id: int
+    content: str
+    created_at: datetime
+    author: Optional[PostAuthor] = None
+
 class PostResponse(PostBase):
     id: int
     user_id: int
@@ -17,7 +29,23 @@ class PostResponse(PostBase):
     created_at: datetime
     updated_at: datetime
     likes_count: Optional[int] = 0
+    author: Optional[PostAuthor] = None
+    viewer_has_liked: bool = False
+    views: int = 0
+    unique_viewers: int = 0
+    # Only filled when the feed is requested with include_comments=true
+    comments_count: Optional[int] = None
+    top_comments: Optional[List[CommentPreview]] = None
 
     class Config:
         from_attributes = True
 
+
+class TrendingPost(BaseModel):
+    id: int
+    user_id: int
+    content: str
+    image_url: Optional[str] = None
+    created_at: datetime
+    author: Optional[PostAuthor] = None
+    score: float
@@ -0,0 +1,10 @@
+# app/schemas/tag_schemas.py
+from pydantic import BaseModel
+from typing import List, Optional
+from app.schemas.post_schemas import PostResponse
+
+class TagFeed(BaseModel):
+    tag: str
+    post_count: int
+    posts: List[PostResponse]
+    next_cursor: Optional[str] = None
@@ -1,6 +1,6 @@
 # app/schemas/user_schemas.py
 from pydantic import BaseModel, EmailStr
-from typing import List
+from typing import List, Optional
 from app.schemas.post_schemas import PostResponse
 
 class UserBase(BaseModel):
@@ -9,9 +9,11 @@ class UserBase(BaseModel):
 
 class UserCreate(UserBase):
     password: str
+    avatar_url: Optional[str] = None
 
 class UserResponse(UserBase):
     id: int
+    avatar_url: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -37,4 +39,9 @@ class UserProfile(BaseModel):
         from_attributes = True
 
 class UserWithPosts(UserProfile):
-    posts: List[PostResponse]
\ No newline at end of file
+    posts: List[PostResponse]
+
+class SuggestedUser(BaseModel):
+    id: int
+    name: str
+    mutual_count: int
\ No newline at end of file
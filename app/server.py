@@ -0,0 +1,123 @@
+# app/server.py
+"""
+Production entrypoint: import the app once in a master process, then fork
+uvicorn workers that share the listening socket.
+
+Everything imported before the fork (FastAPI, SQLAlchemy, pydantic models,
+the route table) is shared copy-on-write with the workers. gc.freeze() moves
+those objects out of the collector's generations so the workers' GC passes
+don't touch (and therefore copy) their pages. The DB engine is built lazily
+per worker, after the fork, and warmed before the worker accepts traffic.
+
+    python -m app.server --workers 4 --port 8000
+"""
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(app, sock: socket.socket, args) -> None:
+    import uvicorn
+    from app.core import lifecycle
+
+    lifecycle.PROCESS_STARTED = time.perf_counter()
+    # Restore default signal handling; uvicorn installs its own handlers
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+    config = uvicorn.Config(app, lifespan="on", log_level=args.log_level,
+                            backlog=args.backlog, timeout_keep_alive=args.keep_alive)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def spawn(app, sock, args) -> int:
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            run_worker(app, sock, args)
+        except BaseException:
+            import traceback
+            traceback.print_exc()
+            code = 1
+        finally:
+            os._exit(code)
+    return pid
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-fork IGClone server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--backlog", type=int, default=2048)
+    parser.add_argument("--keep-alive", type=int, default=5)
+    parser.add_argument("--log-level", default="warning")
+    parser.add_argument("--warm-connections", type=int, default=None,
+                        help="DB connections each worker opens before serving (default: DB_POOL_SIZE)")
+    args = parser.parse_args(argv)
+
+    # Must be in the environment before app.core.config is imported
+    if args.warm_connections is not None:
+        os.environ["DB_WARM_CONNECTIONS"] = str(args.warm_connections)
+    else:
+        os.environ.setdefault("DB_WARM_CONNECTIONS", os.getenv("DB_POOL_SIZE", "5"))
+
+    started = time.perf_counter()
+    from app.main import app
+    from app.core import lifecycle
+    import_seconds = time.perf_counter() - started
+
+    sock = bind_socket(args.host, args.port, args.backlog)
+
+    gc.collect()
+    gc.freeze()
+    print(f"🚀 IGClone master {os.getpid()} preloaded app in {import_seconds * 1000:.1f}ms "
+          f"(modules={len(sys.modules)}, app import={lifecycle.timings.get('import.app', 0) * 1000:.1f}ms); "
+          f"forking {args.workers} workers on {args.host}:{args.port}")
+
+    workers = {spawn(app, sock, args) for _ in range(args.workers)}
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        workers.discard(pid)
+        if not stopping:
+            print(f"⚠️ worker {pid} exited with status {status}, respawning")
+            workers.add(spawn(app, sock, args))
+
+    sock.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# app/services/activity.py
+"""
+Notifications ("activity") for likes, comments and follows.
+
+Write routes append one compact row per event to the recipient's log, in
+the same transaction as the action itself. Reads walk that log newest-first
+with keyset pagination on (recipient_id, id) and fold bursts of the same
+event on the same post into one item ("X and 42 others liked your post"),
+so a page costs one index range scan no matter how much history exists.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select, insert, delete, func
+from sqlalchemy.orm import Session
+
+from app.core.config import ACTIVITY_RETENTION_DAYS, ACTIVITY_SCAN_LIMIT, ACTIVITY_UNREAD_LIMIT
+from app.db.models import Activity, Post, User
+
+
+def record_activity(db: Session, recipient_id: int, actor_id: int, verb: str,
+                    post_id: Optional[int] = None) -> None:
+    """Queue an event on the caller's session; it commits with the action."""
+    if recipient_id == actor_id:
+        return
+    db.add(Activity(recipient_id=recipient_id, actor_id=actor_id, verb=verb, post_id=post_id))
+
+
+def record_activities(db: Session, actor_id: int, verb: str, post_ids: Iterable[int] = (),
+                      recipient_ids: Iterable[int] = ()) -> None:
+    """Bulk variant used by POST /batch: one INSERT for all events of a verb."""
+    rows = [{"recipient_id": rid, "actor_id": actor_id, "verb": verb, "post_id": None}
+            for rid in recipient_ids if rid != actor_id]
+
+    post_ids = list(post_ids)
+    if post_ids:
+        owners = dict(db.execute(select(Post.id, Post.user_id).where(Post.id.in_(set(post_ids)))).all())
+        rows.extend({"recipient_id": owners[pid], "actor_id": actor_id, "verb": verb, "post_id": pid}
+                    for pid in post_ids if pid in owners and owners[pid] != actor_id)
+
+    if rows:
+        db.execute(insert(Activity), rows)
+
+
+def post_owner_id(db: Session, post_id: int) -> Optional[int]:
+    return db.execute(select(Post.user_id).where(Post.id == post_id)).scalar()
+
+
+def read_activity_page(db: Session, recipient_id: int, limit: int = 20,
+                       cursor: Optional[int] = None) -> Tuple[List[dict], Optional[int]]:
+    """
+    Return up to `limit` aggregated items and the cursor for the next page.
+
+    Events are grouped by (verb, post_id) in first-seen (newest) order. We
+    stop at the first event that would open group `limit + 1`; everything
+    before it has been consumed, so its id is the next cursor. A burst that
+    continues past the cursor simply shows up again, older, on the next page.
+    """
+    stmt = (select(Activity.id, Activity.actor_id, Activity.verb, Activity.post_id, Activity.created_at)
+            .where(Activity.recipient_id == recipient_id))
+    if cursor is not None:
+        stmt = stmt.where(Activity.id < cursor)
+    rows = db.execute(stmt.order_by(Activity.id.desc()).limit(ACTIVITY_SCAN_LIMIT)).all()
+
+    groups: Dict[Tuple[str, Optional[int]], dict] = {}
+    next_cursor = None
+    for row in rows:
+        key = (row.verb, row.post_id)
+        group = groups.get(key)
+        if group is None:
+            if len(groups) == limit:
+                break
+            group = groups[key] = {"id": row.id, "verb": row.verb, "post_id": row.post_id,
+                                   "created_at": row.created_at, "actor_ids": [], "seen": set()}
+        if row.actor_id not in group["seen"]:
+            group["seen"].add(row.actor_id)
+            if len(group["actor_ids"]) < 3:
+                group["actor_ids"].append(row.actor_id)
+        next_cursor = row.id
+    else:
+        # Ran out of rows: there is only a next page if the scan was cut short
+        if len(rows) < ACTIVITY_SCAN_LIMIT:
+            next_cursor = None
+
+    items = list(groups.values())
+    actor_ids = {aid for item in items for aid in item["actor_ids"]}
+    names = dict(db.execute(select(User.id, User.name).where(User.id.in_(actor_ids))).all()) if actor_ids else {}
+
+    for item in items:
+        item["actors"] = [{"id": aid, "name": names.get(aid, "")} for aid in item.pop("actor_ids")]
+        item["others_count"] = len(item.pop("seen")) - 1
+        item["summary"] = summarize(item)
+    return items, next_cursor
+
+
+def unread_counts(db: Session, recipient_id: int, seen_id: int = 0,
+                  limit: int = ACTIVITY_UNREAD_LIMIT) -> Dict[str, int]:
+    """
+    Events per verb newer than `seen_id`, the newest activity id the client
+    has shown. Only the newest `limit` events are counted, so the cost stays
+    one short index range scan however long the user has been away.
+    """
+    newest = (select(Activity.verb)
+              .where(Activity.recipient_id == recipient_id, Activity.id > seen_id)
+              .order_by(Activity.id.desc())
+              .limit(limit)
+              .subquery())
+    return dict(db.execute(select(newest.c.verb, func.count()).group_by(newest.c.verb)).all())
+
+
+def summarize(item: dict) -> str:
+    who = item["actors"][0]["name"] if item["actors"] else "Someone"
+    if item["others_count"]:
+        who = f"{who} and {item['others_count']} other{'s' if item['others_count'] > 1 else ''}"
+    if item["verb"] == "like":
+        return f"{who} liked your post"
+    if item["verb"] == "comment":
+        return f"{who} commented on your post"
+    return f"{who} started following you"
+
+
+def trim_activities(db: Session, retention_days: int = ACTIVITY_RETENTION_DAYS,
+                    batch_size: int = 5000) -> int:
+    """Delete events older than the retention window, oldest first, in short batches."""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+    removed = 0
+    while True:
+        # Oldest rows have the lowest ids, so this walks the primary key from
+        # the start and stops after one batch.
+        ids = db.execute(select(Activity.id)
+                         .where(Activity.created_at < cutoff)
+                         .order_by(Activity.id)
+                         .limit(batch_size)).scalars().all()
+        if not ids:
+            break
+        db.execute(delete(Activity).where(Activity.id.in_(ids)))
+        db.commit()
+        removed += len(ids)
+    return removed
@@ -0,0 +1,222 @@
+# app/services/blocks.py
+"""
+Block and mute lists, applied to feed, comment and search results after
+they are fetched instead of as NOT IN (...) subqueries in every read.
+
+Each user's lists are loaded lazily into a per-process cache: everyone they
+blocked or were blocked by (a block hides both users from each other) and
+everyone they muted. Lists of up to BLOCK_FILTER_EXACT_MAX ids are kept as
+exact sets, longer ones as Bloom filters (about 1.2 bytes per id at 1%)
+whose hits are confirmed with one IN (...) query, so a false positive costs
+a lookup but never hides anyone by mistake. Confirmed answers are kept
+with the filter, so each id is looked up at most once per load.
+
+Routes filter a whole page at once: the page's distinct author ids are
+checked in one pass and the rows dropped in one more, with at most one
+confirmation query per list however long the lists are. Filtering after
+the LIMIT means a page can come back shorter than asked for.
+
+Changes made on this worker update its cache right away (new blocks and
+mutes are added to the filters, removals reload them); other workers pick
+them up within BLOCK_FILTER_TTL_SECONDS. Blocking also removes the follows
+in both directions, so the feed and post permissions, which depend on
+following, reflect a block everywhere immediately.
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Collection, Dict, Iterable, List, Optional, Set, Tuple, TypeVar
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import (
+    BLOCK_FILTER_TTL_SECONDS, BLOCK_FILTER_MAX_ENTRIES, BLOCK_FILTER_EXACT_MAX, BLOCK_FILTER_ERROR_RATE,
+)
+from app.core.sketches import BloomFilter
+from app.db.models import Block, Mute
+from app.schemas.post_schemas import PostResponse
+
+Row = TypeVar("Row")
+
+
+class IdFilter:
+    """
+    A set of user ids: exact when small, otherwise a Bloom filter whose hits
+    are confirmed against the table once and then remembered until reload.
+    """
+    __slots__ = ("exact", "bloom", "verdicts")
+
+    def __init__(self, ids: Collection[int], exact_max: int = BLOCK_FILTER_EXACT_MAX,
+                 error_rate: float = BLOCK_FILTER_ERROR_RATE):
+        self.exact: Optional[frozenset] = None
+        self.bloom: Optional[BloomFilter] = None
+        # Bloom hits already checked against the table: id -> really in the set
+        self.verdicts: Dict[int, bool] = {}
+        if len(ids) <= exact_max:
+            self.exact = frozenset(ids)
+        else:
+            # Headroom for ids added before the next reload
+            self.bloom = BloomFilter(len(ids) + len(ids) // 4, error_rate, ids)
+
+    def add(self, user_id: int) -> None:
+        if self.exact is not None:
+            # Replaced, not mutated: readers on other threads may be iterating it
+            self.exact = self.exact | {user_id}
+        else:
+            self.bloom.add(user_id)
+            self.verdicts[user_id] = True
+
+    def lookup(self, user_ids: Set[int]) -> Tuple[Set[int], Set[int]]:
+        """(ids known to be in the set, Bloom hits that still need confirming)."""
+        if self.exact is not None:
+            return user_ids & self.exact, set()
+        bloom, verdicts = self.bloom, self.verdicts
+        found, unknown = set(), set()
+        for user_id in user_ids:
+            if user_id in bloom:
+                verdict = verdicts.get(user_id)
+                if verdict is None:
+                    unknown.add(user_id)
+                elif verdict:
+                    found.add(user_id)
+        return found, unknown
+
+    def record(self, checked: Set[int], confirmed: Set[int]) -> None:
+        self.verdicts.update((user_id, user_id in confirmed) for user_id in checked)
+
+
+@dataclass
+class UserLists:
+    loaded_at: float
+    blocked: IdFilter  # blocked by or blocking the user
+    muted: IdFilter
+
+
+def _load(db: Session, user_id: int) -> UserLists:
+    blocked = db.execute(select(Block.target_id).where(Block.user_id == user_id)
+                         .union(select(Block.user_id).where(Block.target_id == user_id))).scalars().all()
+    muted = db.execute(select(Mute.target_id).where(Mute.user_id == user_id)).scalars().all()
+    return UserLists(loaded_at=time.monotonic(), blocked=IdFilter(blocked), muted=IdFilter(muted))
+
+
+def _confirm_blocked(db: Session, user_id: int, candidates: Set[int]) -> Set[int]:
+    ids = list(candidates)
+    return set(db.execute(select(Block.target_id).where(Block.user_id == user_id, Block.target_id.in_(ids))
+                          .union(select(Block.user_id).where(Block.target_id == user_id, Block.user_id.in_(ids))))
+               .scalars())
+
+
+def _confirm_muted(db: Session, user_id: int, candidates: Set[int]) -> Set[int]:
+    return set(db.execute(select(Mute.target_id)
+                          .where(Mute.user_id == user_id, Mute.target_id.in_(list(candidates)))).scalars())
+
+
+class BlockCache:
+    def __init__(self, ttl: int = BLOCK_FILTER_TTL_SECONDS, max_entries: int = BLOCK_FILTER_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, UserLists]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.metrics = {"loads": 0, "hits": 0, "confirmations": 0, "false_positives": 0}
+
+    def _lists(self, db: Session, user_id: int) -> UserLists:
+        now = time.monotonic()
+        with self._lock:
+            lists = self._entries.get(user_id)
+            if lists is not None and now - lists.loaded_at < self.ttl:
+                self._entries.move_to_end(user_id)
+                self.metrics["hits"] += 1
+                return lists
+
+        lists = _load(db, user_id)
+        with self._lock:
+            self._entries[user_id] = lists
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self.metrics["loads"] += 1
+        return lists
+
+    def _resolve(self, db: Session, user_id: int, id_filter: IdFilter, ids: Set[int],
+                 confirm: Callable[[Session, int, Set[int]], Set[int]]) -> Set[int]:
+        found, unknown = id_filter.lookup(ids)
+        if not unknown:
+            return found
+        confirmed = confirm(db, user_id, unknown)
+        id_filter.record(unknown, confirmed)
+        with self._lock:
+            self.metrics["confirmations"] += 1
+            self.metrics["false_positives"] += len(unknown) - len(confirmed)
+        return found | confirmed
+
+    def hidden_among(self, db: Session, viewer_id: int, user_ids: Iterable[int],
+                     include_muted: bool = True) -> Set[int]:
+        """The ids among `user_ids` whose content `viewer_id` must not see."""
+        ids = set(user_ids)
+        ids.discard(viewer_id)
+        if not ids:
+            return set()
+        lists = self._lists(db, viewer_id)
+        hidden = self._resolve(db, viewer_id, lists.blocked, ids, _confirm_blocked)
+        if include_muted:
+            hidden |= self._resolve(db, viewer_id, lists.muted, ids - hidden, _confirm_muted)
+        return hidden
+
+    def is_blocked(self, db: Session, user_id: int, other_id: int) -> bool:
+        """Whether either user blocked the other."""
+        return bool(self.hidden_among(db, user_id, [other_id], include_muted=False))
+
+    def on_block(self, user_id: int, target_id: int) -> None:
+        with self._lock:
+            for owner, other in ((user_id, target_id), (target_id, user_id)):
+                lists = self._entries.get(owner)
+                if lists is not None:
+                    lists.blocked.add(other)
+
+    def on_mute(self, user_id: int, target_id: int) -> None:
+        with self._lock:
+            lists = self._entries.get(user_id)
+            if lists is not None:
+                lists.muted.add(target_id)
+
+    def invalidate(self, *user_ids: int) -> None:
+        """Reload on next use: ids can't be taken out of a Bloom filter."""
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self.metrics, entries=len(self._entries))
+
+
+block_cache = BlockCache()
+
+
+def drop_hidden(db: Session, viewer_id: int, rows: List[Row], author: Callable[[Row], int],
+                include_muted: bool = True) -> List[Row]:
+    """`rows` without those whose author is hidden from the viewer."""
+    if not rows:
+        return rows
+    hidden = block_cache.hidden_among(db, viewer_id, {author(row) for row in rows}, include_muted)
+    if not hidden:
+        return rows
+    return [row for row in rows if author(row) not in hidden]
+
+
+def drop_hidden_posts(db: Session, viewer_id: int, posts: List[PostResponse]) -> List[PostResponse]:
+    """Feed variant: hidden authors' posts and comment previews go, resolved in one pass for the page."""
+    if not posts:
+        return posts
+    authors = {post.user_id for post in posts}
+    authors.update(comment.user_id for post in posts for comment in post.top_comments or ())
+    hidden = block_cache.hidden_among(db, viewer_id, authors)
+    if not hidden:
+        return posts
+    kept = [post for post in posts if post.user_id not in hidden]
+    for post in kept:
+        if post.top_comments:
+            post.top_comments = [comment for comment in post.top_comments if comment.user_id not in hidden]
+    return kept
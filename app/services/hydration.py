@@ -0,0 +1,76 @@
+# app/services/hydration.py
+from typing import List
+
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+
+from app.core.config import FEED_COMMENT_PREVIEWS
+from app.db.models import Like, Comment
+from app.db.partitions import month_start
+from app.schemas.post_schemas import PostAuthor, PostResponse, CommentPreview
+from app.services.user_cache import user_cache
+from app.services.impressions import view_counts
+
+
+def hydrate_posts(db: Session, viewer_id: int, posts: List[PostResponse]) -> List[PostResponse]:
+    """
+    Fill `author`, `viewer_has_liked` and the view counters for a whole page at
+    once: at most one IN (...) query for authors missing from the user cache,
+    one for the viewer's likes and one for post_stats, whatever the page size.
+    """
+    if not posts:
+        return posts
+
+    post_ids = [post.id for post in posts]
+    authors = user_cache.get_many(db, {post.user_id for post in posts})
+    liked = set(db.execute(select(Like.post_id)
+                           .where(Like.user_id == viewer_id,
+                                  Like.post_id.in_(post_ids))).scalars())
+    counts = view_counts(db, post_ids)
+
+    for post in posts:
+        card = authors.get(post.user_id)
+        post.author = PostAuthor(**card) if card else None
+        post.viewer_has_liked = post.id in liked
+        post.views, post.unique_viewers = counts.get(post.id, (0, 0))
+    return posts
+
+
+def attach_comment_previews(db: Session, posts: List[PostResponse],
+                            per_post: int = FEED_COMMENT_PREVIEWS) -> List[PostResponse]:
+    """
+    Fill `comments_count` and the newest `per_post` comments of every post on
+    the page: one ROW_NUMBER() window query, one grouped count and at most
+    one user lookup for commenters missing from the user cache.
+    """
+    if not posts:
+        return posts
+
+    post_ids = [post.id for post in posts]
+    # No comment predates its post: lets PostgreSQL skip older comment partitions
+    oldest = month_start(min(post.created_at for post in posts))
+    ranked = (select(Comment.id, Comment.post_id, Comment.user_id, Comment.content, Comment.created_at,
+                     func.row_number().over(partition_by=Comment.post_id,
+                                            order_by=(Comment.created_at.desc(), Comment.id.desc()))
+                     .label("position"))
+              .where(Comment.post_id.in_(post_ids), Comment.created_at >= oldest)
+              .subquery())
+    previews = db.execute(select(ranked)
+                          .where(ranked.c.position <= per_post)
+                          .order_by(ranked.c.post_id, ranked.c.position)).all()
+    counts = dict(db.execute(select(Comment.post_id, func.count(Comment.id))
+                             .where(Comment.post_id.in_(post_ids), Comment.created_at >= oldest)
+                             .group_by(Comment.post_id)).all())
+    authors = user_cache.get_many(db, {row.user_id for row in previews})
+
+    by_post = {}
+    for row in previews:
+        card = authors.get(row.user_id)
+        by_post.setdefault(row.post_id, []).append(CommentPreview(
+            id=row.id, user_id=row.user_id, content=row.content, created_at=row.created_at,
+            author=PostAuthor(**card) if card else None))
+
+    for post in posts:
+        post.comments_count = counts.get(post.id, 0)
+        post.top_comments = by_post.get(post.id, [])
+    return posts
@@ -0,0 +1,167 @@
+# app/services/impressions.py
+"""
+Post view counting without a DB write per view.
+
+Every impression (a post returned by GET /posts/ or GET /posts/{id}) bumps
+an in-memory counter and adds the viewer to a per-post HyperLogLog sketch.
+A background thread flushes the buffer every IMPRESSIONS_FLUSH_SECONDS in
+one transaction: the rows for the flushed posts are locked, the buffered
+sketches merged into the stored ones and the counters added, so workers
+flushing concurrently never lose each other's counts.
+
+Memory is bounded by IMPRESSIONS_MAX_TRACKED_POSTS: each tracked post costs
+its sketch (2**IMPRESSIONS_HLL_PRECISION bytes, 1 KiB by default) plus
+~200 bytes of dict/list overhead, i.e. about 12 MB for the default 10 000
+posts. When the buffer is full an early flush is triggered and impressions
+of posts not yet tracked are dropped (counted in `metrics["dropped"]`)
+until it completes.
+
+Counts returned to clients are the flushed totals plus this worker's
+pending views; unique viewers only move on flush.
+"""
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.core import lifecycle
+from app.core.config import IMPRESSIONS_FLUSH_SECONDS, IMPRESSIONS_MAX_TRACKED_POSTS, IMPRESSIONS_HLL_PRECISION
+from app.core.sketches import HyperLogLog
+from app.db.database import SessionLocal, dialect_insert
+from app.db.models import PostStats
+
+Pending = Dict[int, List]  # post_id -> [views, HyperLogLog]
+
+
+class ImpressionBuffer:
+    def __init__(self, max_posts: int = IMPRESSIONS_MAX_TRACKED_POSTS, precision: int = IMPRESSIONS_HLL_PRECISION):
+        self.max_posts = max_posts
+        self.precision = precision
+        self._pending: Pending = {}
+        self._lock = threading.Lock()
+        self.full = threading.Event()
+        self.metrics = {"recorded": 0, "dropped": 0, "flushed_posts": 0, "flushes": 0}
+
+    def record(self, viewer_id: int, post_ids: Iterable[int]) -> None:
+        with self._lock:
+            for post_id in post_ids:
+                entry = self._pending.get(post_id)
+                if entry is None:
+                    if len(self._pending) >= self.max_posts:
+                        self.metrics["dropped"] += 1
+                        self.full.set()
+                        continue
+                    entry = self._pending[post_id] = [0, HyperLogLog(self.precision)]
+                entry[0] += 1
+                entry[1].add(viewer_id)
+                self.metrics["recorded"] += 1
+
+    def pending_views(self, post_ids: Iterable[int]) -> Dict[int, int]:
+        with self._lock:
+            return {post_id: self._pending[post_id][0] for post_id in post_ids if post_id in self._pending}
+
+    def drain(self) -> Pending:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self.full.clear()
+        return pending
+
+    def restore(self, pending: Pending) -> None:
+        """Put back a batch whose flush failed so it is retried with the next one."""
+        with self._lock:
+            for post_id, (views, sketch) in pending.items():
+                entry = self._pending.setdefault(post_id, [0, HyperLogLog(self.precision)])
+                entry[0] += views
+                entry[1].merge(sketch)
+
+    def tracked_posts(self) -> int:
+        return len(self._pending)
+
+
+impressions = ImpressionBuffer()
+
+
+def _insert_missing(db: Session, post_ids: List[int]) -> None:
+    rows = [{"post_id": post_id, "views": 0, "unique_viewers": 0} for post_id in post_ids]
+    insert = dialect_insert(db)
+    if insert is None:
+        existing = set(db.execute(select(PostStats.post_id).where(PostStats.post_id.in_(post_ids))).scalars())
+        db.add_all(PostStats(**row) for row in rows if row["post_id"] not in existing)
+        db.flush()
+        return
+    db.execute(insert(PostStats).on_conflict_do_nothing(), rows)
+
+
+def write_impressions(db: Session, pending: Pending, precision: int = IMPRESSIONS_HLL_PRECISION) -> None:
+    post_ids = sorted(pending)
+    _insert_missing(db, post_ids)
+    # Lock in post_id order so concurrent flushes from other workers can't deadlock
+    stored = db.execute(select(PostStats.post_id, PostStats.views, PostStats.viewers_hll)
+                        .where(PostStats.post_id.in_(post_ids))
+                        .order_by(PostStats.post_id)
+                        .with_for_update()).all()
+    updates = []
+    for post_id, views, registers in stored:
+        added, sketch = pending[post_id]
+        if registers:
+            sketch.merge(HyperLogLog(precision, registers))
+        updates.append({"post_id": post_id, "views": views + added,
+                        "unique_viewers": sketch.count(), "viewers_hll": sketch.to_bytes()})
+    db.execute(update(PostStats), updates)
+
+
+def flush_impressions() -> int:
+    pending = impressions.drain()
+    if not pending:
+        return 0
+    db = SessionLocal()
+    try:
+        write_impressions(db, pending, impressions.precision)
+        db.commit()
+    except Exception:
+        db.rollback()
+        impressions.restore(pending)
+        raise
+    finally:
+        db.close()
+    impressions.metrics["flushes"] += 1
+    impressions.metrics["flushed_posts"] += len(pending)
+    return len(pending)
+
+
+def view_counts(db: Session, post_ids: List[int]) -> Dict[int, Tuple[int, int]]:
+    """post_id -> (views, unique_viewers): flushed totals plus this worker's pending views."""
+    counts = {post_id: (views, unique_viewers) for post_id, views, unique_viewers in db.execute(
+        select(PostStats.post_id, PostStats.views, PostStats.unique_viewers)
+        .where(PostStats.post_id.in_(post_ids)))}
+    for post_id, views in impressions.pending_views(post_ids).items():
+        flushed_views, unique_viewers = counts.get(post_id, (0, 0))
+        counts[post_id] = (flushed_views + views, unique_viewers)
+    return counts
+
+
+_stop = threading.Event()
+
+
+def _flush_loop() -> None:
+    while not _stop.is_set():
+        # Wake up early when the buffer hits IMPRESSIONS_MAX_TRACKED_POSTS
+        impressions.full.wait(IMPRESSIONS_FLUSH_SECONDS)
+        try:
+            flush_impressions()
+        except Exception as e:
+            print("❌ Impression flush failed:", e)
+
+
+@lifecycle.on_startup
+def start_impression_flusher() -> None:
+    _stop.clear()
+    threading.Thread(target=_flush_loop, name="impression-flusher", daemon=True).start()
+
+
+@lifecycle.on_shutdown
+def stop_impression_flusher() -> None:
+    _stop.set()
+    impressions.full.set()
+    flush_impressions()
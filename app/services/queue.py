@@ -0,0 +1,255 @@
+# app/services/queue.py
+"""
+Durable background jobs.
+
+A job is a row in `jobs`: the kind of its handler, a JSON payload checked
+against the handler's Pydantic model, a priority (lower runs first) and the
+time it becomes due. Jobs are enqueued in the caller's transaction, so
+workers only see a job once the request that created it commits, and it
+disappears with a rollback.
+
+Workers (app/jobs/worker.py) claim due jobs with a single
+UPDATE ... WHERE id IN (SELECT ... FOR UPDATE SKIP LOCKED) ... RETURNING,
+so concurrent workers neither wait for nor double-claim each other's rows.
+SQLite ignores FOR UPDATE but runs the whole statement under its database
+write lock, which gives the same guarantee for local runs.
+
+Each job runs in its own session and transaction. A failed attempt is
+retried after an exponential, jittered backoff until max_attempts, then
+marked failed and kept for inspection; handlers raise PermanentJobError to
+skip the retries. A job whose worker died stays `running` until
+JOB_LEASE_SECONDS have passed and is then queued again, so handlers must be
+safe to run twice (delivery is at least once).
+"""
+import os
+import random
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Generic, Iterable, List, Optional, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.orm import Session
+
+from app.core.config import (JOB_MAX_ATTEMPTS, JOB_RETRY_BASE_SECONDS, JOB_RETRY_MAX_SECONDS,
+                             JOB_LEASE_SECONDS, JOB_RETENTION_HOURS)
+from app.db.database import SessionLocal
+from app.db.models import Job
+
+P = TypeVar("P", bound=BaseModel)
+
+MAX_ERROR_LENGTH = 2000
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler when retrying cannot help; the job fails right away."""
+
+
+class JobType(Generic[P]):
+    def __init__(self, kind: str, payload: Type[P], handler: Callable[[Session, P], None],
+                 priority: int, max_attempts: int):
+        self.kind = kind
+        self.payload = payload
+        self.handler = handler
+        self.priority = priority
+        self.max_attempts = max_attempts
+
+    def enqueue(self, db: Session, payload: P, priority: Optional[int] = None, delay: float = 0) -> Job:
+        """Add a job to the caller's transaction; it becomes visible to workers on commit."""
+        if not isinstance(payload, self.payload):
+            raise TypeError(f"{self.kind} jobs take {self.payload.__name__}, not {type(payload).__name__}")
+        job = Job(kind=self.kind, payload=payload.model_dump_json(),
+                  priority=self.priority if priority is None else priority,
+                  status="queued", attempts=0, max_attempts=self.max_attempts,
+                  run_at=_now() + timedelta(seconds=delay))
+        db.add(job)
+        return job
+
+    def __call__(self, db: Session, payload: P) -> None:
+        """Run the handler inline, e.g. from a script or a test."""
+        self.handler(db, payload)
+
+
+registry: Dict[str, JobType] = {}
+
+
+def job_handler(kind: str, payload: Type[P], priority: int = 0, max_attempts: int = JOB_MAX_ATTEMPTS):
+    """
+    Register `fn(db, payload)` as the handler of `kind` jobs. The decorated
+    name becomes a JobType whose enqueue() only accepts `payload` instances.
+    """
+    def register(fn: Callable[[Session, P], None]) -> JobType[P]:
+        if kind in registry:
+            raise ValueError(f"Job kind {kind!r} is already registered")
+        registry[kind] = job_type = JobType(kind, payload, fn, priority, max_attempts)
+        return job_type
+    return register
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _aware(ts: datetime) -> datetime:
+    # SQLite hands back naive UTC timestamps
+    return ts.replace(tzinfo=timezone.utc) if ts.tzinfo is None else ts
+
+
+def worker_name(index: int) -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{index}"[-64:]
+
+
+def retry_delay(attempts: int, base: float = JOB_RETRY_BASE_SECONDS, cap: float = JOB_RETRY_MAX_SECONDS) -> float:
+    # Jittered so jobs that failed together (e.g. during an outage) don't all come back at once
+    return min(cap, base * 2 ** (attempts - 1)) * random.uniform(0.5, 1.0)
+
+
+@dataclass
+class ClaimedJob:
+    id: int
+    kind: str
+    priority: int
+    payload: str
+    attempts: int
+    max_attempts: int
+    run_at: datetime
+    started_at: datetime
+
+
+metrics = {"claimed": 0, "done": 0, "retried": 0, "failed": 0, "lost": 0}
+_metrics_lock = threading.Lock()
+
+
+def _count(key: str, n: int = 1) -> None:
+    with _metrics_lock:
+        metrics[key] += n
+
+
+def claim_jobs(db: Session, worker: str, limit: int = 1, kinds: Optional[Iterable[str]] = None) -> List[ClaimedJob]:
+    """Mark up to `limit` due jobs as running by `worker` and return them, most urgent first."""
+    now = _now()
+    due = (select(Job.id)
+           .where(Job.status == "queued", Job.run_at <= now)
+           .order_by(Job.priority, Job.run_at, Job.id)
+           .limit(limit)
+           .with_for_update(skip_locked=True))
+    if kinds:
+        due = due.where(Job.kind.in_(list(kinds)))
+    rows = db.execute(update(Job)
+                      .where(Job.id.in_(due), Job.status == "queued")
+                      .values(status="running", attempts=Job.attempts + 1, started_at=now, locked_by=worker)
+                      .returning(Job.id, Job.kind, Job.priority, Job.payload, Job.attempts, Job.max_attempts,
+                                 Job.run_at)
+                      .execution_options(synchronize_session=False)).all()
+    db.commit()
+    _count("claimed", len(rows))
+    # RETURNING doesn't keep the subquery's order
+    return sorted((ClaimedJob(*row, started_at=now) for row in rows), key=lambda job: (job.priority, job.id))
+
+
+def _record_outcome(db: Session, job: ClaimedJob, worker: str, error: Optional[str],
+                    permanent: bool, run_ms: int) -> str:
+    now = _now()
+    if error is None:
+        outcome, values = "done", {"status": "done", "finished_at": now, "last_error": None}
+    elif job.attempts < job.max_attempts and not permanent:
+        outcome, values = "retried", {"status": "queued", "last_error": error,
+                                      "run_at": now + timedelta(seconds=retry_delay(job.attempts))}
+    else:
+        outcome, values = "failed", {"status": "failed", "finished_at": now, "last_error": error}
+    wait_ms = max(0, int((job.started_at - _aware(job.run_at)).total_seconds() * 1000))
+    # Only while still ours: after a lease expiry another worker may own the job
+    updated = db.execute(update(Job)
+                         .where(Job.id == job.id, Job.status == "running", Job.locked_by == worker)
+                         .values(locked_by=None, wait_ms=wait_ms, run_ms=run_ms, **values)
+                         .execution_options(synchronize_session=False)).rowcount
+    db.commit()
+    if not updated:
+        outcome = "lost"
+    _count(outcome)
+    return outcome
+
+
+def run_job(job: ClaimedJob, worker: str) -> str:
+    """Run a claimed job and record the result: "done", "retried", "failed" or "lost"."""
+    error, permanent = None, False
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        try:
+            job_type = registry.get(job.kind)
+            if job_type is None:
+                raise PermanentJobError(f"no handler registered for {job.kind!r}")
+            try:
+                payload = job_type.payload.model_validate_json(job.payload)
+            except ValidationError as e:
+                raise PermanentJobError(f"invalid payload: {e}")
+            job_type.handler(db, payload)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            error = f"{type(e).__name__}: {e}"[:MAX_ERROR_LENGTH]
+            permanent = isinstance(e, PermanentJobError)
+        run_ms = int((time.perf_counter() - started) * 1000)
+        return _record_outcome(db, job, worker, error, permanent, run_ms)
+    finally:
+        db.close()
+
+
+def requeue_expired(db: Session, lease_seconds: int = JOB_LEASE_SECONDS) -> int:
+    """Hand jobs of dead workers back to the queue (or fail them when out of attempts)."""
+    now = _now()
+    expired = (Job.status == "running", Job.started_at < now - timedelta(seconds=lease_seconds))
+    db.execute(update(Job)
+               .where(*expired, Job.attempts >= Job.max_attempts)
+               .values(status="failed", finished_at=now, locked_by=None, last_error="lease expired")
+               .execution_options(synchronize_session=False))
+    requeued = db.execute(update(Job)
+                          .where(*expired)
+                          .values(status="queued", run_at=now, locked_by=None, last_error="lease expired")
+                          .execution_options(synchronize_session=False)).rowcount
+    db.commit()
+    return requeued
+
+
+def purge_finished(db: Session, retention_hours: int = JOB_RETENTION_HOURS) -> int:
+    cutoff = _now() - timedelta(hours=retention_hours)
+    removed = db.execute(delete(Job)
+                         .where(Job.status == "done", Job.finished_at < cutoff)
+                         .execution_options(synchronize_session=False)).rowcount
+    db.commit()
+    return removed
+
+
+def queue_stats(db: Session, window_minutes: int = 60) -> dict:
+    """
+    Queue depth per kind and status, how far behind the queue is (age of the
+    oldest due job) and wait/run latency of the jobs done in the window.
+    """
+    now = _now()
+    depth: Dict[str, Dict[str, int]] = {}
+    for kind, status, count in db.execute(select(Job.kind, Job.status, func.count())
+                                          .group_by(Job.kind, Job.status)):
+        depth.setdefault(kind, {})[status] = count
+
+    due, oldest_due = db.execute(select(func.count(), func.min(Job.run_at))
+                                 .where(Job.status == "queued", Job.run_at <= now)).one()
+
+    latency = {}
+    for kind, done, avg_wait, max_wait, avg_run, max_run in db.execute(
+            select(Job.kind, func.count(), func.avg(Job.wait_ms), func.max(Job.wait_ms),
+                   func.avg(Job.run_ms), func.max(Job.run_ms))
+            .where(Job.status == "done", Job.finished_at >= now - timedelta(minutes=window_minutes))
+            .group_by(Job.kind)):
+        latency[kind] = {"done": done, "avg_wait_ms": round(float(avg_wait or 0), 1), "max_wait_ms": max_wait,
+                         "avg_run_ms": round(float(avg_run or 0), 1), "max_run_ms": max_run}
+
+    return {
+        "depth": depth,
+        "due": due,
+        "lag_seconds": round((now - _aware(oldest_due)).total_seconds(), 3) if oldest_due else 0.0,
+        f"last_{window_minutes}m": latency,
+    }
@@ -0,0 +1,25 @@
+# app/services/realtime.py
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+
+from app.core.pubsub import broker, post_topic
+from app.db.models import Comment, Like
+from app.schemas.comment_schemas import CommentRead
+
+
+def publish_like_count(db: Session, post_id: int) -> None:
+    topic = post_topic(post_id)
+    # Only pay for the COUNT when somebody has the post open
+    if not broker.has_subscribers(topic):
+        return
+    likes_count = db.execute(select(func.count(Like.id)).where(Like.post_id == post_id)).scalar()
+    # Same key for every like update: bursts collapse into the latest count
+    broker.publish(topic, ("likes", post_id), {"type": "likes", "post_id": post_id, "likes_count": likes_count})
+
+
+def publish_comment(comment: Comment) -> None:
+    topic = post_topic(comment.post_id)
+    if not broker.has_subscribers(topic):
+        return
+    payload = CommentRead.model_validate(comment).model_dump(mode="json")
+    broker.publish(topic, ("comment", comment.id), {"type": "comment", "post_id": comment.post_id, "comment": payload})
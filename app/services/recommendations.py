@@ -0,0 +1,170 @@
+# app/services/recommendations.py
+"""
+"Suggested accounts" from the follow graph.
+
+A candidate's score is the number of accounts the user follows that also
+follow the candidate (mutual follows). Instead of a two-hop self-join over
+the whole follows table we take a bounded walk: at most
+RECS_MAX_FOLLOWEES_SAMPLED of the user's followees, and for each of them
+their RECS_MAX_SECOND_HOP_PER_FOLLOWEE most recent follows. The cost per user
+is therefore capped no matter how many accounts they follow.
+
+Results for recently active users are recomputed in a background thread and
+served from an in-process cache.
+"""
+import heapq
+import random
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+
+from app.core import lifecycle
+from app.core.config import (
+    RECS_MAX_FOLLOWEES_SAMPLED, RECS_MAX_SECOND_HOP_PER_FOLLOWEE, RECS_CACHE_TTL_SECONDS,
+    RECS_REFRESH_INTERVAL_SECONDS, RECS_MAX_ACTIVE_USERS,
+)
+from app.db.database import SessionLocal
+from app.db.models import Follow
+
+Suggestion = Tuple[int, int]  # (user_id, mutual_count)
+
+# Largest limit GET /users/suggestions accepts; the cache holds this many so any limit can be cut from it
+MAX_SUGGESTIONS = 50
+
+
+def score_candidates(user_id: int,
+                     following: Iterable[int],
+                     second_hop: Iterable[Sequence[int]],
+                     limit: int = 20) -> List[Suggestion]:
+    """Count how often each second-hop account appears and keep the top `limit`."""
+    exclude = set(following)
+    exclude.add(user_id)
+
+    counts = Counter()
+    for followees in second_hop:
+        counts.update(followees)
+    for seen in exclude:
+        counts.pop(seen, None)
+
+    # Ties broken by lower id so results are stable between refreshes
+    return heapq.nlargest(limit, counts.items(), key=lambda item: (item[1], -item[0]))
+
+
+def load_following(db: Session, user_id: int) -> List[int]:
+    return list(db.execute(select(Follow.following_id).where(Follow.follower_id == user_id)).scalars())
+
+
+def load_second_hop(db: Session, followees: Sequence[int],
+                    per_followee: int = RECS_MAX_SECOND_HOP_PER_FOLLOWEE) -> Dict[int, List[int]]:
+    if not followees:
+        return {}
+
+    # Most recent `per_followee` follows of each followee, in a single query
+    ranked = (select(Follow.follower_id, Follow.following_id,
+                     func.row_number().over(partition_by=Follow.follower_id,
+                                            order_by=Follow.id.desc()).label("rn"))
+              .where(Follow.follower_id.in_(followees))
+              .subquery())
+    rows = db.execute(select(ranked.c.follower_id, ranked.c.following_id)
+                      .where(ranked.c.rn <= per_followee))
+
+    second_hop: Dict[int, List[int]] = {}
+    for follower_id, following_id in rows:
+        second_hop.setdefault(follower_id, []).append(following_id)
+    return second_hop
+
+
+def compute_suggestions(db: Session, user_id: int, limit: int = 20,
+                        max_followees: int = RECS_MAX_FOLLOWEES_SAMPLED) -> List[Suggestion]:
+    following = load_following(db, user_id)
+    sampled = following if len(following) <= max_followees else random.sample(following, max_followees)
+    second_hop = load_second_hop(db, sampled)
+    return score_candidates(user_id, following, second_hop.values(), limit)
+
+
+class SuggestionCache:
+    def __init__(self, ttl: int = RECS_CACHE_TTL_SECONDS, max_active: int = RECS_MAX_ACTIVE_USERS):
+        self.ttl = ttl
+        self.max_active = max_active
+        self._results: Dict[int, Tuple[float, List[Suggestion]]] = {}
+        self._active: "OrderedDict[int, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def mark_active(self, user_id: int) -> None:
+        with self._lock:
+            self._active[user_id] = time.monotonic()
+            self._active.move_to_end(user_id)
+            if len(self._active) > self.max_active:
+                evicted, _ = self._active.popitem(last=False)
+                self._results.pop(evicted, None)
+
+    def get(self, user_id: int) -> Optional[List[Suggestion]]:
+        entry = self._results.get(user_id)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            return None
+        return entry[1]
+
+    def put(self, user_id: int, suggestions: List[Suggestion]) -> None:
+        self._results[user_id] = (time.monotonic(), suggestions)
+
+    def invalidate(self, user_id: int) -> None:
+        self._results.pop(user_id, None)
+
+    def stale_active_users(self, max_age: float) -> List[int]:
+        now = time.monotonic()
+        with self._lock:
+            active = list(self._active)
+        return [uid for uid in active
+                if uid not in self._results or now - self._results[uid][0] > max_age]
+
+
+suggestion_cache = SuggestionCache()
+
+
+def get_suggestions(db: Session, user_id: int, limit: int = 20) -> List[Suggestion]:
+    suggestion_cache.mark_active(user_id)
+    cached = suggestion_cache.get(user_id)
+    if cached is None:
+        cached = compute_suggestions(db, user_id, MAX_SUGGESTIONS)
+        suggestion_cache.put(user_id, cached)
+    return cached[:limit]
+
+
+def refresh_active_users(max_age: float = RECS_REFRESH_INTERVAL_SECONDS) -> int:
+    refreshed = 0
+    db = SessionLocal()
+    try:
+        for user_id in suggestion_cache.stale_active_users(max_age):
+            suggestion_cache.put(user_id, compute_suggestions(db, user_id, MAX_SUGGESTIONS))
+            refreshed += 1
+            # Keep snapshots short so the background walk never holds back vacuum
+            db.rollback()
+    finally:
+        db.close()
+    return refreshed
+
+
+_stop = threading.Event()
+
+
+def _refresh_loop() -> None:
+    while not _stop.wait(RECS_REFRESH_INTERVAL_SECONDS):
+        try:
+            refresh_active_users()
+        except Exception as e:
+            print("❌ Suggestion refresh failed:", e)
+
+
+@lifecycle.on_startup
+def start_suggestion_refresher() -> None:
+    _stop.clear()
+    threading.Thread(target=_refresh_loop, name="suggestion-refresher", daemon=True).start()
+
+
+@lifecycle.on_shutdown
+def stop_suggestion_refresher() -> None:
+    _stop.set()
@@ -0,0 +1,214 @@
+# app/services/rollups.py
+"""
+Analytics rollups: posts, likes, comments and signups counted per hour and
+per day, in total (user_id 0) and per user for the first three.
+
+A watermark batch job (app/jobs/rollup_metrics.py) reads each source table
+past the highest id it has already counted, in id order and batches of
+ROLLUP_BATCH_SIZE, and adds the counts to metric_rollups in the same
+transaction that advances the watermark, so every row is counted exactly
+once however often the job runs or crashes. The watermark row is locked
+while a batch is counted, so overlapping runs simply take turns.
+
+Ids are assigned when a row is inserted but become visible when its
+transaction commits, which is not always in id order. Rows younger than
+ROLLUP_SETTLE_SECONDS are therefore left for the next run; a transaction
+that stays open longer than that can have its rows skipped.
+
+The counts are of rows created: deleting a post or unliking later does not
+subtract anything. Admin endpoints read metric_rollups only.
+"""
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.orm import Session
+
+from app.core.config import ROLLUP_BATCH_SIZE, ROLLUP_SETTLE_SECONDS, ROLLUP_HOURLY_RETENTION_DAYS
+from app.db.database import dialect_insert
+from app.db.models import MetricRollup, RollupWatermark, Post, Like, Comment, User
+
+ALL_USERS = 0
+
+# metric -> (source table, column of the acting user or None)
+SOURCES = {
+    "posts": (Post, Post.user_id),
+    "likes": (Like, Like.user_id),
+    "comments": (Comment, Comment.user_id),
+    "signups": (User, None),
+}
+METRICS = tuple(SOURCES)
+# "Most active": posts, likes and comments together
+ACTIVITY_METRICS = ("posts", "likes", "comments")
+
+Key = Tuple[str, str, int, datetime]  # metric, granularity, user_id, bucket
+
+
+class ColumnarExportUnavailable(RuntimeError):
+    pass
+
+
+def utc(ts: datetime) -> datetime:
+    # SQLite hands back naive UTC timestamps
+    return ts.replace(tzinfo=timezone.utc) if ts.tzinfo is None else ts.astimezone(timezone.utc)
+
+
+def bucket_start(ts: datetime, granularity: str) -> datetime:
+    ts = utc(ts).replace(minute=0, second=0, microsecond=0)
+    return ts.replace(hour=0) if granularity == "day" else ts
+
+
+def _add_counts(db: Session, counts: Dict[Key, int]) -> None:
+    rows = [{"metric": metric, "granularity": granularity, "user_id": user_id, "bucket": bucket, "count": count}
+            for (metric, granularity, user_id, bucket), count in counts.items()]
+    if not rows:
+        return
+    insert = dialect_insert(db)
+    if insert is not None:
+        stmt = insert(MetricRollup)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[MetricRollup.metric, MetricRollup.granularity, MetricRollup.user_id, MetricRollup.bucket],
+            set_={"count": MetricRollup.count + stmt.excluded.count})
+        db.execute(stmt, rows)
+        return
+    for row in rows:
+        key = (MetricRollup.metric == row["metric"], MetricRollup.granularity == row["granularity"],
+               MetricRollup.user_id == row["user_id"], MetricRollup.bucket == row["bucket"])
+        if db.execute(update(MetricRollup).where(*key).values(count=MetricRollup.count + row["count"])).rowcount == 0:
+            db.add(MetricRollup(**row))
+    db.flush()
+
+
+def _locked_watermark(db: Session, metric: str) -> int:
+    insert = dialect_insert(db)
+    if insert is not None:
+        db.execute(insert(RollupWatermark).on_conflict_do_nothing(), [{"source": metric, "last_id": 0}])
+    elif db.get(RollupWatermark, metric) is None:
+        db.add(RollupWatermark(source=metric, last_id=0))
+        db.flush()
+    return db.execute(select(RollupWatermark.last_id)
+                      .where(RollupWatermark.source == metric)
+                      .with_for_update()).scalar()
+
+
+def roll_up_batch(db: Session, metric: str, batch_size: int = ROLLUP_BATCH_SIZE,
+                  settle_seconds: int = ROLLUP_SETTLE_SECONDS) -> Tuple[int, bool]:
+    """Count the next batch of `metric`'s source rows and commit; returns (rows counted, more to do)."""
+    model, user_column = SOURCES[metric]
+    last_id = _locked_watermark(db, metric)
+    settled_before = datetime.now(timezone.utc) - timedelta(seconds=settle_seconds)
+    columns = [model.id, model.created_at] + ([user_column] if user_column is not None else [])
+    rows = db.execute(select(*columns).where(model.id > last_id).order_by(model.id).limit(batch_size)).all()
+
+    counts: Counter = Counter()
+    taken = 0
+    for row in rows:
+        created_at = row[1]
+        if created_at is not None:
+            if utc(created_at) >= settled_before:
+                break
+            for granularity in ("hour", "day"):
+                bucket = bucket_start(created_at, granularity)
+                counts[(metric, granularity, ALL_USERS, bucket)] += 1
+                if user_column is not None:
+                    counts[(metric, granularity, row[2], bucket)] += 1
+        last_id = row[0]
+        taken += 1
+
+    _add_counts(db, counts)
+    if taken:
+        db.execute(update(RollupWatermark).where(RollupWatermark.source == metric).values(last_id=last_id))
+    db.commit()
+    return taken, taken == batch_size
+
+
+def roll_up(db: Session, metrics: Iterable[str] = METRICS, batch_size: int = ROLLUP_BATCH_SIZE) -> Dict[str, int]:
+    """Bring every metric up to date; returns the rows counted per metric."""
+    counted = {}
+    for metric in metrics:
+        counted[metric] = 0
+        more = True
+        while more:
+            taken, more = roll_up_batch(db, metric, batch_size)
+            counted[metric] += taken
+    return counted
+
+
+def prune_hourly(db: Session, keep_days: int = ROLLUP_HOURLY_RETENTION_DAYS) -> int:
+    cutoff = bucket_start(datetime.now(timezone.utc) - timedelta(days=keep_days), "day")
+    removed = db.execute(delete(MetricRollup)
+                         .where(MetricRollup.granularity == "hour", MetricRollup.bucket < cutoff)).rowcount
+    db.commit()
+    return removed
+
+
+def metric_series(db: Session, metric: str, granularity: str, since: datetime, until: datetime,
+                  user_id: int = ALL_USERS) -> List[Tuple[datetime, int]]:
+    """(bucket, count) for every bucket in [since, until), zeros included."""
+    step = timedelta(days=1) if granularity == "day" else timedelta(hours=1)
+    start, end = bucket_start(since, granularity), bucket_start(until, granularity)
+    stored = {utc(bucket): count for bucket, count in db.execute(
+        select(MetricRollup.bucket, MetricRollup.count)
+        .where(MetricRollup.metric == metric, MetricRollup.granularity == granularity,
+               MetricRollup.user_id == user_id, MetricRollup.bucket >= start, MetricRollup.bucket < end))}
+    series = []
+    bucket = start
+    while bucket < end:
+        series.append((bucket, stored.get(bucket, 0)))
+        bucket += step
+    return series
+
+
+def top_users(db: Session, metrics: Iterable[str], since: datetime, limit: int,
+              until: Optional[datetime] = None) -> List[Tuple[int, int]]:
+    """(user_id, count) of the most active users over whole days from `since`, from the daily buckets."""
+    total = func.sum(MetricRollup.count).label("total")
+    stmt = (select(MetricRollup.user_id, total)
+            .where(MetricRollup.metric.in_(list(metrics)), MetricRollup.granularity == "day",
+                   MetricRollup.bucket >= bucket_start(since, "day"), MetricRollup.user_id != ALL_USERS)
+            .group_by(MetricRollup.user_id)
+            .order_by(total.desc(), MetricRollup.user_id)
+            .limit(limit))
+    if until is not None:
+        stmt = stmt.where(MetricRollup.bucket < bucket_start(until, "day"))
+    return [(user_id, int(count)) for user_id, count in db.execute(stmt)]
+
+
+def write_columnar(db: Session, sink, fmt: str = "parquet", batch_rows: int = 50000) -> int:
+    """
+    Write metric_rollups as Parquet or an Arrow IPC file to `sink` (a path or
+    binary file), streaming batch_rows rows at a time; returns the row count.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ColumnarExportUnavailable("Parquet/Arrow export requires pyarrow (pip install pyarrow)")
+
+    schema = pa.schema([
+        ("metric", pa.string()),
+        ("granularity", pa.string()),
+        ("user_id", pa.int64()),
+        ("bucket", pa.timestamp("us", tz="UTC")),
+        ("count", pa.int64()),
+    ])
+    writer = pq.ParquetWriter(sink, schema) if fmt == "parquet" else pa.ipc.new_file(sink, schema)
+    written = 0
+    try:
+        result = db.execute(select(MetricRollup.metric, MetricRollup.granularity, MetricRollup.user_id,
+                                   MetricRollup.bucket, MetricRollup.count)
+                            .order_by(MetricRollup.metric, MetricRollup.granularity, MetricRollup.user_id,
+                                      MetricRollup.bucket)
+                            .execution_options(yield_per=batch_rows))
+        for rows in result.partitions():
+            metric, granularity, user_id, bucket, count = zip(*rows)
+            writer.write_table(pa.table({
+                "metric": metric, "granularity": granularity, "user_id": user_id,
+                "bucket": [utc(ts) for ts in bucket], "count": count,
+            }, schema=schema))
+            written += len(rows)
+    finally:
+        writer.close()
+    return written
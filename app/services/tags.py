@@ -0,0 +1,156 @@
+# app/services/tags.py
+"""
+#hashtag and @mention extraction and the tag feed.
+
+Post content is tokenized once on write with a single precompiled pattern
+(a few microseconds for a typical caption) into post_tags / post_mentions,
+so a tag feed is an index range scan on (tag, created_at, post_id) instead
+of a scan over all post content. tag_counts is adjusted in the same
+transaction as the post write, by the difference between the old and the
+new tag set.
+
+Tokens are NFKC-normalized and casefolded, so #Café, #CAFÉ and #café
+(decomposed accent) are the same tag.
+"""
+import base64
+import re
+import unicodedata
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import select, delete, update, func, tuple_, union_all, literal
+from sqlalchemy.orm import Session
+
+from app.db.database import dialect_insert
+from app.db.models import Post, PostTag, PostMention, TagCount, User, Follow
+
+MAX_TOKEN_LENGTH = 100
+MAX_TAGS_PER_POST = 30
+
+# \w covers letters and digits of every script; combining marks are not \w, so the
+# ones that stay separate after NFKC (e.g. Indic vowel signs) are listed explicitly.
+_WORD = r"[\w\u0300-\u036f\u0900-\u0dff\u200c\u200d]"
+_TOKEN = re.compile(rf"(?<![\w#@])([#@])({_WORD}{{1,{MAX_TOKEN_LENGTH}}})")
+
+
+def normalize_tag(token: str) -> str:
+    if token.isascii():
+        return token.lower()[:MAX_TOKEN_LENGTH]
+    # Casefolding can lengthen a token ("ß" -> "ss"): cut after it, to fit the String(100) columns
+    return unicodedata.normalize("NFKC", token).casefold()[:MAX_TOKEN_LENGTH]
+
+
+def extract_tokens(content: str) -> Tuple[List[str], List[str]]:
+    """Distinct normalized (hashtags, mentions) in order of first appearance."""
+    if "#" not in content and "@" not in content:
+        return [], []
+    if not content.isascii():
+        content = unicodedata.normalize("NFKC", content)
+    tags: Dict[str, None] = {}
+    mentions: Dict[str, None] = {}
+    for sigil, word in _TOKEN.findall(content):
+        target = tags if sigil == "#" else mentions
+        if len(target) < MAX_TAGS_PER_POST:
+            target[normalize_tag(word)] = None
+    return list(tags), list(mentions)
+
+
+def _bump_tag_counts(db: Session, deltas: Dict[str, int]) -> None:
+    deltas = {tag: delta for tag, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    insert = dialect_insert(db)
+    if insert is not None:
+        stmt = insert(TagCount)
+        stmt = stmt.on_conflict_do_update(index_elements=[TagCount.tag],
+                                          set_={"post_count": TagCount.post_count + stmt.excluded.post_count})
+        db.execute(stmt, [{"tag": tag, "post_count": delta} for tag, delta in deltas.items()])
+    else:
+        existing = set(db.execute(select(TagCount.tag).where(TagCount.tag.in_(deltas))).scalars())
+        for tag, delta in deltas.items():
+            if tag in existing:
+                db.execute(update(TagCount).where(TagCount.tag == tag)
+                           .values(post_count=TagCount.post_count + delta))
+            else:
+                db.add(TagCount(tag=tag, post_count=delta))
+    db.execute(delete(TagCount).where(TagCount.tag.in_(deltas), TagCount.post_count <= 0))
+
+
+def _resolve_mentions(db: Session, handles: List[str]) -> Dict[str, int]:
+    """handle -> user id, for handles matching exactly one user's name."""
+    matches: Dict[str, Set[int]] = {}
+    rows = db.execute(select(User.id, func.lower(User.name)).where(func.lower(User.name).in_(handles)))
+    for user_id, name in rows:
+        matches.setdefault(name, set()).add(user_id)
+    return {name: ids.pop() for name, ids in matches.items() if len(ids) == 1}
+
+
+def index_post(db: Session, post: Post) -> None:
+    """(Re)build the tag and mention rows of a flushed post in the caller's transaction."""
+    tags, mentions = extract_tokens(post.content)
+    old_tags = set(db.execute(select(PostTag.tag).where(PostTag.post_id == post.id)).scalars())
+    added = [tag for tag in tags if tag not in old_tags]
+    removed = old_tags - set(tags)
+
+    if removed:
+        db.execute(delete(PostTag).where(PostTag.post_id == post.id, PostTag.tag.in_(removed)))
+    if added:
+        db.add_all(PostTag(tag=tag, post_id=post.id, user_id=post.user_id, created_at=post.created_at)
+                   for tag in added)
+    _bump_tag_counts(db, {**{tag: 1 for tag in added}, **{tag: -1 for tag in removed}})
+
+    db.execute(delete(PostMention).where(PostMention.post_id == post.id))
+    if mentions:
+        user_ids = _resolve_mentions(db, mentions)
+        db.add_all(PostMention(mention=handle, post_id=post.id, user_id=user_ids.get(handle),
+                               created_at=post.created_at)
+                   for handle in mentions)
+
+
+def unindex_posts(db: Session, post_ids) -> None:
+    """Drop the tag and mention rows of posts about to be deleted; `post_ids` may be a subquery."""
+    counts = db.execute(select(PostTag.tag, func.count())
+                        .where(PostTag.post_id.in_(post_ids))
+                        .group_by(PostTag.tag)).all()
+    _bump_tag_counts(db, {tag: -count for tag, count in counts})
+    db.execute(delete(PostTag).where(PostTag.post_id.in_(post_ids)))
+    db.execute(delete(PostMention).where(PostMention.post_id.in_(post_ids)))
+
+
+def encode_cursor(created_at: datetime, post_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{post_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, post_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(post_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def read_tag_page(db: Session, viewer_id: int, tag: str, limit: int,
+                  cursor: Optional[str] = None) -> Tuple[List[int], Optional[str]]:
+    """
+    Post ids for one page of a tag feed, newest first, limited to posts the
+    viewer may see (their own and those of accounts they follow).
+    """
+    visible_authors = union_all(select(Follow.following_id).where(Follow.follower_id == viewer_id),
+                                select(literal(viewer_id)))
+    stmt = (select(PostTag.post_id, PostTag.created_at)
+            .where(PostTag.tag == normalize_tag(tag), PostTag.user_id.in_(visible_authors))
+            .order_by(PostTag.created_at.desc(), PostTag.post_id.desc())
+            .limit(limit + 1))
+    if cursor:
+        stmt = stmt.where(tuple_(PostTag.created_at, PostTag.post_id) < tuple_(*decode_cursor(cursor)))
+
+    rows = db.execute(stmt).all()
+    next_cursor = encode_cursor(rows[limit - 1].created_at, rows[limit - 1].post_id) if len(rows) > limit else None
+    return [row.post_id for row in rows[:limit]], next_cursor
+
+
+def tag_post_count(db: Session, tag: str) -> int:
+    return db.execute(select(TagCount.post_count).where(TagCount.tag == normalize_tag(tag))).scalar() or 0
+
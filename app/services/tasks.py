@@ -0,0 +1,94 @@
+# app/services/tasks.py
+"""
+Job handlers (see app/services/queue.py). The worker imports this module,
+so every handler defined here is registered before it claims anything.
+"""
+import contextlib
+import os
+from datetime import datetime, timezone
+from typing import List
+
+from pydantic import BaseModel
+from sqlalchemy import select, update, delete
+from sqlalchemy.orm import Session
+
+from app.core.config import EXPORT_DIR, EXPORT_RETENTION_HOURS
+from app.core.storage import get_storage
+from app.db.models import Post, DataExport
+from app.services.export import export_path, write_export
+from app.services.queue import job_handler
+
+# URLs per delete_media job, so a large account doesn't become one huge job
+MEDIA_URLS_PER_JOB = 500
+
+
+class DeleteMedia(BaseModel):
+    urls: List[str]
+
+
+@job_handler("delete_media", DeleteMedia, priority=10)
+def delete_media(db: Session, payload: DeleteMedia) -> None:
+    """Remove the stored files of deleted posts; app/jobs/gc_uploads.py still sweeps anything missed."""
+    still_used = set(db.execute(select(Post.image_url).where(Post.image_url.in_(payload.urls))).scalars())
+    storage = get_storage()
+    for url in payload.urls:
+        key = storage.key_for_url(url)
+        if key and url not in still_used:
+            storage.delete(key)
+
+
+def enqueue_media_deletion(db: Session, urls: List[str]) -> None:
+    for start in range(0, len(urls), MEDIA_URLS_PER_JOB):
+        delete_media.enqueue(db, DeleteMedia(urls=urls[start:start + MEDIA_URLS_PER_JOB]))
+
+
+class ExportUserData(BaseModel):
+    export_id: int
+
+
+class PurgeExport(BaseModel):
+    export_id: int
+    format: str
+
+
+@job_handler("purge_export", PurgeExport, priority=10)
+def purge_export(db: Session, payload: PurgeExport) -> None:
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(export_path(payload.export_id, payload.format))
+    db.execute(delete(DataExport).where(DataExport.id == payload.export_id))
+
+
+@job_handler("export_user_data", ExportUserData, max_attempts=3)
+def export_user_data(db: Session, payload: ExportUserData) -> None:
+    export = db.get(DataExport, payload.export_id)
+    if export is None or export.status == "ready":
+        return
+    user_id, fmt = export.user_id, export.format
+    # Don't keep this transaction open while the file is written
+    db.commit()
+
+    path = export_path(payload.export_id, fmt)
+    partial = path + ".part"
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    try:
+        with open(partial, "wb") as out:
+            missing = write_export(user_id, fmt, out)
+        os.replace(partial, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(partial)
+        raise
+    if missing:
+        print(f"⚠️  Export {payload.export_id}: {missing} images no longer in storage")
+
+    db.execute(update(DataExport)
+               .where(DataExport.id == payload.export_id)
+               .values(status="ready", size=os.path.getsize(path), finished_at=datetime.now(timezone.utc)))
+    purge_export.enqueue(db, PurgeExport(export_id=payload.export_id, format=fmt),
+                         delay=EXPORT_RETENTION_HOURS * 3600)
+
+
+def enqueue_export_purges(db: Session, user_id: int) -> None:
+    """Delete a user's export files now rather than when they expire."""
+    for export_id, fmt in db.execute(select(DataExport.id, DataExport.format).where(DataExport.user_id == user_id)):
+        purge_export.enqueue(db, PurgeExport(export_id=export_id, format=fmt))
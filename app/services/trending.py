@@ -0,0 +1,251 @@
+# app/services/trending.py
+"""
+Trending posts: time-decayed engagement over a sliding window, top-K kept
+incrementally so GET /posts/trending never aggregates the likes table.
+
+Likes and comments are recorded after they commit. Each event adds its
+weight (TRENDING_COMMENT_WEIGHT for comments) to the post's score in the
+event's time bucket. Decay is applied by growth instead of shrinkage: an
+event in bucket b counts exp(rate * (b - base)), so newer events weigh more
+and existing scores never need touching as time passes; dividing by the
+current bucket's factor gives the decayed score. When a bucket leaves the
+window its contributions are subtracted. The base is moved forward now and
+then to keep the factors in float range (order is unaffected).
+
+The top K are a score map plus a lazily-cleaned min-heap: an increase
+costs O(log K) and a read only sorts the K entries, however many posts or
+likes exist. Decreases (bucket expiry) only mark the
+top K dirty; the next read rebuilds it with one nlargest pass.
+
+The engine is per worker and in-memory. It is rebuilt from the window's
+likes and comments (one streaming pass per table) at startup and every
+TRENDING_REBUILD_SECONDS, which also folds in events other workers saw and
+removes unliked likes. Events arriving while a rebuild runs are replayed
+onto the rebuilt state.
+"""
+import heapq
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core import lifecycle
+from app.core.config import (TRENDING_TOP_K, TRENDING_BUCKET_SECONDS, TRENDING_WINDOW_HOURS,
+                             TRENDING_HALF_LIFE_HOURS, TRENDING_COMMENT_WEIGHT, TRENDING_REBUILD_SECONDS)
+from app.db.database import SessionLocal
+from app.db.models import Like, Comment
+
+# Move the amplification base once factors reach e**REBASE_EXPONENT
+REBASE_EXPONENT = 50.0
+
+
+class TrendingEngine:
+    def __init__(self, k: int = TRENDING_TOP_K, bucket_seconds: int = TRENDING_BUCKET_SECONDS,
+                 window_hours: float = TRENDING_WINDOW_HOURS, half_life_hours: float = TRENDING_HALF_LIFE_HOURS,
+                 weights: Optional[Dict[str, float]] = None):
+        self.k = k
+        self.bucket_seconds = bucket_seconds
+        self.window_hours = window_hours
+        self.half_life_hours = half_life_hours
+        self.window_buckets = max(1, int(window_hours * 3600 // bucket_seconds))
+        self.rate = math.log(2) / (half_life_hours * 3600 / bucket_seconds)
+        self.weights = weights or {"like": 1.0, "comment": TRENDING_COMMENT_WEIGHT}
+        self._lock = threading.Lock()
+        self._journal: Optional[List[Tuple[int, str, float]]] = None
+        self._reset()
+
+    def _reset(self) -> None:
+        self._base: Optional[int] = None
+        self._buckets: Dict[int, Dict[int, float]] = {}
+        self._scores: Dict[int, float] = {}
+        self._top: Dict[int, float] = {}
+        self._heap: List[Tuple[float, int]] = []
+        self._dirty = False
+
+    # -- writes ---------------------------------------------------------
+
+    def record(self, post_id: int, kind: str, at: Optional[float] = None) -> None:
+        at = time.time() if at is None else at
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append((post_id, kind, at))
+            self._record(post_id, self.weights[kind], at)
+
+    def _record(self, post_id: int, weight: float, at: float) -> None:
+        now_bucket = int(time.time() // self.bucket_seconds)
+        self._advance(now_bucket)
+        bucket = int(at // self.bucket_seconds)
+        if bucket <= now_bucket - self.window_buckets:
+            return
+        amplified = weight * math.exp(self.rate * (bucket - self._base))
+        contributions = self._buckets.setdefault(bucket, {})
+        contributions[post_id] = contributions.get(post_id, 0.0) + amplified
+        self._change(post_id, amplified)
+
+    def _advance(self, now_bucket: int) -> None:
+        if self._base is None:
+            self._base = now_bucket
+        cutoff = now_bucket - self.window_buckets
+        for bucket in [b for b in self._buckets if b <= cutoff]:
+            for post_id, amplified in self._buckets.pop(bucket).items():
+                self._change(post_id, -amplified)
+        if self.rate * (now_bucket - self._base) > REBASE_EXPONENT:
+            self._rebase(now_bucket)
+
+    def _rebase(self, new_base: int) -> None:
+        factor = math.exp(-self.rate * (new_base - self._base))
+        self._base = new_base
+        self._scores = {pid: score * factor for pid, score in self._scores.items()}
+        self._buckets = {b: {pid: v * factor for pid, v in c.items()} for b, c in self._buckets.items()}
+        self._dirty = True
+
+    def _change(self, post_id: int, delta: float) -> None:
+        score = self._scores.get(post_id, 0.0) + delta
+        if delta < 0:
+            # Expiry: float residue of a fully expired post is dropped
+            if score <= 1e-9 * abs(delta):
+                self._scores.pop(post_id, None)
+            else:
+                self._scores[post_id] = score
+            if post_id in self._top:
+                self._dirty = True
+            return
+
+        self._scores[post_id] = score
+        if self._dirty:
+            return
+        if post_id in self._top or len(self._top) < self.k:
+            self._top[post_id] = score
+            heapq.heappush(self._heap, (score, post_id))
+        elif score > self._min_top():
+            evicted = heapq.heappop(self._heap)[1]
+            del self._top[evicted]
+            self._top[post_id] = score
+            heapq.heappush(self._heap, (score, post_id))
+        if len(self._heap) > 4 * self.k + 64:
+            self._heap = [(s, pid) for pid, s in self._top.items()]
+            heapq.heapify(self._heap)
+
+    def _min_top(self) -> float:
+        # Drop heap entries left behind by later increases of the same post
+        while self._heap and self._top.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0]
+
+    # -- reads ----------------------------------------------------------
+
+    def top(self, n: Optional[int] = None) -> List[Tuple[int, float]]:
+        """(post_id, decayed score) pairs, best first."""
+        with self._lock:
+            now_bucket = int(time.time() // self.bucket_seconds)
+            self._advance(now_bucket)
+            if self._dirty:
+                best = heapq.nlargest(self.k, self._scores.items(), key=lambda item: item[1])
+                self._top = dict(best)
+                self._heap = [(score, pid) for pid, score in best]
+                heapq.heapify(self._heap)
+                self._dirty = False
+            decay = math.exp(-self.rate * (now_bucket - self._base)) if self._base is not None else 1.0
+            ranked = sorted(self._top.items(), key=lambda item: item[1], reverse=True)[:n]
+        return [(post_id, score * decay) for post_id, score in ranked]
+
+    def tracked_posts(self) -> int:
+        return len(self._scores)
+
+    # -- rebuild --------------------------------------------------------
+
+    def empty_copy(self) -> "TrendingEngine":
+        return TrendingEngine(self.k, self.bucket_seconds, self.window_hours, self.half_life_hours, self.weights)
+
+    def begin_rebuild(self) -> None:
+        with self._lock:
+            self._journal = []
+
+    def abort_rebuild(self) -> None:
+        with self._lock:
+            self._journal = None
+
+    def finish_rebuild(self, fresh: "TrendingEngine") -> None:
+        """
+        Adopt a freshly loaded engine's state and replay events recorded
+        meanwhile (an event committed just before the load's snapshot counts
+        twice until the next rebuild).
+        """
+        with self._lock:
+            journal, self._journal = self._journal or [], None
+            self._base, self._buckets, self._scores = fresh._base, fresh._buckets, fresh._scores
+            self._top, self._heap, self._dirty = {}, [], True
+            for post_id, kind, at in journal:
+                self._record(post_id, self.weights[kind], at)
+
+
+trending = TrendingEngine()
+
+
+def _timestamps(rows: Iterable[Tuple[int, datetime]]) -> Iterable[Tuple[int, float]]:
+    for post_id, created_at in rows:
+        if created_at is None:
+            continue
+        if created_at.tzinfo is None:
+            # SQLite hands back naive UTC timestamps
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        yield post_id, created_at.timestamp()
+
+
+def load_window(db: Session, engine: TrendingEngine) -> int:
+    """Stream the window's likes and comments into `engine`; returns the number of events."""
+    since = datetime.now(timezone.utc) - timedelta(seconds=engine.window_buckets * engine.bucket_seconds)
+    loaded = 0
+    for model, kind in ((Like, "like"), (Comment, "comment")):
+        rows = db.execute(select(model.post_id, model.created_at)
+                          .where(model.created_at >= since)
+                          .execution_options(yield_per=10000))
+        weight = engine.weights[kind]
+        for post_id, at in _timestamps(rows):
+            engine._record(post_id, weight, at)
+            loaded += 1
+    return loaded
+
+
+def rebuild_trending() -> int:
+    trending.begin_rebuild()
+    fresh = trending.empty_copy()
+    db = SessionLocal()
+    try:
+        loaded = load_window(db, fresh)
+    except Exception:
+        trending.abort_rebuild()
+        raise
+    finally:
+        db.close()
+    trending.finish_rebuild(fresh)
+    return loaded
+
+
+_stop = threading.Event()
+
+
+def _rebuild_loop() -> None:
+    while True:
+        try:
+            rebuild_trending()
+        except Exception as e:
+            print("❌ Trending rebuild failed:", e)
+        if _stop.wait(TRENDING_REBUILD_SECONDS):
+            return
+
+
+@lifecycle.on_startup
+def start_trending_rebuilder() -> None:
+    # The first load runs in the background: until it lands, /posts/trending serves live events only
+    _stop.clear()
+    threading.Thread(target=_rebuild_loop, name="trending-rebuilder", daemon=True).start()
+
+
+@lifecycle.on_shutdown
+def stop_trending_rebuilder() -> None:
+    _stop.set()
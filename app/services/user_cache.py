@@ -0,0 +1,64 @@
+# app/services/user_cache.py
+"""
+Small per-process cache of public user cards (id, name, avatar_url).
+
+Post authors repeat heavily across feed pages, so most lookups are hits;
+misses for a whole page are filled with one IN (...) query. Entries expire
+after USER_CACHE_TTL_SECONDS and are dropped eagerly when a user updates or
+deletes their account on this worker.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import USER_CACHE_TTL_SECONDS, USER_CACHE_MAX_ENTRIES
+from app.db.models import User
+
+UserCard = Dict[str, object]
+
+
+class UserCache:
+    def __init__(self, ttl: int = USER_CACHE_TTL_SECONDS, max_entries: int = USER_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, Tuple[float, UserCard]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, db: Session, user_ids: Iterable[int]) -> Dict[int, UserCard]:
+        now = time.monotonic()
+        found: Dict[int, UserCard] = {}
+        missing = []
+        with self._lock:
+            for user_id in set(user_ids):
+                entry = self._entries.get(user_id)
+                if entry is not None and now - entry[0] < self.ttl:
+                    found[user_id] = entry[1]
+                    self._entries.move_to_end(user_id)
+                else:
+                    missing.append(user_id)
+            self.hits += len(found)
+            self.misses += len(missing)
+
+        if missing:
+            rows = db.execute(select(User.id, User.name, User.avatar_url).where(User.id.in_(missing))).all()
+            with self._lock:
+                for user_id, name, avatar_url in rows:
+                    card = {"id": user_id, "name": name, "avatar_url": avatar_url}
+                    found[user_id] = card
+                    self._entries[user_id] = (now, card)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return found
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+
+user_cache = UserCache()
@@ -0,0 +1,174 @@
+# bench/admission_bench.py
+"""
+Overload test for the admission controller (app/core/admission.py).
+
+First measures the feed's capacity with a closed loop of clients, then
+offers --overload times that rate as open-loop (Poisson) arrivals, 80%
+GET /posts/ (feed class) and 20% GET /users/me (reads class), once with
+and once without admission control. Prints each route's success/503 counts
+and latency percentiles.
+
+Without admission every request queues for the threadpool and the DB pool,
+so latency keeps growing for as long as the overload lasts, for /users/me
+too, until clients give up (--timeout) or pool checkouts time out (error).
+With it the feed requests that can't be served within their deadline get a
+503, admitted feed requests wait at most their class's deadline_ms, and
+/users/me is served without 503s. After the ON run the bench prints each
+class's limit and the service time of its last window.
+
+Runs in-process (httpx ASGITransport, SQLite), so the numbers are only
+comparable between the two runs of the same invocation.
+
+    python -m bench.admission_bench --seconds 10 --overload 2
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+_db_dir = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_dir}/bench.db")
+os.environ.setdefault("JWT_SECRET_KEY", "bench-secret")
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+import httpx  # noqa: E402
+
+from app.core.admission import controller  # noqa: E402
+from app.core.auth_utils import create_access_token  # noqa: E402
+from app.db.database import SessionLocal, engine  # noqa: E402
+from app.db.models import Base, User, Post, Follow, Like  # noqa: E402
+from app.main import app  # noqa: E402
+
+FEED_PARAMS = {"limit": 50}
+
+
+def seed(users: int, posts_per_user: int) -> None:
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        db.add_all(User(id=i, name=f"user{i}", email=f"user{i}@example.com", password="x")
+                   for i in range(1, users + 1))
+        db.flush()
+        db.add_all(Follow(follower_id=1, following_id=i) for i in range(2, users + 1))
+        post_id = 0
+        for author in range(2, users + 1):
+            for _ in range(posts_per_user):
+                post_id += 1
+                db.add(Post(id=post_id, content=f"post {post_id} #bench", user_id=author))
+                db.add(Like(user_id=author, post_id=post_id))
+        db.commit()
+    finally:
+        db.close()
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))] * 1000
+
+
+async def measure_capacity(client: httpx.AsyncClient, headers: dict, seconds: float, concurrency: int) -> float:
+    done = 0
+    stop = time.perf_counter() + seconds
+
+    async def worker():
+        nonlocal done
+        while time.perf_counter() < stop:
+            await client.get("/posts/", headers=headers, params=FEED_PARAMS)
+            done += 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return done / seconds
+
+
+async def offer_load(client: httpx.AsyncClient, headers: dict, rate: float, seconds: float,
+                     feed_share: float, timeout: float, rng: random.Random) -> dict:
+    routes = {"GET /posts/": ("/posts/", FEED_PARAMS), "GET /users/me": ("/users/me", None)}
+    sent = {route: 0 for route in routes}
+    results = {route: [] for route in routes}
+
+    async def request(route: str):
+        path, params = routes[route]
+        started = time.perf_counter()
+        response = await client.get(path, headers=headers, params=params)
+        latency = time.perf_counter() - started
+        # A response after the client's timeout is one it had already given up on
+        results[route].append((response.status_code if latency <= timeout else None, latency))
+
+    tasks = []
+    # Arrivals follow their own schedule: a slow server makes us catch up, not slow down
+    next_at = time.perf_counter()
+    end = next_at + seconds
+    while next_at < end:
+        route = "GET /posts/" if rng.random() < feed_share else "GET /users/me"
+        sent[route] += 1
+        tasks.append(asyncio.create_task(request(route)))
+        next_at += rng.expovariate(rate)
+        await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+    await asyncio.wait(tasks, timeout=timeout)
+    for route, samples in results.items():
+        samples.extend([(None, timeout)] * (sent[route] - len(samples)))
+    return results
+
+
+def report(label: str, results: dict) -> None:
+    print(f"\n{label}")
+    for route, samples in results.items():
+        ok = [latency for status, latency in samples if status == 200]
+        shed = [latency for status, latency in samples if status == 503]
+        timed_out = sum(1 for status, _ in samples if status is None)
+        failed = len(samples) - len(ok) - len(shed) - timed_out
+        print(f"  {route:<14} sent={len(samples):5d} ok={len(ok):5d} 503={len(shed):5d} "
+              f"timeout={timed_out:4d} error={failed:4d}  "
+              f"ok p50={percentile(ok, 50):7.1f}ms p99={percentile(ok, 99):7.1f}ms max={percentile(ok, 100):7.1f}ms  "
+              f"503 p99={percentile(shed, 99):6.1f}ms")
+
+
+async def run(args) -> None:
+    seed(args.users, args.posts_per_user)
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": "1"})}
+    rng = random.Random(args.seed)
+    # Without admission, overload ends in DB pool checkout timeouts: count them as 500s
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        controller.enabled = False
+        capacity = await measure_capacity(client, headers, args.capacity_seconds, args.concurrency)
+        rate = capacity * args.overload
+        print(f"Feed capacity ~{capacity:.0f} req/s; offering {rate:.0f} req/s "
+              f"({args.overload:g}x, {args.feed_share:.0%} feed) for {args.seconds:g}s")
+
+        # ON first: the OFF run leaves a backlog behind that would still be draining
+        for enabled in (True, False):
+            controller.reset()
+            controller.enabled = enabled
+            results = await offer_load(client, headers, rate, args.seconds, args.feed_share, args.timeout, rng)
+            report(f"admission control {'ON' if enabled else 'OFF'}", results)
+            if enabled:
+                print("  limits after the run:", {name: (stats["limit"], stats["window_ms"])
+                                                  for name, stats in controller.stats().items()},
+                      "(limit, last window's service time in ms)")
+    # Don't wait for the abandoned requests still queued in the threadpool
+    sys.stdout.flush()
+    os._exit(0)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--posts-per-user", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=16, help="Closed-loop clients for the capacity run")
+    parser.add_argument("--capacity-seconds", type=float, default=5)
+    parser.add_argument("--seconds", type=float, default=10, help="Length of each overload run")
+    parser.add_argument("--overload", type=float, default=2.0, help="Offered load as a multiple of capacity")
+    parser.add_argument("--feed-share", type=float, default=0.8)
+    parser.add_argument("--timeout", type=float, default=5, help="Seconds a client waits for a response")
+    parser.add_argument("--seed", type=int, default=1)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# bench/media_bench.py
+"""
+Compare the old StaticFiles mount with the media router.
+
+Drives both ASGI apps in-process (no sockets) so the numbers are the
+application's own CPU cost per request and its throughput in MB/s.
+
+    python -m bench.media_bench --size-kb 512 --requests 2000
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import uuid
+
+
+def build_apps(upload_dir: str):
+    os.environ["UPLOAD_DIR"] = upload_dir
+    from fastapi import FastAPI
+    from fastapi.staticfiles import StaticFiles
+    from app.routes.media_routes import router as media_router
+
+    static_app = FastAPI()
+    static_app.mount("/uploads", StaticFiles(directory=upload_dir), name="uploads")
+
+    media_app = FastAPI()
+    media_app.include_router(media_router, prefix="/uploads")
+    return static_app, media_app
+
+
+async def call(app, path: str, headers=(), extensions=None):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "", "headers": list(headers),
+        "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 80),
+        "extensions": extensions or {},
+    }
+    received = 0
+    status = None
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal received, status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            received += len(message.get("body", b""))
+        elif message["type"] == "http.response.zerocopysend":
+            received += message["count"]
+
+    await app(scope, receive, send)
+    return status, received
+
+
+async def run_case(name, app, path, requests, headers=(), extensions=None):
+    for _ in range(min(50, requests)):
+        await call(app, path, headers, extensions)
+
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    total = 0
+    status = None
+    for _ in range(requests):
+        status, received = await call(app, path, headers, extensions)
+        total += received
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    print(f"{name:<38} status={status} {total / wall / 1e6:9.1f} MB/s  "
+          f"{cpu / requests * 1e6:8.1f} us CPU/req  {requests / wall:8.0f} req/s")
+
+
+async def main(size_kb: int, requests: int):
+    with tempfile.TemporaryDirectory() as upload_dir:
+        name = f"{uuid.uuid4().hex}.jpg"
+        with open(os.path.join(upload_dir, name), "wb") as f:
+            f.write(os.urandom(size_kb * 1024))
+
+        static_app, media_app = build_apps(upload_dir)
+        path = f"/uploads/{name}"
+        print(f"file={size_kb} KiB requests={requests}")
+
+        await run_case("StaticFiles mount", static_app, path, requests)
+        await run_case("media router", media_app, path, requests)
+        await run_case("media router (zerocopysend server)", media_app, path, requests,
+                       extensions={"http.response.zerocopysend": {}})
+        await run_case("media router Range 64KiB", media_app, path, requests,
+                       headers=[(b"range", b"bytes=0-65535")])
+
+        from app.core.media import media_etag
+        etag = media_etag(name, os.stat(os.path.join(upload_dir, name)))
+        await run_case("media router If-None-Match (304)", media_app, path, requests,
+                       headers=[(b"if-none-match", etag.encode())])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-kb", type=int, default=512)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.size_kb, args.requests))
@@ -0,0 +1,19 @@
+# bench/micro/__init__.py
+"""
+Microbenchmarks of the building blocks behind every request: JWT encode and
+decode, bcrypt verification per cost, response model validation and JSON
+serialization, feed statement construction and execution, and
+get_current_user against SQLite.
+
+Each case is timed with a warmup, then `--repeat` rounds of a loop
+calibrated to take at least `--min-time` seconds, with the garbage collector
+off; the minimum per-call time is the number to compare (the other rounds
+only add noise from the rest of the machine). Results can be written as
+JSON and compared with an earlier run, e.g. across commits:
+
+    python -m bench.micro --json before.json
+    git checkout my-branch
+    python -m bench.micro --json after.json --compare before.json
+    python -m bench.micro --filter jwt --cpu 2
+    python -m bench.micro --list
+"""
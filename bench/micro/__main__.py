@@ -0,0 +1,55 @@
+# bench/micro/__main__.py
+import argparse
+import re
+import sys
+
+from bench.micro import harness
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m bench.micro", description="Microbenchmarks of hot functions")
+    parser.add_argument("--filter", help="Only run benchmarks whose name matches this regex")
+    parser.add_argument("--repeat", type=int, default=7, help="Timed rounds per benchmark; the minimum is reported")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed rounds before measuring")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds each round runs for at least")
+    parser.add_argument("--cpu", type=int, help="Pin the process to this CPU (Linux)")
+    parser.add_argument("--json", dest="json_path", help="Write the results to this file")
+    parser.add_argument("--compare", help="Results file of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.05,
+                        help="Relative change flagged as slower/faster in --compare")
+    parser.add_argument("--list", action="store_true", help="List the benchmarks and exit")
+    args = parser.parse_args()
+
+    if args.cpu is not None:
+        # Before the imports below, so fixtures and warmup run where the measurements do
+        harness.pin_cpu(args.cpu)
+
+    from bench.micro import cases  # noqa: F401  (registers the benchmarks)
+
+    selected = [c for c in harness.CASES.values() if not args.filter or re.search(args.filter, c.name)]
+    if args.list:
+        for c in selected:
+            print(c.name)
+        return
+    if not selected:
+        sys.exit(f"No benchmark matches {args.filter!r}")
+
+    report = {"meta": harness.run_metadata(args), "results": {}}
+    for c in selected:
+        result = harness.measure(c.setup(), args.repeat, args.warmup, args.min_time)
+        report["results"][c.name] = result
+        print(f"{c.name:<40} {harness.format_ns(result['min_ns'])}  "
+              f"(median {harness.format_ns(result['median_ns']).strip()}, "
+              f"{result['repeat']}x{result['number']})", flush=True)
+
+    if args.json_path:
+        harness.save(args.json_path, report)
+        print(f"\n✅ Results written to {args.json_path}")
+    if args.compare:
+        baseline = harness.load(args.compare)
+        print(f"\nAgainst {args.compare} (commit {baseline['meta'].get('commit')}):")
+        print("\n".join(harness.compare(baseline, report, args.threshold)))
+
+
+if __name__ == "__main__":
+    main()
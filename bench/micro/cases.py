@@ -0,0 +1,206 @@
+# bench/micro/cases.py
+"""
+The benchmarks. Each @case function builds its fixtures and returns the
+callable to time; database fixtures are seeded once into a temporary SQLite
+file shared by the cases that need it.
+"""
+import functools
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+_db_dir = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_dir}/micro.db")
+os.environ.setdefault("JWT_SECRET_KEY", "bench-secret")
+
+from passlib.hash import bcrypt  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import select, insert, func, desc  # noqa: E402
+
+from app.core.auth_utils import create_access_token, decode_access_token, verify_password  # noqa: E402
+from app.core.dependencies import get_current_user  # noqa: E402
+from app.db import queries  # noqa: E402
+from app.db.database import SessionLocal, engine  # noqa: E402
+from app.db.models import Base, User, Post, Follow, Like  # noqa: E402
+from app.schemas.post_schemas import PostResponse  # noqa: E402
+from app.schemas.user_schemas import UserWithPosts  # noqa: E402
+from bench.micro.harness import case  # noqa: E402
+
+USERS = 500
+POSTS_PER_USER = 20
+FOLLOWS_PER_USER = 50
+VIEWER_ID = 1
+BCRYPT_COSTS = (4, 8, 10, 12)  # passlib's default is 12
+LIST_SIZES = (10, 50)  # a feed page, the largest page the routes allow
+
+
+# --- fixtures ---
+
+@functools.lru_cache(maxsize=None)
+def seeded_db() -> None:
+    Base.metadata.create_all(bind=engine)
+    started = datetime.now(timezone.utc) - timedelta(days=30)
+    with SessionLocal() as db:
+        db.execute(insert(User), [{"id": i, "name": f"user{i}", "email": f"user{i}@example.com", "password": "x"}
+                                  for i in range(1, USERS + 1)])
+        db.execute(insert(Follow), [{"follower_id": follower, "following_id": (follower + step) % USERS + 1}
+                                    for follower in range(1, USERS + 1) for step in range(FOLLOWS_PER_USER)])
+        posts = [{"id": (author - 1) * POSTS_PER_USER + n + 1, "user_id": author, "content": f"post {n} #micro",
+                  "created_at": started + timedelta(minutes=author * POSTS_PER_USER + n)}
+                 for author in range(1, USERS + 1) for n in range(POSTS_PER_USER)]
+        db.execute(insert(Post), posts)
+        db.execute(insert(Like), [{"user_id": (post["id"] * 7 + k) % USERS + 1, "post_id": post["id"]}
+                                  for post in posts for k in range(3)])
+        db.commit()
+
+
+def post_rows(count: int) -> List[dict]:
+    """Feed-shaped dicts: a full caption, author card and three comment previews each."""
+    now = datetime.now(timezone.utc)
+    author = {"id": 7, "name": "Ada Lovelace", "avatar_url": "/uploads/ab/abcdef0123456789.jpg"}
+    return [{
+        "id": i, "user_id": 7, "content": "A day at the lake with friends #summer #lake @grace " * 4,
+        "image_url": f"/uploads/cd/{i:032x}.jpg", "created_at": now, "updated_at": now,
+        "likes_count": 120 + i, "author": author, "viewer_has_liked": i % 2 == 0,
+        "views": 4000 + i, "unique_viewers": 3100 + i, "comments_count": 12,
+        "top_comments": [{"id": i * 10 + k, "user_id": 9, "content": "Looks great!", "created_at": now,
+                          "author": {"id": 9, "name": "Grace Hopper", "avatar_url": None}} for k in range(3)],
+    } for i in range(1, count + 1)]
+
+
+def legacy_feed_statement(viewer_id: int):
+    """GET /posts/'s statement as a plain select(), the way it was built before app/db/queries.py; for comparison."""
+    return (select(Post, func.count(Like.id).label("likes_count"))
+            .outerjoin(Like, Post.id == Like.post_id)
+            .where(Post.user_id.in_(select(Follow.following_id).where(Follow.follower_id == viewer_id)))
+            .group_by(Post.id, Post.created_at)
+            .order_by(desc(Post.created_at))
+            .offset(0)
+            .limit(10))
+
+
+# --- JWT ---
+
+@case("jwt.create_access_token")
+def jwt_create():
+    return lambda: create_access_token({"sub": "42"})
+
+
+@case("jwt.decode_access_token")
+def jwt_decode():
+    token = create_access_token({"sub": "42"})
+    return lambda: decode_access_token(token)
+
+
+@case("jwt.decode_access_token.bad_signature")
+def jwt_decode_bad():
+    token = create_access_token({"sub": "42"})
+    forged = token[:-4] + ("AAAA" if not token.endswith("AAAA") else "BBBB")
+    return lambda: decode_access_token(forged)
+
+
+# --- bcrypt ---
+
+def _register_bcrypt(cost: int) -> None:
+    @case(f"bcrypt.verify_password.cost{cost}")
+    def verify():
+        hashed = bcrypt.using(rounds=cost).hash("correct horse battery staple")
+        return lambda: verify_password("correct horse battery staple", hashed)
+
+
+for _cost in BCRYPT_COSTS:
+    _register_bcrypt(_cost)
+
+
+# --- response models ---
+
+def _register_schemas(size: int) -> None:
+    posts = TypeAdapter(List[PostResponse])
+
+    @case(f"schema.PostResponse.validate[{size}]")
+    def validate_posts():
+        rows = post_rows(size)
+        return lambda: posts.validate_python(rows)
+
+    @case(f"schema.PostResponse.serialize[{size}]")
+    def serialize_posts():
+        models = posts.validate_python(post_rows(size))
+        return lambda: posts.dump_json(models)
+
+    @case(f"schema.UserWithPosts.validate[{size}]")
+    def validate_user():
+        row = {"id": 7, "name": "Ada Lovelace", "post_count": 812, "followers_count": 120000,
+               "following_count": 310, "posts": post_rows(size)}
+        return lambda: UserWithPosts.model_validate(row)
+
+    @case(f"schema.UserWithPosts.serialize[{size}]")
+    def serialize_user():
+        user = UserWithPosts.model_validate({"id": 7, "name": "Ada Lovelace", "post_count": 812,
+                                             "followers_count": 120000, "following_count": 310,
+                                             "posts": post_rows(size)})
+        return lambda: user.model_dump_json()
+
+
+for _size in LIST_SIZES:
+    _register_schemas(_size)
+
+
+# --- GET /posts/ statement ---
+
+def feed_statement():
+    return queries.feed_statement(VIEWER_ID, None, None, "created_at", "desc", 0, 10)
+
+
+@case("query.get_posts.build")
+def feed_build():
+    return feed_statement
+
+
+@case("query.get_posts.build_and_cache_key")
+def feed_cache_key():
+    # What every call pays before the compiled cache lookup in execute()
+    return lambda: feed_statement()._generate_cache_key()
+
+
+@case("query.get_posts.compile")
+def feed_compile():
+    # Paid once per worker and statement shape, on a compiled cache miss
+    dialect = engine.dialect
+    return lambda: feed_statement().compile(dialect=dialect)
+
+
+@case("query.get_posts.legacy.build")
+def legacy_feed_build():
+    return lambda: legacy_feed_statement(VIEWER_ID)
+
+
+@case("query.get_posts.legacy.build_and_compile")
+def legacy_feed_compile():
+    # What every call paid before the lambda statement, without the compiled cache
+    dialect = engine.dialect
+    return lambda: legacy_feed_statement(VIEWER_ID).compile(dialect=dialect)
+
+
+@case("query.get_posts.execute")
+def feed_execute():
+    seeded_db()
+
+    def run():
+        with SessionLocal() as db:
+            return queries.feed_page(db, VIEWER_ID, None, None, "created_at", "desc", 0, 10)
+    return run
+
+
+# --- authentication ---
+
+@case("auth.get_current_user")
+def current_user():
+    seeded_db()
+    header = "Bearer " + create_access_token({"sub": str(VIEWER_ID)})
+
+    def run():
+        # A fresh session per call, as get_db gives every request
+        with SessionLocal() as db:
+            return get_current_user(token=header, db=db)
+    return run
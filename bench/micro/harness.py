@@ -0,0 +1,147 @@
+# bench/micro/harness.py
+"""Case registry, timing loop, run metadata and comparison of JSON results."""
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+Setup = Callable[[], Callable[[], object]]
+
+
+@dataclass
+class Case:
+    name: str
+    setup: Setup  # builds the fixtures and returns the zero-argument callable to time
+
+
+CASES: Dict[str, Case] = {}
+
+
+def case(name: str) -> Callable[[Setup], Setup]:
+    def register(setup: Setup) -> Setup:
+        if name in CASES:
+            raise ValueError(f"duplicate benchmark {name!r}")
+        CASES[name] = Case(name, setup)
+        return setup
+    return register
+
+
+def _loop(fn: Callable[[], object], number: int) -> float:
+    # Same approach as timeit: no GC pauses inside the measurement
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        return time.perf_counter() - started
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def calibrate(fn: Callable[[], object], min_time: float) -> int:
+    """Calls per round so that one round takes at least min_time seconds."""
+    number = 1
+    while True:
+        elapsed = _loop(fn, number)
+        if elapsed >= min_time:
+            return number
+        # Aim a little past min_time instead of doubling from 1 for fast cases
+        number = max(number * 2, int(number * min_time * 1.2 / max(elapsed, 1e-9)))
+
+
+def measure(fn: Callable[[], object], repeat: int, warmup: int, min_time: float) -> dict:
+    number = calibrate(fn, min_time)
+    for _ in range(warmup):
+        _loop(fn, number)
+    per_call = [_loop(fn, number) / number for _ in range(repeat)]
+    best = min(per_call)
+    return {
+        "min_ns": round(best * 1e9, 1),
+        "median_ns": round(statistics.median(per_call) * 1e9, 1),
+        "max_ns": round(max(per_call) * 1e9, 1),
+        # Relative spread of the rounds; a large value means a noisy machine
+        "spread": round((statistics.median(per_call) - best) / best, 4) if best else 0.0,
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def pin_cpu(cpu: int) -> None:
+    if not hasattr(os, "sched_setaffinity"):
+        print(f"⚠️  CPU pinning is not supported on {platform.system()}; running unpinned")
+        return
+    os.sched_setaffinity(0, {cpu})
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                  check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True,
+                               text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return revision + ("-dirty" if dirty else "")
+
+
+def run_metadata(args) -> dict:
+    affinity = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else None
+    return {
+        "commit": _git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "cpus": affinity,
+        "repeat": args.repeat,
+        "warmup": args.warmup,
+        "min_time": args.min_time,
+    }
+
+
+def format_ns(ns: float) -> str:
+    for unit, scale in (("s", 1e9), ("ms", 1e6), ("us", 1e3)):
+        if ns >= scale:
+            return f"{ns / scale:8.2f}{unit}"
+    return f"{ns:8.1f}ns"
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> List[str]:
+    """Table of min times against a baseline run; changes beyond threshold are flagged."""
+    lines = [f"{'benchmark':<40} {'baseline':>10} {'current':>10} {'change':>8}"]
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            lines.append(f"{name:<40} {'-':>10} {format_ns(result['min_ns']):>10}      new")
+            continue
+        change = result["min_ns"] / before["min_ns"] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  slower"
+        elif change < -threshold:
+            flag = "  faster"
+        lines.append(f"{name:<40} {format_ns(before['min_ns']):>10} {format_ns(result['min_ns']):>10} "
+                     f"{change:+8.1%}{flag}")
+    return lines
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def save(path: str, report: dict) -> None:
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
@@ -0,0 +1,94 @@
+# bench/realtime_bench.py
+"""
+How many post subscribers one worker can carry.
+
+Opens N in-process subscriptions spread over a few hot posts, publishes
+like updates from a threadpool thread (like the real routes do) and
+measures memory per connection, publish -> delivery latency and how much
+the coalescing saved. A share of the consumers never drain: like updates
+coalesce into one slot per post, so they only get evicted once distinct
+events (e.g. comments) exceed REALTIME_MAX_PENDING.
+
+    python -m bench.realtime_bench --connections 20000 --posts 10 --events 2000
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from app.core.pubsub import Broker, SlowConsumer, post_topic
+
+
+async def consumer(sub, latencies, stalled: bool, coalesce: float):
+    try:
+        while True:
+            if stalled:
+                await asyncio.sleep(3600)
+            batch = await sub.next_batch(timeout=5, coalesce=coalesce)
+            if not batch:
+                return
+            now = time.perf_counter()
+            latencies.extend(now - event["sent_at"] for event in batch)
+    except SlowConsumer:
+        return
+    finally:
+        sub.close()
+
+
+async def main(connections: int, posts: int, events: int, stalled_share: float, coalesce: float):
+    broker = Broker()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+
+    latencies = []
+    tasks = []
+    stalled_every = int(1 / stalled_share) if stalled_share else 0
+    for i in range(connections):
+        sub = broker.subscribe([post_topic(i % posts)])
+        stalled = bool(stalled_every) and i % stalled_every == 0
+        tasks.append(asyncio.create_task(consumer(sub, latencies, stalled, coalesce)))
+    await asyncio.sleep(0)
+
+    after = tracemalloc.take_snapshot()
+    grown = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    tracemalloc.stop()
+    print(f"{connections} subscriptions on {posts} posts: {grown / connections:.0f} bytes/connection "
+          f"(subscription + consumer task)")
+
+    def publish_all():
+        for n in range(events):
+            post_id = n % posts
+            broker.publish(post_topic(post_id), ("likes", post_id),
+                           {"type": "likes", "post_id": post_id, "likes_count": n, "sent_at": time.perf_counter()})
+            # Interleave with the loop the way real request threads do
+            if n % 100 == 0:
+                time.sleep(0.001)
+
+    started = time.perf_counter()
+    await asyncio.to_thread(publish_all)
+    publish_seconds = time.perf_counter() - started
+
+    await asyncio.sleep(coalesce * 3 + 0.5)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    latencies.sort()
+    fan_out = events * connections / posts
+    print(f"published {events} events in {publish_seconds:.2f}s; naive fan-out would be {fan_out:.0f} sends, "
+          f"delivered {len(latencies)} after coalescing ({100 * (1 - len(latencies) / fan_out):.1f}% saved)")
+    if latencies:
+        print(f"delivery latency p50={latencies[len(latencies) // 2] * 1000:.1f}ms "
+              f"p99={latencies[int(len(latencies) * 0.99)] * 1000:.1f}ms")
+    print(f"slow consumers evicted: {broker.metrics['evicted']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--connections", type=int, default=20000)
+    parser.add_argument("--posts", type=int, default=10)
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--stalled-share", type=float, default=0.01)
+    parser.add_argument("--coalesce", type=float, default=0.1)
+    args = parser.parse_args()
+    asyncio.run(main(args.connections, args.posts, args.events, args.stalled_share, args.coalesce))
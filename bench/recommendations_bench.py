@@ -0,0 +1,97 @@
+# bench/recommendations_bench.py
+"""
+Friends-of-friends suggestions on a synthetic power-law follow graph.
+
+Out-degrees follow a Pareto distribution and targets are drawn with
+preference for already popular accounts, so a few accounts have huge
+follower counts like on the real service. Compares the exhaustive two-hop
+walk with the bounded sampled walk used in production (per-user latency
+and recall of the sampled top 20 against the exact top 20).
+
+    python -m bench.recommendations_bench --users 200000 --mean-degree 15
+"""
+import argparse
+import random
+import statistics
+import time
+from array import array
+from itertools import accumulate
+
+from app.services.recommendations import score_candidates
+
+
+def build_graph(users: int, mean_degree: int, seed: int):
+    rng = random.Random(seed)
+    popularity = [1.0 / (rank + 1) ** 0.9 for rank in range(users)]
+    rng.shuffle(popularity)
+    cum_weights = list(accumulate(popularity))
+    population = range(users)
+
+    following = []
+    edges = 0
+    alpha = 1.5
+    scale = mean_degree * (alpha - 1) / alpha
+    for user_id in range(users):
+        degree = min(users - 1, int(scale * rng.paretovariate(alpha)))
+        targets = set(rng.choices(population, cum_weights=cum_weights, k=degree))
+        targets.discard(user_id)
+        following.append(array("i", sorted(targets)))
+        edges += len(targets)
+    return following, edges
+
+
+def suggest(following, user_id, max_followees=None, per_followee=None, limit=20):
+    mine = following[user_id]
+    sampled = mine
+    if max_followees is not None and len(mine) > max_followees:
+        sampled = random.sample(list(mine), max_followees)
+    second_hop = (following[f] if per_followee is None else following[f][-per_followee:] for f in sampled)
+    return score_candidates(user_id, mine, second_hop, limit)
+
+
+def run(following, sample_users, **kwargs):
+    latencies, results = [], {}
+    for user_id in sample_users:
+        started = time.perf_counter()
+        results[user_id] = suggest(following, user_id, **kwargs)
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    return latencies, results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=200_000)
+    parser.add_argument("--mean-degree", type=int, default=15)
+    parser.add_argument("--samples", type=int, default=300)
+    parser.add_argument("--max-followees", type=int, default=200)
+    parser.add_argument("--per-followee", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    following, edges = build_graph(args.users, args.mean_degree, args.seed)
+    print(f"graph: {args.users} users, {edges} edges, built in {time.perf_counter() - started:.1f}s")
+
+    # Bias the sample towards heavy followers: those are the slow cases
+    by_degree = sorted(range(args.users), key=lambda u: len(following[u]), reverse=True)
+    sample_users = by_degree[:args.samples // 2] + random.Random(args.seed).sample(by_degree, args.samples // 2)
+
+    exact_lat, exact = run(following, sample_users)
+    sampled_lat, sampled = run(following, sample_users,
+                               max_followees=args.max_followees, per_followee=args.per_followee)
+
+    recalls = []
+    for user_id in sample_users:
+        truth = {uid for uid, _ in exact[user_id]}
+        if truth:
+            recalls.append(len(truth & {uid for uid, _ in sampled[user_id]}) / len(truth))
+
+    for name, lat in (("exact two-hop", exact_lat), ("sampled walk", sampled_lat)):
+        print(f"{name:<14} p50={lat[len(lat) // 2] * 1000:8.2f}ms  p99={lat[int(len(lat) * 0.99)] * 1000:8.2f}ms  "
+              f"max={lat[-1] * 1000:8.2f}ms")
+    print(f"recall@20 of sampled vs exact: {statistics.mean(recalls):.3f}")
+
+
+if __name__ == "__main__":
+    main()
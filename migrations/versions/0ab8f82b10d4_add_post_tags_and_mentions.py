@@ -0,0 +1,55 @@
+"""Add post_tags, post_mentions and tag_counts
+
+Revision ID: 0ab8f82b10d4
+Revises: ad6238c3774e
+Create Date: 2026-10-19 05:12:37.804115
+
+Existing posts are indexed by `python -m app.jobs.reindex_tags`.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0ab8f82b10d4'
+down_revision: Union[str, None] = 'ad6238c3774e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('post_tags',
+    sa.Column('tag', sa.String(length=100), nullable=False),
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('tag', 'post_id')
+    )
+    op.create_index('ix_post_tags_tag_created_at_post_id', 'post_tags', ['tag', 'created_at', 'post_id'], unique=False)
+    op.create_table('post_mentions',
+    sa.Column('mention', sa.String(length=100), nullable=False),
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('mention', 'post_id')
+    )
+    op.create_index('ix_post_mentions_mention_created_at_post_id', 'post_mentions', ['mention', 'created_at', 'post_id'], unique=False)
+    op.create_table('tag_counts',
+    sa.Column('tag', sa.String(length=100), nullable=False),
+    sa.Column('post_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('tag')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('tag_counts')
+    op.drop_index('ix_post_mentions_mention_created_at_post_id', table_name='post_mentions')
+    op.drop_table('post_mentions')
+    op.drop_index('ix_post_tags_tag_created_at_post_id', table_name='post_tags')
+    op.drop_table('post_tags')
@@ -0,0 +1,193 @@
+"""Partition posts, likes and comments
+
+Revision ID: 199d71e7f290
+Revises: 8a5d0cb19b1b
+Create Date: 2026-10-19 04:02:51.207316
+
+posts and comments become RANGE partitions by created_at month, likes a
+HASH partition by post_id. PostgreSQL requires every unique constraint on a
+partitioned table to include the partition key, so the primary keys become
+(id, created_at) / (id, post_id) and posts.id can no longer be the target of
+a foreign key: the post_id FKs on likes, comments and activities are dropped
+and delete_post removes the dependent rows itself.
+
+On other dialects (SQLite in development) only likes.created_at is added.
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '199d71e7f290'
+down_revision: Union[str, None] = '8a5d0cb19b1b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LIKES_HASH_PARTITIONS = 16
+MONTHS_AHEAD = 3
+
+POSTS_COLUMNS = "id, content, image_url, user_id, created_at, updated_at"
+COMMENTS_COLUMNS = "id, content, post_id, user_id, created_at"
+LIKES_COLUMNS = "id, user_id, post_id, created_at"
+
+
+def _add_months(month: date, n: int) -> date:
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_month_partitions(table: str, first: date, last: date) -> None:
+    month = first
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE {table}_p{month:%Y_%m} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+        )
+        month = _add_months(month, 1)
+    # Catches rows outside the managed range; the partition manager keeps it empty
+    op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+
+def _month_range(table: str):
+    bind = op.get_bind()
+    oldest = bind.execute(sa.text(f"SELECT min(created_at) FROM {table}")).scalar()
+    today = date.today().replace(day=1)
+    first = date(oldest.year, oldest.month, 1) if oldest else today
+    return min(first, today), _add_months(today, MONTHS_AHEAD)
+
+
+def _rename_away(table: str, suffix: str) -> None:
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY NONE")
+    op.execute(f"ALTER TABLE {table} RENAME TO {table}_{suffix}")
+    # Constraint indexes share the schema namespace with the new table's
+    op.execute(f"ALTER TABLE {table}_{suffix} RENAME CONSTRAINT {table}_pkey TO {table}_{suffix}_pkey")
+    if table == 'likes':
+        op.execute(f"ALTER TABLE likes_{suffix} RENAME CONSTRAINT unique_like TO unique_like_{suffix}")
+
+
+def _swap_in(table: str, columns: str, create_sql: str, partitions) -> None:
+    """Rename the heap table away, create the partitioned one, copy rows, drop the old one."""
+    _rename_away(table, 'heap')
+    op.execute(create_sql)
+    partitions()
+    op.execute(f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {table}_heap")
+    op.execute(f"DROP TABLE {table}_heap")
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('likes', sa.Column('created_at', sa.DateTime(timezone=True),
+                                     server_default=sa.text('now()'), nullable=True))
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("ALTER TABLE likes DROP CONSTRAINT IF EXISTS likes_post_id_fkey")
+    op.execute("ALTER TABLE comments DROP CONSTRAINT IF EXISTS comments_post_id_fkey")
+    op.execute("ALTER TABLE activities DROP CONSTRAINT IF EXISTS activities_post_id_fkey")
+    for table in ('posts', 'comments'):
+        op.execute(f"UPDATE {table} SET created_at = now() WHERE created_at IS NULL")
+
+    posts_first, posts_last = _month_range('posts')
+    _swap_in('posts', POSTS_COLUMNS, """
+        CREATE TABLE posts (
+            id integer NOT NULL DEFAULT nextval('posts_id_seq'),
+            content text NOT NULL,
+            image_url varchar,
+            user_id integer NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+            created_at timestamptz NOT NULL DEFAULT now(),
+            updated_at timestamptz DEFAULT now(),
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """, lambda: _create_month_partitions('posts', posts_first, posts_last))
+    op.execute("CREATE INDEX ix_posts_id ON posts (id)")
+    op.execute("CREATE INDEX ix_posts_content ON posts (content)")
+    op.execute("CREATE INDEX ix_posts_user_id_created_at ON posts (user_id, created_at)")
+
+    comments_first, comments_last = _month_range('comments')
+    _swap_in('comments', COMMENTS_COLUMNS, """
+        CREATE TABLE comments (
+            id integer NOT NULL DEFAULT nextval('comments_id_seq'),
+            content text NOT NULL,
+            post_id integer NOT NULL,
+            user_id integer NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+            created_at timestamptz NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """, lambda: _create_month_partitions('comments', comments_first, comments_last))
+    op.execute("CREATE INDEX ix_comments_id ON comments (id)")
+    op.execute("CREATE INDEX ix_comments_post_id_created_at ON comments (post_id, created_at)")
+
+    def likes_partitions():
+        for remainder in range(LIKES_HASH_PARTITIONS):
+            op.execute(f"CREATE TABLE likes_h{remainder:02d} PARTITION OF likes "
+                       f"FOR VALUES WITH (MODULUS {LIKES_HASH_PARTITIONS}, REMAINDER {remainder})")
+
+    _swap_in('likes', LIKES_COLUMNS, """
+        CREATE TABLE likes (
+            id integer NOT NULL DEFAULT nextval('likes_id_seq'),
+            user_id integer NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+            post_id integer NOT NULL,
+            created_at timestamptz DEFAULT now(),
+            PRIMARY KEY (id, post_id),
+            CONSTRAINT unique_like UNIQUE (user_id, post_id)
+        ) PARTITION BY HASH (post_id)
+    """, likes_partitions)
+    op.execute("CREATE INDEX ix_likes_id ON likes (id)")
+    op.execute("CREATE INDEX ix_likes_post_id ON likes (post_id)")
+
+
+def _swap_out(table: str, columns: str, create_sql: str) -> None:
+    _rename_away(table, 'partitioned')
+    op.execute(create_sql)
+    op.execute(f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {table}_partitioned")
+    op.execute(f"DROP TABLE {table}_partitioned CASCADE")
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        # Partitions detached by the partition manager are not copied back
+        _swap_out('likes', LIKES_COLUMNS, """
+            CREATE TABLE likes (
+                id integer PRIMARY KEY DEFAULT nextval('likes_id_seq'),
+                user_id integer NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+                post_id integer NOT NULL,
+                created_at timestamptz DEFAULT now(),
+                CONSTRAINT unique_like UNIQUE (user_id, post_id)
+            )
+        """)
+        op.execute("CREATE INDEX ix_likes_id ON likes (id)")
+        _swap_out('comments', COMMENTS_COLUMNS, """
+            CREATE TABLE comments (
+                id integer PRIMARY KEY DEFAULT nextval('comments_id_seq'),
+                content text NOT NULL,
+                post_id integer NOT NULL,
+                user_id integer NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+                created_at timestamptz DEFAULT now()
+            )
+        """)
+        op.execute("CREATE INDEX ix_comments_id ON comments (id)")
+        _swap_out('posts', POSTS_COLUMNS, """
+            CREATE TABLE posts (
+                id integer PRIMARY KEY DEFAULT nextval('posts_id_seq'),
+                content text NOT NULL,
+                image_url varchar,
+                user_id integer NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+                created_at timestamptz DEFAULT now(),
+                updated_at timestamptz DEFAULT now()
+            )
+        """)
+        op.execute("CREATE INDEX ix_posts_id ON posts (id)")
+        op.execute("CREATE INDEX ix_posts_content ON posts (content)")
+        # Rows whose post was archived would violate the restored FKs
+        for table in ('likes', 'comments', 'activities'):
+            op.execute(f"DELETE FROM {table} WHERE post_id IS NOT NULL "
+                       f"AND post_id NOT IN (SELECT id FROM posts)")
+            op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_post_id_fkey "
+                       f"FOREIGN KEY (post_id) REFERENCES posts (id) ON DELETE CASCADE")
+    op.drop_column('likes', 'created_at')
@@ -0,0 +1,51 @@
+"""Add metric_rollups, rollup_watermarks and users.created_at
+
+Revision ID: 3f8a6c1d2e75
+Revises: b7d40e2f9a61
+Create Date: 2026-10-19 07:40:12.906251
+
+Existing users keep a NULL created_at (their signup time is unknown) and
+are left out of the signups metric.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f8a6c1d2e75'
+down_revision: Union[str, None] = 'b7d40e2f9a61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('created_at', sa.DateTime(timezone=True), nullable=True))
+    if op.get_bind().dialect.name == 'postgresql':
+        # Set the default after adding the column so existing rows stay NULL
+        op.alter_column('users', 'created_at', server_default=sa.text('now()'))
+    op.create_table('metric_rollups',
+    sa.Column('metric', sa.String(length=32), nullable=False),
+    sa.Column('granularity', sa.String(length=8), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('bucket', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('count', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('metric', 'granularity', 'user_id', 'bucket')
+    )
+    op.create_index('ix_metric_rollups_metric_granularity_bucket', 'metric_rollups', ['metric', 'granularity', 'bucket'], unique=False)
+    op.create_table('rollup_watermarks',
+    sa.Column('source', sa.String(length=32), nullable=False),
+    sa.Column('last_id', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('source')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('rollup_watermarks')
+    op.drop_index('ix_metric_rollups_metric_granularity_bucket', table_name='metric_rollups')
+    op.drop_table('metric_rollups')
+    op.drop_column('users', 'created_at')
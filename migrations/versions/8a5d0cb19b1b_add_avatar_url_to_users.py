@@ -0,0 +1,28 @@
+"""Add avatar_url to users
+
+Revision ID: 8a5d0cb19b1b
+Revises: cc153022673d
+Create Date: 2026-10-19 03:14:40.118263
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a5d0cb19b1b'
+down_revision: Union[str, None] = 'cc153022673d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('avatar_url', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'avatar_url')
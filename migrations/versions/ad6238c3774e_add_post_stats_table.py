@@ -0,0 +1,35 @@
+"""Add post_stats table
+
+Revision ID: ad6238c3774e
+Revises: 199d71e7f290
+Create Date: 2026-10-19 04:31:09.552140
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ad6238c3774e'
+down_revision: Union[str, None] = '199d71e7f290'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('post_stats',
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('views', sa.BigInteger(), nullable=False),
+    sa.Column('unique_viewers', sa.Integer(), nullable=False),
+    sa.Column('viewers_hll', sa.LargeBinary(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('post_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('post_stats')
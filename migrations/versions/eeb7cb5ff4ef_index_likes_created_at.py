@@ -0,0 +1,28 @@
+"""Index likes.created_at
+
+Revision ID: eeb7cb5ff4ef
+Revises: 0ab8f82b10d4
+Create Date: 2026-10-19 05:48:20.671392
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'eeb7cb5ff4ef'
+down_revision: Union[str, None] = '0ab8f82b10d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_likes_created_at'), 'likes', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_likes_created_at'), table_name='likes')